@@ -1,19 +1,72 @@
 from import_export.admin import ImportExportModelAdmin
-from django.contrib import admin
-from .models import Student, Teacher, Parent
+from django.contrib import admin, messages
+from .models import Student, Teacher, Parent, ImportJob, Region, District, School, SurveyRound, RoundSnapshot
+from .rounds import close_round
 from .resources import StudentResource, TeacherResource, ParentResource
 
 
+@admin.register(Region)
+class RegionAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(District)
+class DistrictAdmin(admin.ModelAdmin):
+    list_display = ("name", "region")
+    list_filter = ("region",)
+    search_fields = ("name",)
+
+
+@admin.register(School)
+class SchoolAdmin(admin.ModelAdmin):
+    list_display = ("name", "district")
+    list_select_related = ("district",)
+    search_fields = ("name", "district__name")
+
+
+@admin.register(SurveyRound)
+class SurveyRoundAdmin(admin.ModelAdmin):
+    list_display = ("name", "started_on", "closed_at")
+    readonly_fields = ("closed_at",)
+    actions = ["close_rounds"]
+
+    @admin.action(description="Close selected rounds and store their snapshots")
+    def close_rounds(self, request, queryset):
+        rounds = list(queryset.filter(closed_at__isnull=True))
+        for survey_round in rounds:
+            close_round(survey_round)
+        self.message_user(request, f"Closed {len(rounds)} round(s).", messages.SUCCESS)
+
+
+@admin.register(RoundSnapshot)
+class RoundSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("survey_round", "respondent_type", "region", "district", "school", "gender", "age_group", "total", "reporting")
+    list_filter = ("survey_round", "respondent_type")
+    list_select_related = ("survey_round", "region", "district", "school")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Student)
 class StudentAdmin(ImportExportModelAdmin):
     resource_class = StudentResource
     list_display = ("id_number", "region", "district", "school", "gender", "age_group", "reporting_violence", "experienced_vac")
-    search_fields = ("id_number", "region", "district", "school", "gender", "age_group")
+    search_fields = ("id_number", "region__name", "district__name", "school__name", "gender", "age_group")
+    list_filter = ("survey_round",)
+    list_select_related = ("region", "district", "school")
+    autocomplete_fields = ("region", "district", "school")
 
     fieldsets = (
         ("Identification", {
             "fields": ("id_number", "region", "district", "school", "gender", "age_group", "disability_status")
         }),
+        ("Collection", {
+            "fields": ("survey_round", "collected_on")
+        }),
         ("Violence Knowledge & Experience", {
             "fields": ("knowledge_on_violence", "experienced_vac", "forms_of_violence", "perpetrators", "vulnerable_places")
         }),
@@ -27,12 +80,18 @@ class StudentAdmin(ImportExportModelAdmin):
 class TeacherAdmin(ImportExportModelAdmin):
     resource_class = TeacherResource
     list_display = ("id_number", "region", "district", "school", "gender", "age_group", "reporting_violence", "right_to_discipline_child")
-    search_fields = ("id_number", "region", "district", "school", "gender", "age_group")
+    search_fields = ("id_number", "region__name", "district__name", "school__name", "gender", "age_group")
+    list_filter = ("survey_round",)
+    list_select_related = ("region", "district", "school")
+    autocomplete_fields = ("region", "district", "school")
 
     fieldsets = (
         ("Identification", {
             "fields": ("id_number", "region", "district", "school", "gender", "age_group", "marital_status", "education_level")
         }),
+        ("Collection", {
+            "fields": ("survey_round", "collected_on")
+        }),
         ("Violence & Reporting", {
             "fields": ("forms_of_violence", "reporting_violence", "vulnerable_places")
         }),
@@ -46,12 +105,18 @@ class TeacherAdmin(ImportExportModelAdmin):
 class ParentAdmin(ImportExportModelAdmin):
     resource_class = ParentResource
     list_display = ("id_number", "region", "district", "school", "gender", "age_group", "employment", "reporting_violence")
-    search_fields = ("id_number", "region", "district", "school", "gender", "age_group")
+    search_fields = ("id_number", "region__name", "district__name", "school__name", "gender", "age_group")
+    list_filter = ("survey_round",)
+    list_select_related = ("region", "district", "school")
+    autocomplete_fields = ("region", "district", "school")
 
     fieldsets = (
         ("Identification", {
             "fields": ("id_number", "region", "district", "school", "gender", "age_group", "marital_status", "education_level", "employment")
         }),
+        ("Collection", {
+            "fields": ("survey_round", "collected_on")
+        }),
         ("Discipline Practices", {
             "fields": ("physical_punishment", "believe_in_child_punishment", "effectiveness_positive_punishment", "child_comforting", "impose_rules_to_child", "set_rules_with_child")
         }),
@@ -59,3 +124,10 @@ class ParentAdmin(ImportExportModelAdmin):
             "fields": ("forms_of_violence", "reporting_violence", "vulnerable_places")
         }),
     )
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "original_name", "uploaded_by", "survey_round", "status", "created_at", "started_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("progress", "summary", "error", "created_at", "started_at", "finished_at")
@@ -0,0 +1,12 @@
+"""
+Respondent models shared by the aggregation helpers (tags, rollups).
+"""
+from .models import Student, Teacher, Parent
+
+
+RESPONDENT_MODELS = (
+    ("student", Student),
+    ("teacher", Teacher),
+    ("parent", Parent),
+)
+
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class DataCollectionConfig(AppConfig):
     name = "data_collection"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,118 @@
+"""
+Canonical forms of the values respondents are grouped and filtered by.
+
+Region, district and school names are resolved to rows of the lookup
+tables, gender to one of the Gender choices (answers that are not a
+known spelling of Male / Female are kept as Other) and age groups to a single
+spelling, once, when a respondent is written. Readers can then filter and
+group on the stored values directly (integer foreign keys, exact matches)
+instead of trimming, title-casing or comparing case-insensitively.
+"""
+import re
+
+from .models import Region, District, School, Gender
+
+
+PLACE_FIELDS = ("region", "district", "school")
+
+GENDER_ALIASES = {
+    "male": Gender.MALE,
+    "m": Gender.MALE,
+    "boy": Gender.MALE,
+    "man": Gender.MALE,
+    "female": Gender.FEMALE,
+    "f": Gender.FEMALE,
+    "girl": Gender.FEMALE,
+    "woman": Gender.FEMALE,
+    "other": Gender.OTHER,
+}
+
+
+def canonical_name(value):
+    """'  dar es  salaam ' -> 'Dar Es Salaam'; blanks and NaN become ''."""
+    if value is None:
+        return ""
+    text = re.sub(r"\s+", " ", str(value)).strip()
+    return "" if text.lower() == "nan" else text.title()
+
+
+def canonical_gender(value):
+    """Male / Female for the spellings found in the workbooks, Other for any other answer, '' for a blank."""
+    text = str(value or "").strip().lower()
+    if text in ("", "nan"):
+        return ""
+    return GENDER_ALIASES.get(text, Gender.OTHER)
+
+
+def gender_choice(value):
+    """The Gender choice a filter or search term names, '' when it names none."""
+    return GENDER_ALIASES.get(str(value or "").strip().lower(), "")
+
+
+def canonical_age_group(value):
+    """'10 - 13' -> '10-13', '46 above' -> '46 Above'."""
+    return re.sub(r"\s*-\s*", "-", canonical_name(value))
+
+
+def place_label(field):
+    """The lookup to group by to get a readable value for ``field``, e.g. region -> region__name."""
+    return f"{field}__name" if field in PLACE_FIELDS else field
+
+
+def lookup_id(value):
+    """A region/district/school id from a query string parameter, or None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ensure(model, parent, keys):
+    """
+    {(parent id, name): pk} for ``keys``, creating the rows that do not exist yet.
+
+    ``parent`` is the name of the foreign key to the level above (None for regions).
+    """
+    keys = {key for key in keys if key[1]}
+    if not keys:
+        return {}
+
+    def existing():
+        rows = model.objects.filter(name__in={name for _, name in keys})
+        if parent is None:
+            return {(None, name): pk for name, pk in rows.values_list("name", "pk")}
+        return {(parent_id, name): pk for parent_id, name, pk in rows.values_list(f"{parent}_id", "name", "pk")}
+
+    found = existing()
+    missing = keys - found.keys()
+    if missing:
+        model.objects.bulk_create(
+            [model(name=name, **({} if parent is None else {f"{parent}_id": parent_id})) for parent_id, name in missing],
+            ignore_conflicts=True,
+        )
+        found = existing()
+    return found
+
+
+def resolve_places(triples):
+    """
+    Map (region, district, school) name triples to (region_id, district_id, school_id).
+
+    Names are canonicalized first and missing lookup rows are created, so
+    "ARUSHA " and "Arusha" resolve to the same region. Blank names resolve
+    to None. The result is keyed by the triples as passed in.
+    """
+    triples = set(triples)
+    names = {triple: tuple(canonical_name(value) for value in triple) for triple in triples}
+
+    regions = _ensure(Region, None, {(None, r) for r, _, _ in names.values()})
+    region_ids = {r: regions.get((None, r)) for r, _, _ in names.values()}
+    districts = _ensure(District, "region", {(region_ids[r], d) for r, d, _ in names.values()})
+    district_ids = {(r, d): districts.get((region_ids[r], d)) for r, d, _ in names.values()}
+    schools = _ensure(School, "district", {(district_ids[(r, d)], s) for r, d, s in names.values()})
+
+    resolved = {}
+    for triple, (r, d, s) in names.items():
+        district_id = district_ids[(r, d)]
+        resolved[triple] = (region_ids[r], district_id, schools.get((district_id, s)))
+    return resolved
@@ -0,0 +1,112 @@
+"""
+Respondent filters shared by the analysis page, the CSV exports and the
+AJAX endpoints.
+
+A ``FilterSpec`` is parsed once from the query string and compiled per
+model into a Q object. Filters a model does not have (disability status
+is only asked of students, education level of teachers, employment of
+parents) are skipped for that model. A value that names nothing (an
+unknown gender, a place given by name instead of id) is kept as a filter
+that matches no rows rather than being dropped. ``counts`` turns the spec into a
+single conditional-aggregation query per model, so a chart with several
+buckets costs one round trip instead of one ``count()`` each.
+"""
+from django.db.models import Count, Q
+
+from .canonical import gender_choice, lookup_id
+
+
+def parse_bool(value):
+    """'true' / 'false' from a select box -> True / False, anything else None."""
+    return {"true": True, "false": False}.get(str(value or "").strip().lower())
+
+
+class FilterSpec:
+    """The region/district/school/gender/age group/... filters of one request."""
+    FIELDS = (
+        "region", "district", "school", "gender", "age_group",
+        "disability_status", "education_level", "employment", "survey_round",
+    )
+
+    # Fields whose submitted text is parsed, with the parser (None when it names nothing)
+    PARSERS = {
+        "region": lookup_id,
+        "district": lookup_id,
+        "school": lookup_id,
+        "gender": lambda value: gender_choice(value) or None,
+        "disability_status": parse_bool,
+        "survey_round": lookup_id,
+    }
+
+    def __init__(self, region=None, district=None, school=None, gender=None, age_group=None,
+                 disability_status=None, education_level=None, employment=None, survey_round=None, unmatched=None):
+        self.region = region
+        self.district = district
+        self.school = school
+        self.gender = gender
+        self.age_group = age_group
+        self.disability_status = disability_status
+        self.education_level = education_level
+        self.employment = employment
+        self.survey_round = survey_round
+        # {field: submitted value} for values that name no id / choice; these match no rows
+        self.unmatched = unmatched or {}
+
+    @classmethod
+    def from_request(cls, request):
+        params = request.GET
+        values, unmatched = {}, {}
+        for field in cls.FIELDS:
+            raw = (params.get(field) or "").strip()
+            if not raw:
+                continue
+            parse = cls.PARSERS.get(field)
+            value = parse(raw) if parse else raw
+            if value is None:
+                unmatched[field] = raw
+            else:
+                values[field] = value
+        return cls(unmatched=unmatched, **values)
+
+    def values(self):
+        """{field: value} for the filters that are set."""
+        values = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                values[field] = value
+        return values
+
+    def as_params(self):
+        """The filters as the query-string values the filter form submits ('' when unset)."""
+        params = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            params[field] = "" if value is None else value
+        params.update(self.unmatched)
+        return params
+
+    def q(self, model):
+        """The filters that apply to ``model``, as one Q object."""
+        fields = {field.name for field in model._meta.get_fields()}
+        if any(field in fields for field in self.unmatched):
+            return Q(pk__in=[])
+        return Q(**{field: value for field, value in self.values().items() if field in fields})
+
+    def queryset(self, model):
+        """Filtered rows of ``model`` in primary-key order (what the exports stream)."""
+        return model.objects.filter(self.q(model)).order_by("pk")
+
+    def counts(self, model, **buckets):
+        """
+        {"total": n, bucket: n, ...} for the filtered rows of ``model`` in one query.
+
+        Each keyword is a Q object selecting the rows counted under that name,
+        e.g. ``counts(Student, male=Q(gender=Gender.MALE))``.
+        """
+        aggregates = {"total": Count("pk")}
+        for name, condition in buckets.items():
+            aggregates[name] = Count("pk", filter=condition)
+        return model.objects.filter(self.q(model)).aggregate(**aggregates)
@@ -1,8 +1,15 @@
-
 from django import forms
+from .models import SurveyRound
 
 class UploadExcelForm(forms.Form):
     excel_file = forms.FileField(
         label="Upload Excel File",
-        help_text="Upload an .xlsx file with sheets named Students, Teachers, Parents"
+        help_text="Upload an .xlsx (or .xls) file with sheets named Students, Teachers, Parents, "
+                  "or a CSV export of one sheet named students.csv, teachers.csv or parents.csv"
+    )
+    survey_round = forms.ModelChoiceField(
+        queryset=SurveyRound.objects.filter(closed_at__isnull=True),
+        required=False,
+        empty_label="Latest open round",
+        help_text="The data collection round these responses belong to",
     )
@@ -0,0 +1,124 @@
+"""
+In-memory index of the region -> district -> school hierarchy and of the
+distinct answers the filter forms offer (gender, age group, education
+level, employment), across students, teachers and parents.
+
+The index is kept in process memory, so the dependent dropdowns, prefix
+search and the filter bootstrap are answered without touching the
+respondent tables. Place names are kept in one sorted list so a prefix
+search is a bisect plus a short scan.
+
+The index is keyed on the shared data version (see versioning.py), which
+every import, admin edit and delete bumps in whichever process made it;
+each process rebuilds its copy the first time it sees a newer version.
+Imports bump the version once, when they finish, so a rebuild happens
+once per import rather than after every batch. Gender and age group come
+from the rollup table; education level and employment need DISTINCT
+scans of the teacher and parent tables.
+"""
+import threading
+from bisect import bisect_left
+
+from .models import Student, Teacher, Parent, Region, District, School, RespondentRollup
+from .rollups import has_field
+from .versioning import current_version
+
+
+# Answers offered as filter options: read from the rollup cells / scanned from the respondent models
+ROLLUP_OPTION_FIELDS = ("gender", "age_group")
+SCANNED_OPTION_FIELDS = ("education_level", "employment")
+
+SEARCH_LIMIT = 20
+
+
+class GeographyIndex:
+    def __init__(self, version, regions, districts, schools, options):
+        self.version = version
+        self.regions = regions        # [(id, name), ...]
+        self.districts = districts    # [(id, name, region id), ...]
+        self.schools = schools        # [(id, name, district id), ...]
+        self.options = options        # {field: [value, ...]}
+
+        self.districts_by_region = {}
+        for pk, name, region in districts:
+            self.districts_by_region.setdefault(region, []).append({"id": pk, "name": name})
+        self.schools_by_district = {}
+        for pk, name, district in schools:
+            self.schools_by_district.setdefault(district, []).append({"id": pk, "name": name})
+
+        # (lowercased name, level, id, name, parent id), sorted for prefix search
+        self.names = sorted(
+            [(name.lower(), "region", pk, name, None) for pk, name in regions]
+            + [(name.lower(), "district", pk, name, region) for pk, name, region in districts]
+            + [(name.lower(), "school", pk, name, district) for pk, name, district in schools]
+        )
+
+    def districts_of(self, region):
+        return self.districts_by_region.get(region, [])
+
+    def schools_of(self, district):
+        return self.schools_by_district.get(district, [])
+
+    def search(self, prefix, level=None, limit=SEARCH_LIMIT):
+        """Places whose name starts with ``prefix`` (case-insensitive), optionally of one level."""
+        prefix = prefix.strip().lower()
+        matches = []
+        if not prefix:
+            return matches
+        for key, place_level, pk, name, parent in self.names[bisect_left(self.names, (prefix,)):]:
+            if not key.startswith(prefix) or len(matches) >= limit:
+                break
+            if level is None or place_level == level:
+                matches.append({"level": place_level, "id": pk, "name": name, "parent": parent})
+        return matches
+
+    def bootstrap(self):
+        """Everything a filter form needs, as compact lists for one JSON response."""
+        return {
+            "version": self.version,
+            "regions": self.regions,
+            "districts": self.districts,
+            "schools": self.schools,
+            "options": self.options,
+        }
+
+
+def distinct_values(field):
+    """Sorted non-blank values of ``field`` over the respondent models that have it."""
+    values = set()
+    for model in (Student, Teacher, Parent):
+        if has_field(model, field):
+            values.update(model.objects.values_list(field, flat=True).distinct().order_by())
+    return sorted(value for value in values if value not in (None, ""))
+
+
+def rollup_values(field):
+    """Sorted non-blank values of ``field`` over the rollup cells (every respondent type)."""
+    values = RespondentRollup.objects.values_list(field, flat=True).distinct().order_by()
+    return sorted(value for value in values if value not in (None, ""))
+
+
+def build(version):
+    regions = list(Region.objects.values_list("id", "name"))
+    districts = list(District.objects.values_list("id", "name", "region_id"))
+    schools = list(School.objects.values_list("id", "name", "district_id"))
+    options = {field: rollup_values(field) for field in ROLLUP_OPTION_FIELDS}
+    options.update({field: distinct_values(field) for field in SCANNED_OPTION_FIELDS})
+    return GeographyIndex(version, regions, districts, schools, options)
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def geography():
+    """The index for the current data version, rebuilt when the version has moved on."""
+    global _index
+    version = current_version().version
+    index = _index
+    if index is None or index.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                _index = build(version)
+            index = _index
+    return index
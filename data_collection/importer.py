@@ -0,0 +1,396 @@
+"""
+Bulk ingestion of the Students / Teachers / Parents workbook.
+
+Sheets are streamed in fixed-size batches, each batch is normalized
+column-by-column with pandas and written with bulk_create / bulk_update,
+instead of one update_or_create per row.
+"""
+import os
+import sys
+from contextlib import nullcontext
+
+import pandas as pd
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from openpyxl import load_workbook
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from .canonical import GENDER_ALIASES, PLACE_FIELDS, resolve_places
+from .models import Student, Teacher, Parent, Gender
+from .rollups import has_field, refresh_schools
+from .rounds import open_round
+from .tags import sync_tags
+from .versioning import bump_version
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Sent once an import has finished writing rows and refreshing the rollups
+import_finished = Signal()
+
+# Peak memory is sampled into the import summary every this many rows
+MEMORY_SAMPLE_ROWS = 10000
+
+TRUE_VALUES = ["yes", "true", "1", "y"]
+
+# How each column of a sheet is cleaned before it is saved:
+#   "value" -> trimmed, title-cased text
+#   "multi" -> comma separated list, each item trimmed and title-cased
+#   "bool"  -> yes/true/1/y
+#   "place" -> region / district / school name, resolved to a lookup row on write
+#   "gender", "age_group" -> the canonical spelling (see canonical.py)
+SHEETS = {
+    "students": (Student, {
+        "region": "place",
+        "district": "place",
+        "school": "place",
+        "gender": "gender",
+        "age_group": "age_group",
+        "disability_status": "bool",
+        "knowledge_on_violence": "bool",
+        "experienced_vac": "bool",
+        "forms_of_violence": "multi",
+        "perpetrators": "multi",
+        "vulnerable_places": "multi",
+        "reporting_violence": "bool",
+        "effectiveness_reporting_system": "value",
+    }),
+    "teachers": (Teacher, {
+        "region": "place",
+        "district": "place",
+        "school": "place",
+        "gender": "gender",
+        "age_group": "age_group",
+        "marital_status": "value",
+        "education_level": "value",
+        "forms_of_violence": "multi",
+        "reporting_violence": "bool",
+        "vulnerable_places": "multi",
+        "right_to_discipline_child": "bool",
+        "effective_handling_vac": "value",
+        "training_received": "value",
+    }),
+    "parents": (Parent, {
+        "region": "place",
+        "district": "place",
+        "school": "place",
+        "gender": "gender",
+        "age_group": "age_group",
+        "marital_status": "value",
+        "education_level": "value",
+        "employment": "value",
+        "forms_of_violence": "multi",
+        "reporting_violence": "bool",
+        "vulnerable_places": "multi",
+        "physical_punishment": "bool",
+        "believe_in_child_punishment": "bool",
+        "effectiveness_positive_punishment": "value",
+        "child_comforting": "bool",
+        "impose_rules_to_child": "bool",
+        "set_rules_with_child": "bool",
+    }),
+}
+
+
+# -------------------------------
+# Column normalizers
+# -------------------------------
+def to_bool(series):
+    return series.astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+
+
+def normalize_value(series):
+    """Trim spaces, unify capitalization, handle NaN."""
+    cleaned = series.astype(str).str.strip().str.title()
+    return cleaned.where(series.notna(), "")
+
+
+def normalize_multi(series):
+    """Split comma-separated values into a clean, comma-joined list."""
+    items = series[series.notna()].astype(str).str.split(",").explode().str.strip()
+    items = items[items != ""].str.title()
+    joined = items.groupby(level=0).agg(", ".join)
+    return joined.reindex(series.index, fill_value="")
+
+
+def normalize_id(series):
+    """Trimmed id_number text; whole numbers read as floats ("12.0") lose the ".0"."""
+    text = series.astype(str).str.strip().str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
+    return text.where(series.notna(), "")
+
+
+def normalize_place(series):
+    """Collapse runs of whitespace; the lookup rows are matched on the result."""
+    return normalize_value(series).str.replace(r"\s+", " ", regex=True)
+
+
+def normalize_gender(series):
+    """Male / Female for the known spellings, Other for any other answer, '' for a blank."""
+    text = series.astype(str).str.strip().str.lower().where(series.notna(), "")
+    blank = text.isin(["", "nan"])
+    return text.map(GENDER_ALIASES).fillna(Gender.OTHER).where(~blank, "").astype(str)
+
+
+def normalize_age_group(series):
+    return normalize_place(series).str.replace(r"\s*-\s*", "-", regex=True)
+
+
+NORMALIZERS = {
+    "value": normalize_value,
+    "place": normalize_place,
+    "gender": normalize_gender,
+    "age_group": normalize_age_group,
+    "multi": normalize_multi,
+    "bool": to_bool,
+}
+
+
+def normalize_columns(df):
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    return df
+
+
+def clean_frame(df, columns):
+    """Return a frame holding id_number plus every model column, normalized."""
+    df = normalize_columns(df).reset_index(drop=True)
+    missing = pd.Series([None] * len(df), index=df.index, dtype=object)
+
+    clean = pd.DataFrame(index=df.index)
+    clean["id_number"] = normalize_id(df["id_number"] if "id_number" in df.columns else missing)
+    for column, kind in columns.items():
+        clean[column] = NORMALIZERS[kind](df[column] if column in df.columns else missing)
+    return clean
+
+
+# -------------------------------
+# Writers
+# -------------------------------
+def upsert_frame(model, clean, columns, batch_size=DEFAULT_BATCH_SIZE, touched_schools=None, stamp=None,
+                 seen_ids=None):
+    """
+    Insert or update the rows of an already cleaned frame, keyed on id_number
+    within the survey round in ``stamp`` (a respondent seen again in a later
+    round gets a new row; the earlier round's answers are left alone).
+
+    Rows without an id_number are rejected. When the same id_number appears
+    more than once the last row wins, as it did with update_or_create; every
+    row that repeats an earlier id_number, in this frame or in an earlier
+    batch of the same import (``seen_ids``, updated here), is counted as a
+    duplicate rather than as inserted or updated.
+    Each batch is committed atomically. The schools of every written row,
+    before and after the write, are added to ``touched_schools``.
+    ``stamp`` holds values written to every row, e.g. the survey round.
+    """
+    stamp = stamp or {}
+    if has_field(model, "updated_at"):
+        # bulk_update does not apply auto_now, so the change time is written like a stamp
+        stamp = {**stamp, "updated_at": timezone.now()}
+    summary = {"inserted": 0, "updated": 0, "duplicates": 0, "rejected": 0}
+    seen_ids = set() if seen_ids is None else seen_ids
+
+    valid = clean[(clean["id_number"] != "") & (clean["id_number"].str.lower() != "nan")]
+    deduped = valid.drop_duplicates("id_number", keep="last")
+    summary["rejected"] = len(clean) - len(valid)
+    summary["duplicates"] = len(valid) - len(deduped) + int(deduped["id_number"].isin(seen_ids).sum())
+
+    # region/district/school are foreign keys; they are written through their "<field>_id" attribute
+    fields = [*columns, *stamp]
+    attnames = {field: model._meta.get_field(field).attname for field in fields}
+    stamped = {attnames[field]: value for field, value in stamp.items()}
+    scope = {"survey_round": stamp["survey_round"]} if "survey_round" in stamp else {}
+    for start in range(0, len(deduped), batch_size):
+        chunk = deduped.iloc[start:start + batch_size]
+        existing = {obj.id_number: obj for obj in model.objects.filter(id_number__in=list(chunk["id_number"]), **scope)}
+        places = resolve_places(zip(*(chunk[field] for field in PLACE_FIELDS)))
+
+        to_create, to_update = [], []
+        for record in chunk.to_dict("records"):
+            ids = places[tuple(record[field] for field in PLACE_FIELDS)]
+            record.update(zip(PLACE_FIELDS, ids))
+            values = {attnames[field]: record[field] for field in columns}
+            values.update(stamped)
+            obj = existing.get(record["id_number"])
+            if obj is None:
+                to_create.append(model(id_number=record["id_number"], **values))
+                continue
+            if touched_schools is not None:
+                touched_schools.add(obj.school_id)
+            for attname, value in values.items():
+                setattr(obj, attname, value)
+            to_update.append(obj)
+
+        if touched_schools is not None:
+            touched_schools.update(obj.school_id for obj in to_create + to_update)
+        with transaction.atomic():
+            model.objects.bulk_create(to_create, batch_size=batch_size)
+            model.objects.bulk_update(to_update, fields, batch_size=batch_size)
+            written = model.objects.filter(id_number__in=list(chunk["id_number"]), **scope).values_list("pk", flat=True)
+            sync_tags(model, written)
+        summary["inserted"] += len(to_create)
+        # Rows already written by this import were counted as duplicates above
+        summary["updated"] += sum(1 for obj in to_update if obj.id_number not in seen_ids)
+        seen_ids.update(chunk["id_number"])
+
+    return summary
+
+
+# -------------------------------
+# Streaming readers
+# -------------------------------
+def iter_xlsx_batches(excel_file, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield (sheet, DataFrame, total_rows) batches from an .xlsx workbook.
+
+    openpyxl's read-only mode parses the sheet XML lazily, so at most one
+    batch of rows is held in memory regardless of the size of the file.
+    """
+    workbook = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        for ws in workbook.worksheets:
+            key = ws.title.strip().lower()
+            if key not in SHEETS:
+                continue
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            total = ws.max_row - 1 if ws.max_row else None
+
+            batch = []
+            for row in rows:
+                if not any(cell is not None for cell in row):
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield key, pd.DataFrame.from_records(batch, columns=header), total
+                    batch = []
+            if batch:
+                yield key, pd.DataFrame.from_records(batch, columns=header), total
+    finally:
+        workbook.close()
+
+
+def iter_xls_batches(excel_file, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield (sheet, DataFrame, total_rows) batches from a legacy .xls workbook.
+
+    xlrd cannot read a sheet lazily, so each sheet is loaded whole and then
+    written in batches; only the .xlsx and CSV readers stream.
+    """
+    with pd.ExcelFile(excel_file, engine="xlrd") as workbook:
+        for title in workbook.sheet_names:
+            key = title.strip().lower()
+            if key not in SHEETS:
+                continue
+            df = workbook.parse(title, dtype=object).dropna(how="all")
+            for start in range(0, len(df), batch_size):
+                yield key, df.iloc[start:start + batch_size], len(df)
+
+
+def iter_csv_batches(csv_file, sheet, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield (sheet, DataFrame, total_rows) batches from a single-sheet CSV export."""
+    for chunk in pd.read_csv(csv_file, chunksize=batch_size, dtype=object, skip_blank_lines=True):
+        yield sheet, chunk, None
+
+
+def sheet_from_filename(name):
+    """students.csv / Teachers_2024.csv -> the sheet the CSV holds, if any."""
+    stem = os.path.splitext(os.path.basename(name))[0].strip().lower()
+    return next((key for key in SHEETS if stem.startswith(key)), None)
+
+
+def peak_rss_mb():
+    """High-water mark of this process' resident memory, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def refresh_rollups(touched):
+    for model, schools in touched.items():
+        refresh_schools(model, schools)
+    bump_version()
+    import_finished.send(sender=import_workbook)
+
+
+def import_workbook(excel_file, batch_size=DEFAULT_BATCH_SIZE, atomic=True, progress=None, name=None,
+                    survey_round=None):
+    """
+    Import an .xlsx (or legacy .xls) workbook, or a CSV export of a single sheet.
+
+    Rows are streamed in batches of ``batch_size``, so peak memory depends on
+    the batch size rather than on the size of the file. A CSV is matched to a
+    sheet by its file name (students.csv, teachers.csv, parents.csv).
+
+    With ``atomic=True`` the whole file is one transaction. The background
+    worker passes ``atomic=False`` so each batch commits on its own and the
+    progress endpoint sees rows as they land. The data version is bumped
+    once, when the import ends (or fails), so cached reports and exports
+    are dropped once per import rather than after every batch.
+    ``progress(sheet, processed, total)`` is called after every batch.
+
+    Every written row is stamped with ``survey_round`` (the open round by
+    default) and today's date as ``collected_on``. Closed rounds cannot be
+    imported into, their snapshot would no longer match.
+
+    Returns a per-sheet summary, e.g.
+    {"students": {"read": 13, "inserted": 10, "updated": 2, "duplicates": 1, "rejected": 0,
+                  "memory": [{"rows": 10000, "peak_rss_mb": 212.4}, ...]}, ...}
+    """
+    name = name or getattr(excel_file, "name", "") or ""
+    survey_round = survey_round or open_round()
+    if survey_round is not None and survey_round.is_closed:
+        raise ValueError(f"Survey round {survey_round} is closed; open a new round to import more data.")
+    stamp = {"survey_round": survey_round.pk if survey_round else None, "collected_on": timezone.localdate()}
+    if name.lower().endswith(".csv"):
+        sheet = sheet_from_filename(name)
+        if sheet is None:
+            raise ValueError(f"Cannot tell which sheet {name!r} holds; name it students.csv, teachers.csv or parents.csv.")
+        batches = iter_csv_batches(excel_file, sheet, batch_size)
+    elif name.lower().endswith(".xls"):
+        batches = iter_xls_batches(excel_file, batch_size)
+    else:
+        batches = iter_xlsx_batches(excel_file, batch_size)
+
+    summary = {}
+    touched = {model: set() for model, _ in SHEETS.values()}
+    seen_ids = {sheet: set() for sheet in SHEETS}
+    with transaction.atomic() if atomic else nullcontext():
+        try:
+            for sheet, df, total in batches:
+                model, columns = SHEETS[sheet]
+                result = summary.setdefault(
+                    sheet, {"read": 0, "inserted": 0, "updated": 0, "duplicates": 0, "rejected": 0, "memory": []}
+                )
+                read = result["read"]
+
+                batch = upsert_frame(
+                    model, clean_frame(df, columns), columns, batch_size=batch_size, touched_schools=touched[model],
+                    stamp=stamp, seen_ids=seen_ids[sheet],
+                )
+                for key in ("inserted", "updated", "duplicates", "rejected"):
+                    result[key] += batch[key]
+                result["read"] += len(df)
+
+                if result["read"] // MEMORY_SAMPLE_ROWS > read // MEMORY_SAMPLE_ROWS:
+                    result["memory"].append({"rows": result["read"], "peak_rss_mb": peak_rss_mb()})
+                if progress:
+                    progress(sheet, result["read"], max(total or 0, result["read"]))
+        except Exception:
+            # Batches committed before the failure still have to be counted
+            if not atomic:
+                refresh_rollups(touched)
+            raise
+        refresh_rollups(touched)
+
+        for result in summary.values():
+            if not result["memory"] or result["memory"][-1]["rows"] != result["read"]:
+                result["memory"].append({"rows": result["read"], "peak_rss_mb": peak_rss_mb()})
+    return summary
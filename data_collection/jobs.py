@@ -0,0 +1,69 @@
+"""
+DB-backed queue for workbook uploads.
+
+The upload view only stores the file and an ImportJob row; the
+``process_import_jobs`` management command picks pending jobs up and runs
+them through the importer, recording progress as it goes.
+"""
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import importer
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(uploaded_file, user=None, survey_round=None):
+    """Save the uploaded workbook to IMPORT_UPLOAD_DIR under a random name and queue it for import."""
+    job = ImportJob(original_name=uploaded_file.name, uploaded_by=user, survey_round=survey_round)
+    job.file.save(uploaded_file.name, uploaded_file, save=False)
+    job.save()
+    return job
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest pending job to "running" and return it.
+
+    The conditional update means two workers can never claim the same job.
+    """
+    for job in ImportJob.objects.filter(status="pending").order_by("created_at")[:5]:
+        claimed = ImportJob.objects.filter(pk=job.pk, status="pending").update(
+            status="running", started_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_job(job):
+    progress = dict(job.progress)
+
+    def report(sheet, processed, total):
+        progress[sheet] = {"processed": processed, "total": total}
+        ImportJob.objects.filter(pk=job.pk).update(progress=progress)
+
+    batch_size = getattr(settings, "DATA_IMPORT_BATCH_SIZE", importer.DEFAULT_BATCH_SIZE)
+    try:
+        with job.file.open("rb") as f:
+            job.summary = importer.import_workbook(
+                f, batch_size=batch_size, atomic=False, progress=report, name=job.original_name,
+                survey_round=job.survey_round,
+            )
+        job.status = "done"
+    except Exception as exc:
+        # The error is shown to the uploader, the traceback only goes to the server log
+        logger.exception("Import job %s failed", job.pk)
+        job.error = str(exc) if isinstance(exc, ValueError) else "The import failed unexpectedly; the details are in the server log."
+        job.status = "failed"
+
+    # The workbook is not kept once it has been processed
+    job.file.delete(save=False)
+    job.progress = progress
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "summary", "status", "error", "progress", "finished_at"])
+    return job
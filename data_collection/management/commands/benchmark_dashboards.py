@@ -0,0 +1,56 @@
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from data_collection import views as data_views
+from reports import views as report_views
+from school_violence_mne.concurrency import gather_queries, run_queries
+
+
+DASHBOARDS = {
+    "data_collection": data_views.dashboard_queries,
+    "reports": report_views.dashboard_queries,
+}
+
+
+def timed(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def timed_async(queries, repeat):
+    # The first run opens the pool threads' connections and is not counted
+    timings = []
+    for _ in range(repeat + 1):
+        started = time.perf_counter()
+        await gather_queries(queries())
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings[1:]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the latency of the dashboard aggregations run one after another (sync) "
+        "and concurrently on worker threads (async) against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per dashboard and mode.")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        for name, queries in DASHBOARDS.items():
+            run_queries(queries())  # warm the database page cache
+            sync = timed(lambda: run_queries(queries()), repeat)
+            concurrent = asyncio.run(timed_async(queries, repeat))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} ({len(queries())} queries)"))
+            for label, timings in (("sync: ", sync), ("async:", concurrent)):
+                p95 = sorted(timings)[max(0, round(len(timings) * 0.95) - 1)]
+                self.stdout.write(f"  {label} median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
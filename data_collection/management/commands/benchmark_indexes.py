@@ -0,0 +1,127 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from data_collection.canonical import resolve_places
+from data_collection.models import Student, Teacher, Parent, Region, District, School
+
+
+REGIONS = ["Arusha", "Dodoma", "Mwanza", "Mbeya", "Tanga", "Morogoro", "Kagera", "Geita"]
+GENDERS = ["Male", "Female"]
+AGE_GROUPS = ["6-9", "10-13", "14-17", "18+"]
+
+
+def benchmark_queries(places):
+    """
+    The filter patterns used by data_analysis, the exports and the AJAX dropdowns.
+
+    ``places`` maps region / district / school names to their lookup ids.
+    """
+    region, district, school = places["Arusha"], places["Arusha D1"], places["Arusha D1 S1"]
+    return [
+        ("hierarchy filter", lambda: Student.objects.filter(region=region, district=district, school=school)),
+        ("schools of a district", lambda: Student.objects.filter(district=district).values_list("school", flat=True).distinct()),
+        ("gender", lambda: Student.objects.filter(gender="Female")),
+        ("VAC by gender", lambda: Student.objects.filter(experienced_vac=True, gender="Female")),
+        ("VAC with disability", lambda: Student.objects.filter(experienced_vac=True, disability_status=True)),
+        ("age group", lambda: Student.objects.filter(age_group="14-17")),
+        ("teacher level", lambda: Teacher.objects.filter(region=places["Dodoma"], education_level="Degree")),
+        ("parent employment", lambda: Parent.objects.filter(school=places["Mwanza D2 S3"], employment="Farmer")),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the respondent filter queries with and without the Meta.indexes on a "
+        "throwaway database filled with synthetic rows. Prints query plans and timings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500000, help="Synthetic students to create (teachers/parents get a tenth).")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the best time is reported.")
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.populate(options["rows"])
+            models = [Student, Teacher, Parent]
+
+            with connection.schema_editor() as editor:
+                for model in models:
+                    for index in model._meta.indexes:
+                        editor.remove_index(model, index)
+            before = self.run_queries(options["repeat"])
+
+            with connection.schema_editor() as editor:
+                for model in models:
+                    for index in model._meta.indexes:
+                        editor.add_index(model, index)
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            after = self.run_queries(options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        for label in before:
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  without indexes: {before[label]['ms']:.2f} ms")
+            self.stdout.write(f"    {before[label]['plan']}")
+            self.stdout.write(f"  with indexes:    {after[label]['ms']:.2f} ms")
+            self.stdout.write(f"    {after[label]['plan']}")
+
+    def populate(self, rows):
+        places = resolve_places(
+            (region, f"{region} D{d}", f"{region} D{d} S{s}")
+            for region in REGIONS for d in range(1, 6) for s in range(1, 21)
+        )
+        schools = sorted(places.values())
+        rng = random.Random(42)
+
+        def base(i, prefix):
+            region, district, school = rng.choice(schools)
+            return {
+                "id_number": f"{prefix}{i}",
+                "region_id": region,
+                "district_id": district,
+                "school_id": school,
+                "gender": rng.choice(GENDERS),
+                "age_group": rng.choice(AGE_GROUPS),
+                "reporting_violence": rng.random() < 0.3,
+            }
+
+        self.stdout.write(f"Creating {rows} students and {rows // 10} teachers and parents...")
+        batch = 5000
+        for start in range(0, rows, batch):
+            Student.objects.bulk_create([
+                Student(**base(i, "S"), disability_status=rng.random() < 0.05, experienced_vac=rng.random() < 0.4)
+                for i in range(start, min(start + batch, rows))
+            ])
+        for start in range(0, rows // 10, batch):
+            stop = min(start + batch, rows // 10)
+            Teacher.objects.bulk_create([
+                Teacher(**base(i, "T"), education_level=rng.choice(["Certificate", "Diploma", "Degree"]))
+                for i in range(start, stop)
+            ])
+            Parent.objects.bulk_create([
+                Parent(**base(i, "P"), employment=rng.choice(["Farmer", "Trader", "Employed", "Unemployed"]))
+                for i in range(start, stop)
+            ])
+
+    def run_queries(self, repeat):
+        places = {
+            name: pk
+            for model in (Region, District, School)
+            for name, pk in model.objects.values_list("name", "pk")
+        }
+        results = {}
+        for label, build in benchmark_queries(places):
+            plan = build().explain().replace("\n", " | ")
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                build().count()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = {"ms": min(timings), "plan": plan}
+        return results
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from data_collection.jobs import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued Excel imports. Keeps polling for new jobs unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process the jobs currently queued, then exit.")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds to wait between polls when idle.")
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+
+            self.stdout.write(f"Processing import {job.pk} ({job.original_name})")
+            job = run_job(job)
+            if job.status == "done":
+                self.stdout.write(self.style.SUCCESS(
+                    f"Import {job.pk} done: {job.rows_processed} rows at {job.rows_per_second} rows/s"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f"Import {job.pk} failed:\n{job.error}"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from data_collection.models import RespondentRollup
+from data_collection.rollups import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recount every RespondentRollup cell from the Student, Teacher and Parent tables."
+
+    def handle(self, *args, **options):
+        rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {RespondentRollup.objects.count()} rollup cells."))
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:59
+
+import re
+
+from django.db import migrations, models
+
+
+MULTI_VALUE_FIELDS = ("forms_of_violence", "perpetrators", "vulnerable_places")
+
+
+def split_values(text):
+    if not text:
+        return []
+    return [re.sub(r"\s+", " ", val.strip().title()) for val in re.split(r"[;,/]", text) if val.strip()]
+
+
+def backfill_tokens(apps, schema_editor):
+    AnswerToken = apps.get_model("data_collection", "AnswerToken")
+    for model_name in ("Student", "Teacher", "Parent"):
+        model = apps.get_model("data_collection", model_name)
+        fields = [f.name for f in model._meta.get_fields() if f.name in MULTI_VALUE_FIELDS]
+        batch = []
+        for row in model.objects.values_list("pk", *fields).iterator():
+            for field, text in zip(fields, row[1:]):
+                for value in split_values(text):
+                    batch.append(AnswerToken(
+                        respondent_type=model_name.lower(), respondent_id=row[0], field=field, value=value[:200],
+                    ))
+            if len(batch) >= 1000:
+                AnswerToken.objects.bulk_create(batch)
+                batch = []
+        AnswerToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0002_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('respondent_type', models.CharField(max_length=20)),
+                ('respondent_id', models.BigIntegerField()),
+                ('field', models.CharField(max_length=50)),
+                ('value', models.CharField(max_length=200)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['field', 'value'], name='data_collec_field_a4ac49_idx'), models.Index(fields=['respondent_type', 'respondent_id'], name='data_collec_respond_5fb024_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_tokens, migrations.RunPython.noop),
+    ]
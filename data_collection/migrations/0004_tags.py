@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:01
+
+import re
+
+from django.db import migrations, models
+
+
+MULTI_VALUE_FIELDS = ("forms_of_violence", "perpetrators", "vulnerable_places")
+
+
+def split_values(text):
+    if not text:
+        return []
+    return [re.sub(r"\s+", " ", val.strip().title())[:200] for val in re.split(r"[;,/]", text) if val.strip()]
+
+
+def backfill_tags(apps, schema_editor):
+    Tag = apps.get_model("data_collection", "Tag")
+    tag_ids = {}
+    for model_name in ("Student", "Teacher", "Parent"):
+        model = apps.get_model("data_collection", model_name)
+        through = model.tags.through
+        owner = model_name.lower() + "_id"
+        fields = [f.name for f in model._meta.get_fields() if f.name in MULTI_VALUE_FIELDS]
+        links = []
+        for row in model.objects.values_list("pk", *fields).iterator():
+            pairs = {(field, value) for field, text in zip(fields, row[1:]) for value in split_values(text)}
+            for key in pairs:
+                if key not in tag_ids:
+                    tag_ids[key] = Tag.objects.create(category=key[0], name=key[1]).pk
+                links.append(through(**{owner: row[0], "tag_id": tag_ids[key]}))
+            if len(links) >= 1000:
+                through.objects.bulk_create(links)
+                links = []
+        through.objects.bulk_create(links)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0003_answertoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('forms_of_violence', 'Form of Violence'), ('perpetrators', 'Perpetrator'), ('vulnerable_places', 'Vulnerable Place')], max_length=50)),
+                ('name', models.CharField(max_length=200)),
+            ],
+            options={
+                'ordering': ['category', 'name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('category', 'name'), name='unique_tag_per_category'),
+        ),
+        migrations.AddField(
+            model_name='parent',
+            name='tags',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='parents', to='data_collection.tag'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='tags',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='students', to='data_collection.tag'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='tags',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='teachers', to='data_collection.tag'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='AnswerToken',
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:03
+
+from django.db import migrations, models
+from django.db.models import BooleanField, Count, IntegerField, Q, Value
+
+
+KEY_FIELDS = ("region", "district", "school", "gender", "age_group", "disability_status")
+COUNTERS = {
+    "reporting": "reporting_violence",
+    "experienced_vac": "experienced_vac",
+    "knowledge_on_violence": "knowledge_on_violence",
+}
+
+
+def build_rollups(apps, schema_editor):
+    RespondentRollup = apps.get_model("data_collection", "RespondentRollup")
+    for model_name in ("Student", "Teacher", "Parent"):
+        model = apps.get_model("data_collection", model_name)
+        names = {f.name for f in model._meta.get_fields()}
+        annotations = {}
+        if "disability_status" not in names:
+            annotations["disability_status"] = Value(False, output_field=BooleanField())
+        counters = {"total": Count("id")}
+        for counter, field in COUNTERS.items():
+            if field in names:
+                counters[counter] = Count("id", filter=Q(**{field: True}))
+            else:
+                counters[counter] = Value(0, output_field=IntegerField())
+        rows = model.objects.order_by().annotate(**annotations).values(*KEY_FIELDS).annotate(**counters)
+        RespondentRollup.objects.bulk_create(
+            [RespondentRollup(respondent_type=model_name.lower(), **row) for row in rows], batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0004_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RespondentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('respondent_type', models.CharField(max_length=20)),
+                ('region', models.CharField(blank=True, max_length=100)),
+                ('district', models.CharField(blank=True, max_length=100)),
+                ('school', models.CharField(blank=True, max_length=100)),
+                ('gender', models.CharField(blank=True, max_length=20)),
+                ('age_group', models.CharField(blank=True, max_length=50)),
+                ('disability_status', models.BooleanField(default=False)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('reporting', models.PositiveIntegerField(default=0)),
+                ('experienced_vac', models.PositiveIntegerField(default=0)),
+                ('knowledge_on_violence', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['respondent_type', 'school'], name='data_collec_respond_5a3089_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='respondentrollup',
+            constraint=models.UniqueConstraint(fields=('respondent_type', 'region', 'district', 'school', 'gender', 'age_group', 'disability_status'), name='unique_rollup_cell'),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
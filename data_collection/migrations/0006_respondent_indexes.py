@@ -0,0 +1,102 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:03
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0005_respondentrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['region', 'district', 'school'], name='parent_hierarchy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['district', 'school'], name='parent_district_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['school'], name='parent_school_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['age_group'], name='parent_age_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(django.db.models.functions.text.Upper('gender'), name='parent_gender_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['employment'], name='parent_employment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['reporting_violence'], name='parent_reporting_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['region', 'district', 'school'], name='student_hierarchy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['district', 'school'], name='student_district_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school'], name='student_school_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['age_group'], name='student_age_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Upper('gender'), name='student_gender_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['experienced_vac', 'gender'], name='student_vac_gender_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['disability_status', 'experienced_vac'], name='student_disability_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['reporting_violence'], name='student_reporting_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['region', 'district', 'school'], name='teacher_hierarchy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['district', 'school'], name='teacher_district_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['school'], name='teacher_school_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['age_group'], name='teacher_age_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(django.db.models.functions.text.Upper('gender'), name='teacher_gender_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['education_level'], name='teacher_education_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['reporting_violence'], name='teacher_reporting_idx'),
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0006_respondent_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='District',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('region', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='districts', to='data_collection.region')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='School',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='schools', to='data_collection.district')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='district',
+            constraint=models.UniqueConstraint(fields=('region', 'name'), name='unique_district_per_region'),
+        ),
+        migrations.AddConstraint(
+            model_name='school',
+            constraint=models.UniqueConstraint(fields=('district', 'name'), name='unique_school_per_district'),
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_hierarchy_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_district_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_school_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_gender_upper_idx',
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='region_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.region'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='district_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.district'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='school_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.school'),
+        ),
+        migrations.RemoveIndex(
+            model_name='teacher',
+            name='teacher_hierarchy_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='teacher',
+            name='teacher_district_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='teacher',
+            name='teacher_school_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='teacher',
+            name='teacher_gender_upper_idx',
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='region_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.region'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='district_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.district'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='school_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.school'),
+        ),
+        migrations.RemoveIndex(
+            model_name='parent',
+            name='parent_hierarchy_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='parent',
+            name='parent_district_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='parent',
+            name='parent_school_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='parent',
+            name='parent_gender_upper_idx',
+        ),
+        migrations.AddField(
+            model_name='parent',
+            name='region_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.region'),
+        ),
+        migrations.AddField(
+            model_name='parent',
+            name='district_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.district'),
+        ),
+        migrations.AddField(
+            model_name='parent',
+            name='school_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.school'),
+        ),
+    ]
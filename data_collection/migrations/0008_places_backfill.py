@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:10
+
+import re
+
+from django.db import migrations
+
+
+GENDER_ALIASES = {
+    "male": "Male", "m": "Male", "boy": "Male", "man": "Male",
+    "female": "Female", "f": "Female", "girl": "Female", "woman": "Female",
+    "other": "Other",
+}
+
+
+def canonical_name(value):
+    return re.sub(r"\s+", " ", value or "").strip().title()
+
+
+def resolve_places(apps, schema_editor):
+    """Move the region/district/school text into the lookup tables and canonicalize gender and age group."""
+    Region = apps.get_model("data_collection", "Region")
+    District = apps.get_model("data_collection", "District")
+    School = apps.get_model("data_collection", "School")
+    regions, districts, schools = {}, {}, {}
+
+    def lookup(cache, model, key, **fields):
+        if not key[-1]:
+            return None
+        if key not in cache:
+            cache[key] = model.objects.get_or_create(name=key[-1], **fields)[0].pk
+        return cache[key]
+
+    for model_name in ("Student", "Teacher", "Parent"):
+        model = apps.get_model("data_collection", model_name)
+        batch = []
+        for obj in model.objects.only("pk", "region", "district", "school", "gender", "age_group").iterator():
+            r, d, s = (canonical_name(v) for v in (obj.region, obj.district, obj.school))
+            obj.region_ref_id = lookup(regions, Region, (r,))
+            obj.district_ref_id = lookup(districts, District, (obj.region_ref_id, d), region_id=obj.region_ref_id)
+            obj.school_ref_id = lookup(schools, School, (obj.district_ref_id, s), district_id=obj.district_ref_id)
+            gender = (obj.gender or "").strip().lower()
+            obj.gender = GENDER_ALIASES.get(gender, "Other") if gender else ""
+            obj.age_group = re.sub(r"\s*-\s*", "-", canonical_name(obj.age_group))
+            batch.append(obj)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, ["region_ref", "district_ref", "school_ref", "gender", "age_group"])
+                batch = []
+        model.objects.bulk_update(batch, ["region_ref", "district_ref", "school_ref", "gender", "age_group"])
+
+
+class Migration(migrations.Migration):
+
+    # The respondent rows are rewritten here and the old text columns dropped
+    # in the next migration: PostgreSQL cannot ALTER a table with pending
+    # trigger events in the same transaction. Not reversible: the original
+    # spellings of gender and age group are not kept.
+
+    dependencies = [
+        ('data_collection', '0007_places'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_places),
+    ]
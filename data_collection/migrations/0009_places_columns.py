@@ -0,0 +1,213 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:10
+
+from django.db import migrations, models
+from django.db.models import BooleanField, Count, IntegerField, Q, Value
+import django.db.models.deletion
+
+
+KEY_FIELDS = ("region_id", "district_id", "school_id", "gender", "age_group", "disability_status")
+COUNTERS = {
+    "reporting": "reporting_violence",
+    "experienced_vac": "experienced_vac",
+    "knowledge_on_violence": "knowledge_on_violence",
+}
+
+
+def build_rollups(apps, schema_editor):
+    RespondentRollup = apps.get_model("data_collection", "RespondentRollup")
+    RespondentRollup.objects.all().delete()
+    for model_name in ("Student", "Teacher", "Parent"):
+        model = apps.get_model("data_collection", model_name)
+        names = {f.name for f in model._meta.get_fields()}
+        annotations = {}
+        if "disability_status" not in names:
+            annotations["disability_status"] = Value(False, output_field=BooleanField())
+        counters = {"total": Count("id")}
+        for counter, field in COUNTERS.items():
+            if field in names:
+                counters[counter] = Count("id", filter=Q(**{field: True}))
+            else:
+                counters[counter] = Value(0, output_field=IntegerField())
+        rows = model.objects.order_by().annotate(**annotations).values(*KEY_FIELDS).annotate(**counters)
+        RespondentRollup.objects.bulk_create(
+            [RespondentRollup(respondent_type=model_name.lower(), **row) for row in rows], batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0008_places_backfill'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='student',
+            name='region',
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='region_ref',
+            new_name='region',
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='district',
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='district_ref',
+            new_name='district',
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='school',
+        ),
+        migrations.RenameField(
+            model_name='student',
+            old_name='school_ref',
+            new_name='school',
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['region', 'district', 'school'], name='student_hierarchy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['gender'], name='student_gender_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='teacher',
+            name='region',
+        ),
+        migrations.RenameField(
+            model_name='teacher',
+            old_name='region_ref',
+            new_name='region',
+        ),
+        migrations.RemoveField(
+            model_name='teacher',
+            name='district',
+        ),
+        migrations.RenameField(
+            model_name='teacher',
+            old_name='district_ref',
+            new_name='district',
+        ),
+        migrations.RemoveField(
+            model_name='teacher',
+            name='school',
+        ),
+        migrations.RenameField(
+            model_name='teacher',
+            old_name='school_ref',
+            new_name='school',
+        ),
+        migrations.AlterField(
+            model_name='teacher',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['region', 'district', 'school'], name='teacher_hierarchy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['gender'], name='teacher_gender_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='parent',
+            name='region',
+        ),
+        migrations.RenameField(
+            model_name='parent',
+            old_name='region_ref',
+            new_name='region',
+        ),
+        migrations.RemoveField(
+            model_name='parent',
+            name='district',
+        ),
+        migrations.RenameField(
+            model_name='parent',
+            old_name='district_ref',
+            new_name='district',
+        ),
+        migrations.RemoveField(
+            model_name='parent',
+            name='school',
+        ),
+        migrations.RenameField(
+            model_name='parent',
+            old_name='school_ref',
+            new_name='school',
+        ),
+        migrations.AlterField(
+            model_name='parent',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['region', 'district', 'school'], name='parent_hierarchy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['gender'], name='parent_gender_idx'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='respondentrollup',
+            name='unique_rollup_cell',
+        ),
+        migrations.RemoveIndex(
+            model_name='respondentrollup',
+            name='data_collec_respond_5a3089_idx',
+        ),
+        migrations.RemoveField(
+            model_name='respondentrollup',
+            name='region',
+        ),
+        migrations.RemoveField(
+            model_name='respondentrollup',
+            name='district',
+        ),
+        migrations.RemoveField(
+            model_name='respondentrollup',
+            name='school',
+        ),
+        migrations.AddField(
+            model_name='respondentrollup',
+            name='region',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data_collection.region'),
+        ),
+        migrations.AddField(
+            model_name='respondentrollup',
+            name='district',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data_collection.district'),
+        ),
+        migrations.AddField(
+            model_name='respondentrollup',
+            name='school',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data_collection.school'),
+        ),
+        migrations.AlterField(
+            model_name='respondentrollup',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='respondentrollup',
+            index=models.Index(fields=['respondent_type', 'school'], name='data_collec_respond_8c450d_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='respondentrollup',
+            constraint=models.UniqueConstraint(fields=('respondent_type', 'region', 'district', 'school', 'gender', 'age_group', 'disability_status'), name='unique_rollup_cell'),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
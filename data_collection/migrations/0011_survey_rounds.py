@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0010_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyRound',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('started_on', models.DateField(default=django.utils.timezone.localdate)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['started_on', 'pk'],
+            },
+        ),
+        migrations.AddField(
+            model_name='parent',
+            name='collected_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='collected_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='collected_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RoundSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('respondent_type', models.CharField(max_length=20)),
+                ('gender', models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female')], max_length=20)),
+                ('age_group', models.CharField(blank=True, max_length=50)),
+                ('disability_status', models.BooleanField(default=False)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('reporting', models.PositiveIntegerField(default=0)),
+                ('experienced_vac', models.PositiveIntegerField(default=0)),
+                ('knowledge_on_violence', models.PositiveIntegerField(default=0)),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data_collection.district')),
+                ('region', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data_collection.region')),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data_collection.school')),
+                ('survey_round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='data_collection.surveyround')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='survey_round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='data_collection.surveyround'),
+        ),
+        migrations.AddField(
+            model_name='parent',
+            name='survey_round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.surveyround'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='survey_round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.surveyround'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='survey_round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='data_collection.surveyround'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0012_respondent_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='parent',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female'), ('Other', 'Other')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='respondentrollup',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female'), ('Other', 'Other')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='roundsnapshot',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female'), ('Other', 'Other')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female'), ('Other', 'Other')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='teacher',
+            name='gender',
+            field=models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female'), ('Other', 'Other')], max_length=20),
+        ),
+    ]
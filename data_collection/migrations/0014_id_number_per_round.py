@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0013_gender_other'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='parent',
+            name='id_number',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='id_number',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='teacher',
+            name='id_number',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='parent',
+            constraint=models.UniqueConstraint(fields=('id_number', 'survey_round'), name='unique_parent_per_round'),
+        ),
+        migrations.AddConstraint(
+            model_name='student',
+            constraint=models.UniqueConstraint(fields=('id_number', 'survey_round'), name='unique_student_per_round'),
+        ),
+        migrations.AddConstraint(
+            model_name='teacher',
+            constraint=models.UniqueConstraint(fields=('id_number', 'survey_round'), name='unique_teacher_per_round'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:05
+
+import os
+
+import data_collection.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def move_uploads(apps, schema_editor):
+    """Move queued workbooks out of MEDIA_ROOT; those already processed are deleted."""
+    ImportJob = apps.get_model("data_collection", "ImportJob")
+    storage = data_collection.models.import_storage()
+    for job in ImportJob.objects.exclude(file=""):
+        old_path = os.path.join(settings.MEDIA_ROOT, job.file.name)
+        if job.status == "pending" and os.path.exists(old_path):
+            with open(old_path, "rb") as f:
+                job.file.name = storage.save(data_collection.models.import_upload_to(job, job.file.name), f)
+        else:
+            job.file.name = ""
+        job.save(update_fields=["file"])
+        if os.path.exists(old_path):
+            os.remove(old_path)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0014_id_number_per_round'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importjob',
+            name='file',
+            field=models.FileField(blank=True, storage=data_collection.models.import_storage, upload_to=data_collection.models.import_upload_to),
+        ),
+        migrations.RunPython(move_uploads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0015_importjob_private_file'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='parent',
+            constraint=models.UniqueConstraint(condition=models.Q(('survey_round__isnull', True)), fields=('id_number',), name='unique_parent_without_round'),
+        ),
+        migrations.AddConstraint(
+            model_name='student',
+            constraint=models.UniqueConstraint(condition=models.Q(('survey_round__isnull', True)), fields=('id_number',), name='unique_student_without_round'),
+        ),
+        migrations.AddConstraint(
+            model_name='teacher',
+            constraint=models.UniqueConstraint(condition=models.Q(('survey_round__isnull', True)), fields=('id_number',), name='unique_teacher_without_round'),
+        ),
+    ]
@@ -1,13 +1,113 @@
+import os
+import uuid
+
 from django.db import models
+from django.db.models import Q
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.utils import timezone
 
 
+class Tag(models.Model):
+    """
+    One distinct answer to a multi-select question (forms_of_violence,
+    perpetrators, vulnerable_places). Respondents link to their answers
+    through the ``tags`` many-to-many field so frequencies are indexed
+    counts on the link tables rather than re-splitting the text fields.
+    """
+    CATEGORY_CHOICES = [
+        ("forms_of_violence", "Form of Violence"),
+        ("perpetrators", "Perpetrator"),
+        ("vulnerable_places", "Vulnerable Place"),
+    ]
+
+    category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
+    name = models.CharField(max_length=200)
+
+    class Meta:
+        ordering = ["category", "name"]
+        constraints = [
+            models.UniqueConstraint(fields=["category", "name"], name="unique_tag_per_category"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_category_display()}: {self.name}"
+
+
+class Region(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class District(models.Model):
+    region = models.ForeignKey(Region, null=True, blank=True, on_delete=models.PROTECT, related_name="districts")
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["region", "name"], name="unique_district_per_region"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class School(models.Model):
+    district = models.ForeignKey(District, null=True, blank=True, on_delete=models.PROTECT, related_name="schools")
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["district", "name"], name="unique_school_per_district"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class SurveyRound(models.Model):
+    """
+    A data collection round, e.g. baseline, midline or endline.
+
+    Respondents imported while a round is open are stamped with it. Closing
+    a round freezes its counts into RoundSnapshot rows (see
+    data_collection.rounds), so later comparisons read those instead of
+    the respondent tables.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    started_on = models.DateField(default=timezone.localdate)
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["started_on", "pk"]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def is_closed(self):
+        return self.closed_at is not None
+
+
+class Gender(models.TextChoices):
+    MALE = "Male", "Male"
+    FEMALE = "Female", "Female"
+    OTHER = "Other", "Other"   # any other answer; blank when none was given
+
+
 class Student(models.Model):
-    id_number = models.CharField(max_length=50, unique=True, null=True, blank=True)   # custom unique ID
-    region = models.CharField(max_length=100, blank=True)
-    district = models.CharField(max_length=100, blank=True)
-    school = models.CharField(max_length=100, blank=True)
-    gender = models.CharField(max_length=20, blank=True)
+    id_number = models.CharField(max_length=50, null=True, blank=True)   # unique within a survey round
+    region = models.ForeignKey(Region, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    district = models.ForeignKey(District, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    school = models.ForeignKey(School, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    gender = models.CharField(max_length=20, choices=Gender.choices, blank=True)
     age_group = models.CharField(max_length=50, blank=True)
     disability_status = models.BooleanField(default=False)
     knowledge_on_violence = models.BooleanField(default=False)
@@ -17,7 +117,29 @@ class Student(models.Model):
     vulnerable_places = models.TextField(blank=True)
     reporting_violence = models.BooleanField(default=False)
     effectiveness_reporting_system = models.CharField(max_length=200, blank=True)  # Effectiveness of Reporting System
+    survey_round = models.ForeignKey(SurveyRound, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    collected_on = models.DateField(null=True, blank=True)   # date the row was imported
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)   # last write, for incremental backups
+    tags = models.ManyToManyField(Tag, blank=True, editable=False, related_name="students")  # split multi-select answers
 
+    class Meta:
+        indexes = [
+            # region -> district -> school filters; district and school have their own FK indexes
+            models.Index(fields=["region", "district", "school"], name="student_hierarchy_idx"),
+            models.Index(fields=["age_group"], name="student_age_group_idx"),
+            models.Index(fields=["gender"], name="student_gender_idx"),
+            models.Index(fields=["experienced_vac", "gender"], name="student_vac_gender_idx"),
+            models.Index(fields=["disability_status", "experienced_vac"], name="student_disability_idx"),
+            models.Index(fields=["reporting_violence"], name="student_reporting_idx"),
+        ]
+        constraints = [
+            # imports add a row per respondent and round, so earlier rounds keep their answers
+            models.UniqueConstraint(fields=["id_number", "survey_round"], name="unique_student_per_round"),
+            # NULLs never compare equal, so rows without a round need their own constraint
+            models.UniqueConstraint(
+                fields=["id_number"], condition=Q(survey_round__isnull=True), name="unique_student_without_round"
+            ),
+        ]
     
 
     def __str__(self):
@@ -25,11 +147,11 @@ class Student(models.Model):
 
 
 class Teacher(models.Model):
-    id_number = models.CharField(max_length=50, unique=True, null=True, blank=True)  # custom unique ID
-    region = models.CharField(max_length=100, blank=True)
-    district = models.CharField(max_length=100, blank=True)
-    school = models.CharField(max_length=100, blank=True)
-    gender = models.CharField(max_length=20, blank=True)
+    id_number = models.CharField(max_length=50, null=True, blank=True)   # unique within a survey round
+    region = models.ForeignKey(Region, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    district = models.ForeignKey(District, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    school = models.ForeignKey(School, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    gender = models.CharField(max_length=20, choices=Gender.choices, blank=True)
     age_group = models.CharField(max_length=50, blank=True)
     marital_status = models.CharField(max_length=50, blank=True)
     education_level = models.CharField(max_length=100, blank=True)
@@ -41,17 +163,36 @@ class Teacher(models.Model):
     right_to_discipline_child = models.BooleanField(default=False)
     effective_handling_vac = models.CharField(max_length=200, blank=True)
     training_received = models.CharField(max_length=200, blank=True)
+    survey_round = models.ForeignKey(SurveyRound, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    collected_on = models.DateField(null=True, blank=True)   # date the row was imported
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)   # last write, for incremental backups
+    tags = models.ManyToManyField(Tag, blank=True, editable=False, related_name="teachers")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["region", "district", "school"], name="teacher_hierarchy_idx"),
+            models.Index(fields=["age_group"], name="teacher_age_group_idx"),
+            models.Index(fields=["gender"], name="teacher_gender_idx"),
+            models.Index(fields=["education_level"], name="teacher_education_idx"),
+            models.Index(fields=["reporting_violence"], name="teacher_reporting_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["id_number", "survey_round"], name="unique_teacher_per_round"),
+            models.UniqueConstraint(
+                fields=["id_number"], condition=Q(survey_round__isnull=True), name="unique_teacher_without_round"
+            ),
+        ]
 
     def __str__(self):
         return f"Teacher {self.id_number} - {self.region}/{self.school}"
 
 
 class Parent(models.Model):
-    id_number = models.CharField(max_length=50, unique=True, null=True, blank=True)
-    region = models.CharField(max_length=100, blank=True)
-    district = models.CharField(max_length=100, blank=True)
-    school = models.CharField(max_length=100, blank=True)
-    gender = models.CharField(max_length=20, blank=True)
+    id_number = models.CharField(max_length=50, null=True, blank=True)   # unique within a survey round
+    region = models.ForeignKey(Region, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    district = models.ForeignKey(District, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    school = models.ForeignKey(School, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    gender = models.CharField(max_length=20, choices=Gender.choices, blank=True)
     age_group = models.CharField(max_length=50, blank=True)
     marital_status = models.CharField(max_length=50, blank=True)
     education_level = models.CharField(max_length=100, blank=True)
@@ -67,6 +208,145 @@ class Parent(models.Model):
     child_comforting = models.BooleanField(default=False)
     impose_rules_to_child = models.BooleanField(default=False)
     set_rules_with_child = models.BooleanField(default=False)
+    survey_round = models.ForeignKey(SurveyRound, null=True, blank=True, on_delete=models.PROTECT, related_name="+")
+    collected_on = models.DateField(null=True, blank=True)   # date the row was imported
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)   # last write, for incremental backups
+    tags = models.ManyToManyField(Tag, blank=True, editable=False, related_name="parents")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["region", "district", "school"], name="parent_hierarchy_idx"),
+            models.Index(fields=["age_group"], name="parent_age_group_idx"),
+            models.Index(fields=["gender"], name="parent_gender_idx"),
+            models.Index(fields=["employment"], name="parent_employment_idx"),
+            models.Index(fields=["reporting_violence"], name="parent_reporting_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["id_number", "survey_round"], name="unique_parent_per_round"),
+            models.UniqueConstraint(
+                fields=["id_number"], condition=Q(survey_round__isnull=True), name="unique_parent_without_round"
+            ),
+        ]
 
     def __str__(self):
         return f"Parent {self.id_number} - {self.region}/{self.school}"
+
+
+def import_storage():
+    """Private storage for uploaded workbooks (IMPORT_UPLOAD_DIR, not served like MEDIA_ROOT)."""
+    return FileSystemStorage(location=settings.IMPORT_UPLOAD_DIR, base_url=None)
+
+
+def import_upload_to(instance, filename):
+    # A random name: the original one is kept on the job, not on disk
+    return f"{uuid.uuid4().hex}{os.path.splitext(filename)[1].lower()}"
+
+
+class ImportJob(models.Model):
+    """An uploaded workbook waiting for, or being processed by, the import worker."""
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    file = models.FileField(upload_to=import_upload_to, storage=import_storage, blank=True)   # removed once processed
+    original_name = models.CharField(max_length=255, blank=True)
+    uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    survey_round = models.ForeignKey(SurveyRound, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True)
+    progress = models.JSONField(default=dict, blank=True)   # {"students": {"processed": 1000, "total": 40000}, ...}
+    summary = models.JSONField(default=dict, blank=True)    # per-sheet inserted/updated/rejected
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Import {self.pk} ({self.status}) - {self.original_name}"
+
+    @property
+    def rows_processed(self):
+        return sum(sheet.get("processed", 0) for sheet in self.progress.values())
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return 0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else 0
+
+
+
+class RollupCell(models.Model):
+    """
+    Respondent counts for one cell of
+    (respondent type, region, district, school, gender, age group, disability).
+    """
+    respondent_type = models.CharField(max_length=20)   # "student", "teacher" or "parent"
+    region = models.ForeignKey(Region, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    district = models.ForeignKey(District, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    school = models.ForeignKey(School, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    gender = models.CharField(max_length=20, choices=Gender.choices, blank=True)
+    age_group = models.CharField(max_length=50, blank=True)
+    disability_status = models.BooleanField(default=False)
+
+    total = models.PositiveIntegerField(default=0)
+    reporting = models.PositiveIntegerField(default=0)              # reporting_violence
+    experienced_vac = models.PositiveIntegerField(default=0)        # students only
+    knowledge_on_violence = models.PositiveIntegerField(default=0)  # students only
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.respondent_type} {self.region_id}/{self.district_id}/{self.school_id} {self.gender} {self.age_group}: {self.total}"
+
+
+class RespondentRollup(RollupCell):
+    """
+    Pre-aggregated respondent counts for one cell, over all respondents.
+
+    Kept up to date by data_collection.rollups so the dashboards can sum a
+    few hundred cells instead of scanning every respondent.
+    """
+    class Meta:
+        indexes = [
+            models.Index(fields=["respondent_type", "school"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["respondent_type", "region", "district", "school", "gender", "age_group", "disability_status"],
+                name="unique_rollup_cell",
+            ),
+        ]
+
+
+class DataVersion(models.Model):
+    """
+    Single row whose ``version`` goes up whenever respondent data changes
+    (import batch, admin edit or delete, restore). Anything derived from the
+    data, such as cached export files, is keyed on it.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Data version {self.version} ({self.changed_at:%Y-%m-%d %H:%M})"
+
+
+class RoundSnapshot(RollupCell):
+    """
+    The counts of one closed SurveyRound, per rollup cell.
+
+    Written once by data_collection.rounds.close_round; baseline versus
+    endline comparisons sum these few rows instead of rescanning respondents.
+    """
+    survey_round = models.ForeignKey(SurveyRound, on_delete=models.CASCADE, related_name="snapshots")
+
+    def __str__(self):
+        return f"{self.survey_round} {super().__str__()}"
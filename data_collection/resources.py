@@ -1,7 +1,38 @@
-from import_export import resources
-from .models import Student, Teacher, Parent
+from import_export import fields, resources
+from import_export.widgets import ForeignKeyWidget
+from .canonical import PLACE_FIELDS, resolve_places
+from .models import Student, Teacher, Parent, Region, District, School
 
-class StudentResource(resources.ModelResource):
+
+class PlaceWidget(ForeignKeyWidget):
+    """Exports the place's name; on import the cell holds the id resolve_places found for it."""
+    def __init__(self, model):
+        super().__init__(model, "pk")
+
+    def render(self, value, obj=None):
+        return value.name if value else ""
+
+
+class PlaceResource(resources.ModelResource):
+    # region/district/school are exported and imported by name rather than id
+    region = fields.Field(attribute='region', column_name='region', widget=PlaceWidget(Region))
+    district = fields.Field(attribute='district', column_name='district', widget=PlaceWidget(District))
+    school = fields.Field(attribute='school', column_name='school', widget=PlaceWidget(School))
+
+    def before_import(self, dataset, using_transactions, dry_run, **kwargs):
+        # District and school names are only unique within their region / district,
+        # so the whole triple is resolved (creating new places) as the Excel importer does
+        columns = [dataset[field] if field in dataset.headers else [""] * dataset.height for field in PLACE_FIELDS]
+        self.places = resolve_places(zip(*columns))
+        super().before_import(dataset, using_transactions, dry_run, **kwargs)
+
+    def before_import_row(self, row, row_number=None, **kwargs):
+        ids = self.places[tuple(row.get(field, "") for field in PLACE_FIELDS)]
+        for field, pk in zip(PLACE_FIELDS, ids):
+            row[field] = pk
+        super().before_import_row(row, row_number, **kwargs)
+
+class StudentResource(PlaceResource):
     class Meta:
         model = Student
         fields = ('region', 'district', 'school', 'gender', 'age_group',
@@ -10,7 +41,7 @@ class StudentResource(resources.ModelResource):
                   'vulnerable_places', 'reporting_violence')
         import_id_fields = ('region', 'district', 'school')
 
-class TeacherResource(resources.ModelResource):
+class TeacherResource(PlaceResource):
     class Meta:
         model = Teacher
         fields = ('region', 'district', 'school', 'gender', 'age_group',
@@ -18,7 +49,7 @@ class TeacherResource(resources.ModelResource):
                   'forms_of_violence', 'reporting_violence', 'vulnerable_places')
         import_id_fields = ('region', 'district', 'school')
 
-class ParentResource(resources.ModelResource):
+class ParentResource(PlaceResource):
     class Meta:
         model = Parent
         fields = ('region', 'district', 'school', 'gender', 'age_group',
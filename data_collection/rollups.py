@@ -0,0 +1,133 @@
+"""
+Maintains and reads the RespondentRollup table.
+
+Cells are refreshed per school: the affected schools are recounted from
+the raw tables with one GROUP BY and their rollup rows replaced. Imports
+refresh the schools they touched, admin saves/deletes refresh the
+instance's old and new school, and ``rebuild_rollups`` recounts everything.
+Schools are passed around by id; None stands for respondents without one.
+"""
+from django.db import transaction
+from django.db.models import BooleanField, Count, IntegerField, Q, Sum, Value
+
+from .aggregates import RESPONDENT_MODELS
+from .canonical import place_label
+from .models import RespondentRollup
+
+
+KEY_FIELDS = ("region_id", "district_id", "school_id", "gender", "age_group", "disability_status")
+
+# rollup counter -> boolean field on the respondent model
+COUNTERS = {
+    "reporting": "reporting_violence",
+    "experienced_vac": "experienced_vac",
+    "knowledge_on_violence": "knowledge_on_violence",
+}
+
+SUM_FIELDS = ("total",) + tuple(COUNTERS)
+
+
+def has_field(model, name):
+    return any(f.name == name for f in model._meta.get_fields())
+
+
+def in_schools(schools):
+    """Q matching the given school ids, with None matching rows that have no school."""
+    q = Q(school__in=[school for school in schools if school is not None])
+    if None in schools:
+        q |= Q(school__isnull=True)
+    return q
+
+
+def count_cells(model, queryset, cell_model=RespondentRollup, **extra):
+    """
+    Group ``queryset`` into rollup cells for ``model``.
+
+    Cells are ``cell_model`` instances (RoundSnapshot for a closed survey
+    round) with ``extra`` set on each, e.g. ``survey_round=...``.
+    """
+    annotations = {}
+    if not has_field(model, "disability_status"):
+        annotations["disability_status"] = Value(False, output_field=BooleanField())
+    counters = {"total": Count("id")}
+    for counter, field in COUNTERS.items():
+        if has_field(model, field):
+            counters[counter] = Count("id", filter=Q(**{field: True}))
+        else:
+            counters[counter] = Value(0, output_field=IntegerField())
+
+    rows = queryset.order_by().annotate(**annotations).values(*KEY_FIELDS).annotate(**counters)
+    respondent_type = model._meta.model_name
+    return [cell_model(respondent_type=respondent_type, **extra, **row) for row in rows]
+
+
+def refresh_schools(model, schools):
+    """Recount every rollup cell of ``model`` belonging to one of the ``schools`` ids."""
+    schools = list(set(schools))
+    if not schools:
+        return
+    respondent_type = model._meta.model_name
+    with transaction.atomic():
+        cells = count_cells(model, model.objects.filter(in_schools(schools)))
+        RespondentRollup.objects.filter(in_schools(schools), respondent_type=respondent_type).delete()
+        RespondentRollup.objects.bulk_create(cells, batch_size=1000)
+
+
+def rebuild_all():
+    with transaction.atomic():
+        RespondentRollup.objects.all().delete()
+        for _, model in RESPONDENT_MODELS:
+            RespondentRollup.objects.bulk_create(count_cells(model, model.objects.all()), batch_size=1000)
+
+
+# -------------------------------
+# Readers
+# -------------------------------
+def summary(**filters):
+    """
+    Totals per respondent type, e.g.
+    {"student": {"total": 120, "reporting": 30, "experienced_vac": 40, ...}, "teacher": {...}, ...}
+
+    ``filters`` are applied to the rollup cells, e.g. ``gender="Female"``.
+    """
+    return summarize(RespondentRollup.objects.filter(**filters))
+
+
+def summarize(cells):
+    """``summary`` for any queryset of rollup cells (RespondentRollup or RoundSnapshot)."""
+    result = {role: dict.fromkeys(SUM_FIELDS, 0) for role, _ in RESPONDENT_MODELS}
+    rows = (
+        cells.order_by()
+        .values("respondent_type")
+        .annotate(**{name: Sum(name) for name in SUM_FIELDS})
+    )
+    for row in rows:
+        result[row["respondent_type"]].update({name: row[name] or 0 for name in SUM_FIELDS})
+    return result
+
+
+def breakdown(field, respondent_type=None, **filters):
+    """
+    Rollup counters summed per value of ``field``, optionally for one respondent type.
+
+    Rows look like {field: "Female", "count": 10, "reporting": 4, ...}.
+    """
+    qs = RespondentRollup.objects.filter(**filters)
+    if respondent_type:
+        qs = qs.filter(respondent_type=respondent_type)
+    return list(
+        qs.order_by(field).values(field)
+        .annotate(count=Sum("total"), **{name: Sum(name) for name in COUNTERS})
+    )
+
+
+def counts_by(field):
+    """Respondents per value of ``field`` (names for region/district/school), one count per respondent type."""
+    label = place_label(field)
+    rows = {}
+    for row in RespondentRollup.objects.order_by().values(label, "respondent_type").annotate(count=Sum("total")):
+        value = row[label]
+        if value not in rows:
+            rows[value] = {field: value, **{f"{r}_count": 0 for r, _ in RESPONDENT_MODELS}}
+        rows[value][f"{row['respondent_type']}_count"] = row["count"]
+    return sorted(rows.values(), key=lambda row: row[field] or "")
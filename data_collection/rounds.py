@@ -0,0 +1,55 @@
+"""
+Survey rounds (baseline, midline, endline, ...).
+
+Imports stamp every row they write with the open round and the import
+date. ``close_round`` then counts that round's respondents once, into
+RoundSnapshot cells shaped like the rollup table, and marks the round
+closed. Round-to-round comparisons sum those cells; they never go back to
+the respondent tables, which later imports keep changing.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .aggregates import RESPONDENT_MODELS
+from .models import SurveyRound, RoundSnapshot
+from .rollups import count_cells, summarize
+
+
+def open_round():
+    """The most recently started round that is not closed yet, or None."""
+    return SurveyRound.objects.filter(closed_at__isnull=True).order_by("-started_on", "-pk").first()
+
+
+def close_round(survey_round):
+    """Store the snapshot cells of ``survey_round`` and mark it closed."""
+    with transaction.atomic():
+        RoundSnapshot.objects.filter(survey_round=survey_round).delete()
+        for _, model in RESPONDENT_MODELS:
+            cells = count_cells(
+                model, model.objects.filter(survey_round=survey_round),
+                cell_model=RoundSnapshot, survey_round=survey_round,
+            )
+            RoundSnapshot.objects.bulk_create(cells, batch_size=1000)
+        survey_round.closed_at = timezone.now()
+        survey_round.save(update_fields=["closed_at"])
+
+
+def round_summary(survey_round, **filters):
+    """``rollups.summary`` for one closed round, read from its snapshot cells."""
+    return summarize(RoundSnapshot.objects.filter(survey_round=survey_round, **filters))
+
+
+def compare(baseline, endline, **filters):
+    """
+    Counters of two closed rounds side by side, per respondent type:
+    {"student": {"total": {"baseline": 100, "endline": 120, "change": 20}, ...}, ...}
+    """
+    before = round_summary(baseline, **filters)
+    after = round_summary(endline, **filters)
+    return {
+        role: {
+            name: {"baseline": value, "endline": after[role][name], "change": after[role][name] - value}
+            for name, value in counters.items()
+        }
+        for role, counters in before.items()
+    }
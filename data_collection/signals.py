@@ -0,0 +1,70 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .canonical import canonical_age_group, canonical_gender
+from .models import Student, Teacher, Parent, Region, District, School
+from .rollups import refresh_schools
+from .tags import sync_tags
+from .versioning import bump_version
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Teacher)
+@receiver(pre_save, sender=Parent)
+def canonicalize_answers(sender, instance, raw=False, **kwargs):
+    # Admin edits are stored in the same spelling the importer writes
+    if raw:
+        return
+    instance.gender = canonical_gender(instance.gender)
+    instance.age_group = canonical_age_group(instance.age_group)
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Teacher)
+@receiver(pre_save, sender=Parent)
+def remember_old_school(sender, instance, raw=False, **kwargs):
+    # The rollup cells of the school a respondent moves away from need a recount too
+    instance.__dict__.pop("_old_school", None)
+    if raw or instance.pk is None:
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list("school", flat=True)
+    if old:
+        instance._old_school = old[0]
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_save, sender=Parent)
+def respondent_saved(sender, instance, raw=False, **kwargs):
+    # Fixture loads (restore) rebuild tags and rollups in one go afterwards
+    if raw:
+        return
+    sync_tags(sender, [instance.pk])
+    schools = {instance.school_id}
+    if hasattr(instance, "_old_school"):
+        schools.add(instance._old_school)
+    refresh_schools(sender, schools)
+    bump_version()
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_delete, sender=Parent)
+def respondent_deleted(sender, instance, **kwargs):
+    refresh_schools(sender, [instance.school_id])
+    bump_version()
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_save, sender=District)
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=Region)
+@receiver(post_delete, sender=District)
+@receiver(post_delete, sender=School)
+def place_changed(sender, raw=False, **kwargs):
+    # Renamed / moved places show up in the reports and the filter options
+    # (imports create places with bulk_create and bump the version themselves)
+    if raw:
+        return
+    bump_version()
+
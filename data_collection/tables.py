@@ -0,0 +1,189 @@
+"""
+Respondent tables served page by page as JSON (data list, data collection report).
+
+Pages are cut with keyset ("seek") pagination: rows are ordered on an
+indexed column plus the primary key, and the next page starts after the
+last row of the previous one (the cursor) instead of at an OFFSET. No
+COUNT(*) is needed, so every page costs the same at any depth. Only
+indexed columns are sortable; column search narrows the rows with
+prefix / exact matches.
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import F, Q
+
+from .canonical import gender_choice
+from .models import Student, Teacher, Parent
+
+
+PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+
+class Column:
+    """
+    One table column.
+
+    ``sortable`` is only set on indexed fields. ``search`` is the lookup
+    used for the column's search box ("istartswith", "exact", "bool"), or
+    None when the column cannot be searched.
+    """
+    def __init__(self, key, label, field=None, sortable=False, search=None):
+        self.key = key
+        self.label = label
+        self.field = field or key
+        self.sortable = sortable
+        self.search = search
+
+    def as_dict(self):
+        return {"key": self.key, "label": self.label, "sortable": self.sortable, "searchable": self.search is not None}
+
+    def condition(self, term):
+        """Q for this column's search box, or None when ``term`` cannot match anything sensible."""
+        if self.search == "bool":
+            value = {"yes": True, "no": False}.get(term.strip().lower())
+            return None if value is None else Q(**{self.field: value})
+        if self.key == "gender":
+            term = gender_choice(term) or term
+        return Q(**{f"{self.field}__{self.search}": term})
+
+
+def cell(value):
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return "" if value is None else value
+
+
+IDENTIFICATION = [
+    Column("id_number", "ID Number", sortable=True, search="istartswith"),
+    Column("region", "Region", "region__name", search="istartswith"),
+    Column("district", "District", "district__name", search="istartswith"),
+    Column("school", "School", "school__name", search="istartswith"),
+    Column("gender", "Gender", sortable=True, search="exact"),
+    Column("age_group", "Age Group", sortable=True, search="istartswith"),
+]
+
+TABLES = {
+    "students": (Student, IDENTIFICATION + [
+        Column("disability_status", "Disability", search="bool"),
+        Column("knowledge_on_violence", "Knowledge on Violence", search="bool"),
+        Column("experienced_vac", "Experienced VAC", search="bool"),
+        Column("forms_of_violence", "Forms of Violence", search="icontains"),
+        Column("perpetrators", "Perpetrators", search="icontains"),
+        Column("vulnerable_places", "Vulnerable Places", search="icontains"),
+        Column("reporting_violence", "Reporting Violence", search="bool"),
+        Column("effectiveness_reporting_system", "Effectiveness of Reporting System"),
+    ]),
+    "teachers": (Teacher, IDENTIFICATION + [
+        Column("marital_status", "Marital Status"),
+        Column("education_level", "Education Level", sortable=True, search="istartswith"),
+        Column("forms_of_violence", "Forms of Violence", search="icontains"),
+        Column("reporting_violence", "Reporting Violence", search="bool"),
+        Column("vulnerable_places", "Vulnerable Places", search="icontains"),
+        Column("right_to_discipline_child", "Right to Discipline Child", search="bool"),
+        Column("effective_handling_vac", "Effective Handling VAC"),
+        Column("training_received", "Training Received"),
+    ]),
+    "parents": (Parent, IDENTIFICATION + [
+        Column("marital_status", "Marital Status"),
+        Column("education_level", "Education Level"),
+        Column("employment", "Employment", sortable=True, search="istartswith"),
+        Column("forms_of_violence", "Forms of Violence", search="icontains"),
+        Column("reporting_violence", "Reporting Violence", search="bool"),
+        Column("vulnerable_places", "Vulnerable Places", search="icontains"),
+        Column("physical_punishment", "Physical Punishment", search="bool"),
+        Column("believe_in_child_punishment", "Believe in Child Punishment", search="bool"),
+        Column("effectiveness_positive_punishment", "Effectiveness Positive Punishment"),
+        Column("child_comforting", "Child Comforting", search="bool"),
+        Column("impose_rules_to_child", "Impose Rules to Child", search="bool"),
+        Column("set_rules_with_child", "Set Rules with Child", search="bool"),
+    ]),
+}
+
+
+class TableError(ValueError):
+    """Bad table request parameters (unknown column, sort or cursor)."""
+
+
+def encode_cursor(value, pk):
+    return base64.urlsafe_b64encode(json.dumps([value, pk]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise TableError("Invalid cursor.")
+    if not isinstance(pk, int):
+        raise TableError("Invalid cursor.")
+    return value, pk
+
+
+def after(field, descending, value, pk):
+    """Q for the rows that come after (``value``, ``pk``) in the table order."""
+    if descending:
+        # value DESC NULLS LAST, pk DESC
+        if value is None:
+            return Q(**{f"{field}__isnull": True, "pk__lt": pk})
+        return Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk}) | Q(**{f"{field}__isnull": True})
+    # value ASC NULLS FIRST, pk ASC
+    if value is None:
+        return Q(**{f"{field}__isnull": True, "pk__gt": pk}) | Q(**{f"{field}__isnull": False})
+    return Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+
+
+def page(table, sort="", cursor=None, search=None, limit=PAGE_SIZE):
+    """
+    One page of ``table`` as {"columns": [...], "rows": [[...], ...], "next": cursor or None}.
+
+    ``sort`` is a sortable column key, "-" prefixed for descending (default:
+    import order). ``search`` maps column keys to search terms.
+    """
+    if table not in TABLES:
+        raise TableError(f"Unknown table {table!r}.")
+    model, columns = TABLES[table]
+    by_key = {column.key: column for column in columns}
+
+    descending = sort.startswith("-")
+    sort_key = sort.lstrip("-")
+    if sort_key and not (sort_key in by_key and by_key[sort_key].sortable):
+        raise TableError(f"Cannot sort on {sort_key!r}.")
+    field = by_key[sort_key].field if sort_key else "pk"
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+
+    queryset = model.objects.all()
+    for key, term in (search or {}).items():
+        if key not in by_key or by_key[key].search is None:
+            raise TableError(f"Cannot search on {key!r}.")
+        if term:
+            condition = by_key[key].condition(term)
+            queryset = queryset.filter(condition) if condition is not None else queryset.none()
+
+    if field == "pk":
+        queryset = queryset.order_by("-pk" if descending else "pk")
+    elif descending:
+        queryset = queryset.order_by(F(field).desc(nulls_last=True), "-pk")
+    else:
+        queryset = queryset.order_by(F(field).asc(nulls_first=True), "pk")
+
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        if field == "pk":
+            queryset = queryset.filter(pk__lt=pk) if descending else queryset.filter(pk__gt=pk)
+        else:
+            queryset = queryset.filter(after(field, descending, value, pk))
+
+    # One extra row tells whether there is a next page without counting
+    rows = list(queryset.values_list("pk", field, *(column.field for column in columns))[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+
+    return {
+        "columns": [column.as_dict() for column in columns],
+        "rows": [[cell(value) for value in row[2:]] for row in rows],
+        "next": next_cursor,
+    }
@@ -0,0 +1,123 @@
+"""
+Keeps the Tag links in step with the multi-select text fields.
+
+The comma-joined text fields stay the source of truth; a respondent's tags
+are rebuilt whenever that respondent is imported or saved. Deleting a
+respondent removes its links through the usual cascade.
+"""
+import re
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .aggregates import RESPONDENT_MODELS
+from .models import Tag
+
+
+MULTI_VALUE_FIELDS = ("forms_of_violence", "perpetrators", "vulnerable_places")
+
+TAG_MAX_LENGTH = Tag._meta.get_field("name").max_length
+
+
+def split_values(text):
+    """Split text fields by commas, semicolons, or slashes."""
+    if not text:
+        return []
+    return [re.sub(r"\s+", " ", val.strip().title())[:TAG_MAX_LENGTH] for val in re.split(r"[;,/]", text) if val.strip()]
+
+
+def multi_value_fields(model):
+    return [f.name for f in model._meta.get_fields() if f.name in MULTI_VALUE_FIELDS]
+
+
+def sync_tags(model, ids):
+    """Replace the tag links of the given respondents with ones split from their current answers."""
+    fields = multi_value_fields(model)
+    through = model.tags.through
+    owner = through._meta.get_field(model._meta.model_name).attname   # e.g. "student_id"
+
+    wanted = {}   # respondent pk -> {(category, name), ...}
+    for row in model.objects.filter(pk__in=list(ids)).values_list("pk", *fields):
+        wanted[row[0]] = {(field, value) for field, text in zip(fields, row[1:]) for value in split_values(text)}
+
+    keys = set().union(*wanted.values()) if wanted else set()
+    Tag.objects.bulk_create([Tag(category=c, name=n) for c, n in keys], ignore_conflicts=True)
+    tag_ids = {}
+    for category in {c for c, _ in keys}:
+        names = [n for c, n in keys if c == category]
+        for pk, name in Tag.objects.filter(category=category, name__in=names).values_list("pk", "name"):
+            tag_ids[(category, name)] = pk
+
+    through.objects.filter(**{f"{owner}__in": list(wanted)}).delete()
+    through.objects.bulk_create(
+        [through(**{owner: pk, "tag_id": tag_ids[key]}) for pk, pairs in wanted.items() for key in pairs],
+        batch_size=1000,
+    )
+
+
+def sync_all_tags():
+    """Rebuild every respondent's tag links, e.g. after a database restore."""
+    for _, model in RESPONDENT_MODELS:
+        ids = list(model.objects.values_list("pk", flat=True))
+        for start in range(0, len(ids), 1000):
+            sync_tags(model, ids[start:start + 1000])
+
+
+def tag_counts(category, models=None):
+    """
+    [(name, count), ...] for one multi-select question, most common first.
+
+    Counts respondents of every type unless ``models`` narrows it down
+    (e.g. ``[Student]``). Runs as a single query with one correlated
+    count per link table.
+    """
+    models = models or [model for _, model in RESPONDENT_MODELS]
+    total = Value(0, output_field=IntegerField())
+    for model in models:
+        through = model.tags.through
+        linked = (
+            through.objects.filter(tag=OuterRef("pk")).order_by()
+            .values("tag").annotate(n=Count("pk")).values("n")
+        )
+        total = total + Coalesce(Subquery(linked, output_field=IntegerField()), 0)
+
+    rows = (
+        Tag.objects.filter(category=category)
+        .annotate(count=total)
+        .filter(count__gt=0)
+        .order_by("-count", "name")
+        .values_list("name", "count")
+    )
+    return list(rows)
+
+
+def tag_counts_by(category, model, field):
+    """[(name, value of ``field``, count), ...] cross-tabulating one question against a respondent field."""
+    through = model.tags.through
+    owner = model._meta.model_name
+    rows = (
+        through.objects.filter(tag__category=category)
+        .values_list("tag__name", f"{owner}__{field}")
+        .annotate(count=Count("pk"))
+        .order_by("tag__name", f"{owner}__{field}")
+    )
+    return list(rows)
+
+
+def tag_counts_many(categories, model):
+    """
+    {category: [(name, count), ...]} for several multi-select questions of
+    one respondent type, most common first, in a single grouped pass over
+    its tag links.
+    """
+    through = model.tags.through
+    rows = (
+        through.objects.filter(tag__category__in=categories)
+        .values_list("tag__category", "tag__name")
+        .annotate(count=Count("pk"))
+        .order_by("tag__category", "-count", "tag__name")
+    )
+    counts = {category: [] for category in categories}
+    for category, name, count in rows:
+        counts[category].append((name, count))
+    return counts
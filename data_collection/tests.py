@@ -1,3 +1,354 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from openpyxl import Workbook
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, transaction
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from settings.models import CustomUser
+from .filters import FilterSpec
+from .models import Student, Teacher, ImportJob, Region, SurveyRound
+from . import geography, importer, jobs, tables
+from .versioning import bump_version
+
+
+class RespondentTablePagingTests(TestCase):
+    """Keyset pages must cover every row exactly once, in order, whatever the sort."""
+
+    # id_number: NULLs and ties; gender: ties only
+    ID_NUMBERS = [None, "B", "A", None, "C", "A", "B", None, "A", "C", "D"]
+
+    @classmethod
+    def setUpTestData(cls):
+        # A repeated id_number is the same respondent in a later round
+        rounds = [SurveyRound.objects.create(name=f"Round {n}") for n in range(3)]
+        Student.objects.bulk_create([
+            Student(id_number=id_number, gender="Male" if i % 3 else "Female", age_group="10-13",
+                    survey_round=rounds[cls.ID_NUMBERS[:i].count(id_number)],
+                    effectiveness_reporting_system=f"row-{i}")
+            for i, id_number in enumerate(cls.ID_NUMBERS)
+        ])
+
+    def walk(self, sort, limit=2):
+        """The marker column of every row, page by page, following the cursors."""
+        seen, cursor = [], None
+        while True:
+            data = tables.page("students", sort=sort, cursor=cursor, limit=limit)
+            self.assertLessEqual(len(data["rows"]), limit)
+            seen += [row[-1] for row in data["rows"]]
+            cursor = data["next"]
+            if cursor is None:
+                return seen
+
+    def expected(self, field, descending):
+        rows = list(Student.objects.values_list("pk", field, "effectiveness_reporting_system"))
+        if descending:
+            # value DESC NULLS LAST, pk DESC
+            rows.sort(key=lambda row: (row[1] is not None, row[1] or "", row[0]), reverse=True)
+        else:
+            # value ASC NULLS FIRST, pk ASC
+            rows.sort(key=lambda row: (row[1] is not None, row[1] or "", row[0]))
+        return [row[2] for row in rows]
+
+    def test_every_row_once_in_order(self):
+        for sort, field in (("id_number", "id_number"), ("gender", "gender"), ("", "pk")):
+            for descending in (False, True):
+                key = ("-" if descending else "") + sort
+                with self.subTest(sort=key):
+                    seen = self.walk(key)
+                    self.assertEqual(len(seen), len(set(seen)))
+                    self.assertEqual(seen, self.expected(field, descending))
+
+    def test_page_sizes(self):
+        for limit in (1, 3, len(self.ID_NUMBERS), 50):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.walk("id_number", limit=limit), self.expected("id_number", False))
+
+    def test_search_narrows_pages(self):
+        data = tables.page("students", sort="id_number", search={"id_number": "a"}, limit=50)
+        self.assertEqual(len(data["rows"]), self.ID_NUMBERS.count("A"))
+
+    def test_bad_parameters(self):
+        for kwargs in (
+            {"sort": "region"},                          # not sortable
+            {"search": {"effectiveness_reporting_system": "x"}},   # not searchable
+            {"cursor": "not-a-cursor"},
+            {"cursor": tables.encode_cursor("A", "1")},  # pk must be an integer
+        ):
+            with self.subTest(**kwargs), self.assertRaises(tables.TableError):
+                tables.page("students", **kwargs)
+        with self.assertRaises(tables.TableError):
+            tables.page("pupils")
+
+
+class RespondentTableViewTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user("viewer", password="x")
+        self.client.force_login(self.user)
+
+    def test_bad_requests_return_400(self):
+        url = reverse("data_collection:respondent_table", args=["students"])
+        for params in ({"cursor": "garbage"}, {"sort": "-region"}, {"limit": "ten"}):
+            with self.subTest(**params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+        response = self.client.get(reverse("data_collection:respondent_table", args=["pupils"]))
+        self.assertEqual(response.status_code, 400)
+
+    def test_page(self):
+        response = self.client.get(reverse("data_collection:respondent_table", args=["students"]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rows"], [])
+        self.assertIsNone(response.json()["next"])
+
+
+class ImportJobProgressTests(TestCase):
+    def setUp(self):
+        self.owner = CustomUser.objects.create_user("owner", password="x", role="DataEntry")
+        self.other = CustomUser.objects.create_user("other", password="x", role="DataEntry")
+        self.admin = CustomUser.objects.create_user("admin", password="x", role="Admin")
+        self.job = ImportJob.objects.create(original_name="survey.xlsx", uploaded_by=self.owner, error="secret")
+        self.url = reverse("data_collection:import_job_progress", args=[self.job.pk])
+
+    def test_owner_and_admin_see_the_job(self):
+        for user in (self.owner, self.admin):
+            with self.subTest(user=user.username):
+                self.client.force_login(user)
+                response = self.client.get(self.url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["file"], "survey.xlsx")
+
+    def test_other_users_get_404(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ImportJobFileTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        patcher = mock.patch.object(ImportJob._meta.get_field("file"), "storage", FileSystemStorage(location=self.dir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def enqueue(self, name, content=b"id_number\nS1\n"):
+        return jobs.enqueue(SimpleUploadedFile(name, content))
+
+    def test_upload_gets_a_private_random_name(self):
+        job = self.enqueue("Kigoma Students.csv")
+        self.assertEqual(job.original_name, "Kigoma Students.csv")
+        self.assertNotIn("Kigoma", job.file.name)
+        self.assertTrue(job.file.name.endswith(".csv"))
+        self.assertEqual(os.listdir(self.dir), [job.file.name])
+
+    def test_file_removed_once_processed(self):
+        job = jobs.run_job(self.enqueue("students.csv"))
+        self.assertEqual(job.status, "done")
+        self.assertEqual(os.listdir(self.dir), [])
+        self.assertFalse(ImportJob.objects.get(pk=job.pk).file)
+
+    def test_errors_are_short_messages(self):
+        with self.assertLogs("data_collection.jobs", "ERROR"):
+            job = jobs.run_job(self.enqueue("survey.csv"))
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Cannot tell which sheet", job.error)
+        self.assertEqual(os.listdir(self.dir), [])
+
+        with mock.patch.object(jobs.importer, "import_workbook", side_effect=RuntimeError("secret detail")), \
+                self.assertLogs("data_collection.jobs", "ERROR"):
+            job = jobs.run_job(self.enqueue("students.csv"))
+        self.assertEqual(job.status, "failed")
+        self.assertNotIn("secret detail", job.error)
+        self.assertNotIn("Traceback", job.error)
+
+
+class FilterSpecTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region = Region.objects.create(name="Arusha")
+        Student.objects.bulk_create([
+            Student(id_number="S1", gender="Male", region=cls.region),
+            Student(id_number="S2", gender="Female", region=cls.region),
+            Student(id_number="S3", gender="Other"),
+        ])
+        Teacher.objects.create(id_number="T1", gender="Female")
+
+    def spec(self, **params):
+        return FilterSpec.from_request(RequestFactory().get("/", params))
+
+    def ids(self, **params):
+        return sorted(self.spec(**params).queryset(Student).values_list("id_number", flat=True))
+
+    def test_recognised_values_filter(self):
+        self.assertEqual(self.ids(gender="m"), ["S1"])
+        self.assertEqual(self.ids(region=str(self.region.pk)), ["S1", "S2"])
+        self.assertEqual(self.ids(gender=""), ["S1", "S2", "S3"])
+
+    def test_unmatched_values_match_nothing(self):
+        for params in ({"gender": "unknown"}, {"region": "Arusha"}, {"school": "12abc"},
+                       {"disability_status": "maybe"}):
+            with self.subTest(**params):
+                spec = self.spec(**params)
+                self.assertEqual(self.ids(**params), [])
+                self.assertEqual(spec.counts(Student)["total"], 0)
+                self.assertEqual(spec.as_params()[next(iter(params))], next(iter(params.values())))
+
+    def test_unmatched_field_a_model_lacks_is_skipped(self):
+        # Teachers are not asked about disability, as with a recognised value
+        self.assertEqual(self.spec(disability_status="maybe").queryset(Teacher).count(), 1)
+
+    def test_export_of_unmatched_filter_is_empty(self):
+        self.client.force_login(CustomUser.objects.create_user("viewer", password="x"))
+        response = self.client.get(reverse("data_collection:export_students"), {"gender": "unknown"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b"".join(response.streaming_content).strip().splitlines()), 1)   # header only
+
+
+TESTDATA = os.path.join(os.path.dirname(__file__), "testdata")
+
+
+class ImportWorkbookTests(TestCase):
+    HEADER = "ID Number,Region,District,School,Gender,Age Group,Experienced VAC\n"
+
+    def csv(self, *rows, name="students.csv"):
+        f = io.BytesIO((self.HEADER + "".join(row + "\n" for row in rows)).encode())
+        f.name = name
+        return f
+
+    def students(self):
+        return {s.id_number: s for s in Student.objects.select_related("region", "school")}
+
+    def test_insert_then_update(self):
+        summary = importer.import_workbook(self.csv(
+            "S1,Arusha,Arusha Urban,Kaloleni,m,10 - 13,yes",
+            "S2,Arusha,Arusha Urban,Kaloleni,female,14-17,no",
+        ))
+        self.assertEqual(
+            {key: summary["students"][key] for key in ("read", "inserted", "updated", "duplicates", "rejected")},
+            {"read": 2, "inserted": 2, "updated": 0, "duplicates": 0, "rejected": 0},
+        )
+        s1 = self.students()["S1"]
+        self.assertEqual((s1.gender, s1.age_group, s1.experienced_vac), ("Male", "10-13", True))
+        self.assertEqual((s1.region.name, s1.school.name), ("Arusha", "Kaloleni"))
+
+        summary = importer.import_workbook(self.csv("S1,Arusha,Arusha Urban,Kaloleni,m,10-13,no"))
+        self.assertEqual((summary["students"]["inserted"], summary["students"]["updated"]), (0, 1))
+        self.assertEqual(Student.objects.count(), 2)
+        self.assertFalse(self.students()["S1"].experienced_vac)
+
+    def test_rows_without_id_are_rejected(self):
+        summary = importer.import_workbook(self.csv(
+            ",Arusha,Arusha Urban,Kaloleni,m,10-13,yes",
+            "nan,Arusha,Arusha Urban,Kaloleni,m,10-13,yes",
+            "S1,Arusha,Arusha Urban,Kaloleni,m,10-13,yes",
+        ))
+        self.assertEqual((summary["students"]["inserted"], summary["students"]["rejected"]), (1, 2))
+        self.assertEqual(list(self.students()), ["S1"])
+
+    def test_duplicates_within_and_across_batches(self):
+        rows = (
+            "S1,Arusha,Arusha Urban,Kaloleni,m,10-13,no",
+            "S1,Arusha,Arusha Urban,Kaloleni,m,10-13,no",   # same batch
+            "S2,Arusha,Arusha Urban,Kaloleni,f,10-13,no",
+            "S1,Arusha,Arusha Urban,Kaloleni,m,10-13,yes",  # next batch
+        )
+        for batch_size in (2, 1000):
+            with self.subTest(batch_size=batch_size):
+                Student.objects.all().delete()
+                result = importer.import_workbook(self.csv(*rows), batch_size=batch_size)["students"]
+                self.assertEqual(
+                    {key: result[key] for key in ("read", "inserted", "updated", "duplicates", "rejected")},
+                    {"read": 4, "inserted": 2, "updated": 0, "duplicates": 2, "rejected": 0},
+                )
+                # The last row wins
+                self.assertEqual(Student.objects.count(), 2)
+                self.assertTrue(self.students()["S1"].experienced_vac)
+
+    def test_data_version_bumped_once(self):
+        rows = [f"S{i},Arusha,Arusha Urban,Kaloleni,m,10-13,no" for i in range(5)]
+        with mock.patch.object(importer, "bump_version") as bump:
+            importer.import_workbook(self.csv(*rows), batch_size=2, atomic=False)
+        self.assertEqual(bump.call_count, 1)
+
+    def test_csv_sheet_from_file_name(self):
+        importer.import_workbook(self.csv("T1,Arusha,Arusha Urban,Kaloleni,f,30-45,", name="Teachers_2024.csv"))
+        self.assertEqual(list(Teacher.objects.values_list("id_number", flat=True)), ["T1"])
+        with self.assertRaises(ValueError):
+            importer.import_workbook(self.csv("S1,Arusha,,,m,10-13,no", name="survey.csv"))
+
+    def test_numeric_ids_read_as_floats(self):
+        importer.import_workbook(self.csv(
+            "12.0,Arusha,Arusha Urban,Kaloleni,m,10-13,no",
+            "7.5,Arusha,Arusha Urban,Kaloleni,m,10-13,no",
+        ))
+        self.assertEqual(sorted(self.students()), ["12", "7.5"])
+
+    def test_xlsx_reader(self):
+        workbook = Workbook()
+        students = workbook.active
+        students.title = "Students "
+        students.append(["ID Number", "Region", "District", "School", "Gender"])
+        students.append([12, "Arusha", "Arusha Urban", "Kaloleni", "M"])
+        students.append([None, "Arusha", "Arusha Urban", "Kaloleni", "F"])   # no id: the column becomes float
+        students.append([None, None, None, None, None])                      # blank row, skipped
+        students.append([13, "Arusha", "Arusha Urban", "Kaloleni", "F"])
+        workbook.create_sheet("Teachers").append(["ID Number", "Gender"])
+        workbook["Teachers"].append(["T1", "female"])
+        workbook.create_sheet("Notes").append(["Not a survey sheet"])
+        f = io.BytesIO()
+        workbook.save(f)
+        f.seek(0)
+        f.name = "survey.xlsx"
+
+        summary = importer.import_workbook(f, batch_size=2)
+        self.assertEqual(set(summary), {"students", "teachers"})
+        self.assertEqual((summary["students"]["read"], summary["students"]["rejected"]), (3, 1))
+        self.assertEqual(sorted(self.students()), ["12", "13"])
+        self.assertEqual(Teacher.objects.get().gender, "Female")
+
+    def test_xls_reader(self):
+        with open(os.path.join(TESTDATA, "students.xls"), "rb") as f:
+            summary = importer.import_workbook(f, name="students.xls", batch_size=1)
+        self.assertEqual(list(summary), ["students"])
+        self.assertEqual((summary["students"]["inserted"], summary["students"]["rejected"]), (2, 1))
+        students = self.students()
+        self.assertEqual(sorted(students), ["12", "A7"])
+        self.assertEqual((students["12"].gender, students["12"].age_group), ("Male", "10-13"))
+
+
+class GeographyTests(TestCase):
+    def setUp(self):
+        geography._index = None
+        self.addCleanup(setattr, geography, "_index", None)
+
+    def test_rebuilt_when_the_shared_version_moves_on(self):
+        Teacher.objects.create(id_number="T1", education_level="Diploma")
+        self.assertEqual(geography.geography().options["education_level"], ["Diploma"])
+
+        # Another process edits a teacher: only the version in the database tells this one
+        Teacher.objects.filter(id_number="T1").update(education_level="Degree")
+        self.assertEqual(geography.geography().options["education_level"], ["Diploma"])
+        bump_version()
+        self.assertEqual(geography.geography().options["education_level"], ["Degree"])
+
+
+class RespondentUniquenessTests(TestCase):
+    def test_id_number_unique_per_round_and_without_one(self):
+        first, second = SurveyRound.objects.create(name="2025"), SurveyRound.objects.create(name="2026")
+        Student.objects.create(id_number="S1", survey_round=first)
+        Student.objects.create(id_number="S1", survey_round=second)
+        Student.objects.create(id_number="S1")
+        for survey_round in (first, None):
+            with self.subTest(survey_round=survey_round), self.assertRaises(IntegrityError), transaction.atomic():
+                Student.objects.create(id_number="S1", survey_round=survey_round)
+        # Rows without an id_number are not constrained
+        Student.objects.create(survey_round=first)
+        Student.objects.create(survey_round=first)
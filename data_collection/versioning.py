@@ -0,0 +1,29 @@
+"""
+The data-version stamp (see DataVersion).
+
+``bump_version`` is called wherever respondent rows are written; readers
+use ``current_version`` to tell whether something they cached is stale.
+Every bump also sends ``data_changed`` so in-process caches can drop their
+entries straight away.
+"""
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import DataVersion
+
+
+# Sent after each bump_version() (imports, admin edits, deletes, restores)
+data_changed = Signal()
+
+
+def current_version():
+    """The DataVersion row, created at version 0 the first time it is asked for."""
+    return DataVersion.objects.get_or_create(pk=1)[0]
+
+
+def bump_version():
+    updated = DataVersion.objects.filter(pk=1).update(version=F("version") + 1, changed_at=timezone.now())
+    if not updated:
+        DataVersion.objects.create(pk=1, version=1)
+    data_changed.send(sender=DataVersion)
@@ -1,94 +1,79 @@
-from django.shortcuts import render, redirect
-import pandas as pd
+from django.shortcuts import render, redirect, get_object_or_404
 import csv
-from django.http import HttpResponse
-from django.core.paginator import Paginator
-from .models import Student, Teacher, Parent
+from functools import partial
+from django.http import JsonResponse, StreamingHttpResponse
+from .models import Student, Teacher, Parent, ImportJob, Gender
+from .filters import FilterSpec
+from .geography import geography
 from .forms import UploadExcelForm
-from django.db.models import Count, Q
+from . import jobs
+from . import rollups
+from . import tables
+from django.db.models import Count, F, Q
 from django.contrib.auth.decorators import login_required
+from school_violence_mne.concurrency import arender, async_login_required, gather_queries
+from settings.views import is_admin
 
 @login_required
 def data_list(request):
-    student_list = Student.objects.all()
-    teacher_list = Teacher.objects.all()
-    parent_list = Parent.objects.all()
-
-    student_paginator = Paginator(student_list, 10)
-    teacher_paginator = Paginator(teacher_list, 10)
-    parent_paginator = Paginator(parent_list, 10)
-
-    students = student_paginator.get_page(request.GET.get("student_page"))
-    teachers = teacher_paginator.get_page(request.GET.get("teacher_page"))
-    parents = parent_paginator.get_page(request.GET.get("parent_page"))
-
-    return render(request, "data_collection/data_list.html", {
-        "students": students,
-        "teachers": teachers,
-        "parents": parents,
-    })
+    # The tables fetch their rows from respondent_table
+    return render(request, "data_collection/data_list.html")
 
 
 @login_required
-def data_dashboard(request):
+def respondent_table(request, table):
+    """One keyset-paginated page of a respondent table: ?sort=-gender&cursor=...&search_region=Aru"""
+    search = {key[len("search_"):]: value for key, value in request.GET.items() if key.startswith("search_")}
+    try:
+        limit = int(request.GET.get("limit", tables.PAGE_SIZE))
+        data = tables.page(table, sort=request.GET.get("sort", ""), cursor=request.GET.get("cursor"),
+                           search=search, limit=limit)
+    except (tables.TableError, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(data)
+
+
+def dashboard_queries():
+    """The independent aggregations behind the data dashboard, by name."""
+    return {
+        "totals": rollups.summary,
+        "students_by_gender": partial(rollups.breakdown, "gender", "student"),
+        "students_by_disability": partial(rollups.breakdown, "disability_status", "student"),
+        "teachers_by_gender": partial(rollups.breakdown, "gender", "teacher"),
+        "teachers_by_training": lambda: list(
+            Teacher.objects.values("training_received").annotate(count=Count("id"))
+        ),
+        "parents_by_gender": partial(rollups.breakdown, "gender", "parent"),
+        "overall_by_region": partial(rollups.counts_by, "region"),
+        "overall_by_district": partial(rollups.counts_by, "district"),
+        "overall_by_school": partial(rollups.counts_by, "school"),
+    }
+
+
+@async_login_required
+async def data_dashboard(request):
+    # The aggregations are independent, so they run concurrently
+    results = await gather_queries(dashboard_queries())
+    totals = results["totals"]
+
     # --- Students ---
-    total_students = Student.objects.count()
-    students_by_gender = Student.objects.values("gender").annotate(count=Count("id"))
-    students_by_disability = Student.objects.values("disability_status").annotate(count=Count("id"))
+    total_students = totals["student"]["total"]
+    students_by_gender = results["students_by_gender"]
+    students_by_disability = results["students_by_disability"]
 
     # --- Teachers ---
-    total_teachers = Teacher.objects.count()
-    teachers_by_gender = Teacher.objects.values("gender").annotate(count=Count("id"))
-    teachers_by_training = Teacher.objects.values("training_received").annotate(count=Count("id"))
+    total_teachers = totals["teacher"]["total"]
+    teachers_by_gender = results["teachers_by_gender"]
+    teachers_by_training = results["teachers_by_training"]
 
     # --- Parents ---
-    total_parents = Parent.objects.count()
-    parents_by_gender = Parent.objects.values("gender").annotate(count=Count("id"))
-
-    # --- Overall by Region ---
-    regions = set(
-        list(Student.objects.values_list("region", flat=True)) +
-        list(Teacher.objects.values_list("region", flat=True)) +
-        list(Parent.objects.values_list("region", flat=True))
-    )
-    overall_by_region = []
-    for region in regions:
-        overall_by_region.append({
-            "region": region,
-            "student_count": Student.objects.filter(region=region).count(),
-            "teacher_count": Teacher.objects.filter(region=region).count(),
-            "parent_count": Parent.objects.filter(region=region).count(),
-        })
-
-    # --- Overall by District ---
-    districts = set(
-        list(Student.objects.values_list("district", flat=True)) +
-        list(Teacher.objects.values_list("district", flat=True)) +
-        list(Parent.objects.values_list("district", flat=True))
-    )
-    overall_by_district = []
-    for district in districts:
-        overall_by_district.append({
-            "district": district,
-            "student_count": Student.objects.filter(district=district).count(),
-            "teacher_count": Teacher.objects.filter(district=district).count(),
-            "parent_count": Parent.objects.filter(district=district).count(),
-        })
-
-    # --- Overall by School ---
-    schools = set(
-        list(Student.objects.values_list("school", flat=True)) +
-        list(Teacher.objects.values_list("school", flat=True)) +
-        list(Parent.objects.values_list("school", flat=True))
-    )
-    overall_by_school = []
-    for school in schools:
-        overall_by_school.append({
-            "school": school,
-            "student_count": Student.objects.filter(school=school).count(),
-            "teacher_count": Teacher.objects.filter(school=school).count(),
-            "parent_count": Parent.objects.filter(school=school).count(),
-        })
+    total_parents = totals["parent"]["total"]
+    parents_by_gender = results["parents_by_gender"]
+
+    # --- Overall by Region / District / School ---
+    overall_by_region = results["overall_by_region"]
+    overall_by_district = results["overall_by_district"]
+    overall_by_school = results["overall_by_school"]
 
     context = {
         "total_students": total_students,
@@ -103,7 +88,7 @@ def data_dashboard(request):
         "overall_by_district": overall_by_district,
         "overall_by_school": overall_by_school,
     }
-    return render(request, "data_collection/dashboard.html", context)
+    return await arender(request, "data_collection/dashboard.html", context)
 
 
 
@@ -112,353 +97,114 @@ def data_dashboard(request):
 # -------------------------------
 @login_required
 def get_districts(request):
-    region = request.GET.get("region")
-    districts = []
-    if region:
-        districts = Student.objects.filter(region=region).values_list("district", flat=True).distinct()
-    return JsonResponse({"districts": list(districts)})
+    region = FilterSpec.from_request(request).region
+    return JsonResponse({"districts": geography().districts_of(region) if region else []})
 @login_required
 def get_schools(request):
-    district = request.GET.get("district")
-    schools = []
-    if district:
-        schools = Student.objects.filter(district=district).values_list("school", flat=True).distinct()
-    return JsonResponse({"schools": list(schools)})
+    district = FilterSpec.from_request(request).district
+    return JsonResponse({"schools": geography().schools_of(district) if district else []})
 @login_required
 def get_teacher_levels(request):
-    levels = Teacher.objects.values_list("education_level", flat=True).distinct()
-    return JsonResponse({"levels": list(levels)})
+    return JsonResponse({"levels": geography().options["education_level"]})
 @login_required
 def get_parent_employment(request):
-    jobs = Parent.objects.values_list("employment", flat=True).distinct()
-    return JsonResponse({"jobs": list(jobs)})
+    return JsonResponse({"jobs": geography().options["employment"]})
+@login_required
+def filter_options(request):
+    """The whole place hierarchy and answer lists in one response; ?q=Aru&level=school searches names instead."""
+    index = geography()
+    if "q" in request.GET:
+        level = request.GET.get("level") or None
+        return JsonResponse({"results": index.search(request.GET["q"], level=level)})
+    return JsonResponse(index.bootstrap())
 
 # -------------------------------
-# Analysis View
+# Export Functions
 # -------------------------------
-@login_required
-def data_analysis(request):
-    # Get filters
-    region = request.GET.get("region") or None
-    district = request.GET.get("district") or None
-    school = request.GET.get("school") or None
-    gender = request.GET.get("gender") or None
-    age_group = request.GET.get("age_group") or None
-    disability_status = request.GET.get("disability_status") or None
-    teacher_level = request.GET.get("education_level") or None
-    parent_job = request.GET.get("employment") or None
-
-    students = Student.objects.all()
-    teachers = Teacher.objects.all()
-    parents = Parent.objects.all()
-
-    # Apply filters
-    if region:
-        students = students.filter(region=region)
-        teachers = teachers.filter(region=region)
-        parents = parents.filter(region=region)
-    if district:
-        students = students.filter(district=district)
-        teachers = teachers.filter(district=district)
-        parents = parents.filter(district=district)
-    if school:
-        students = students.filter(school=school)
-        teachers = teachers.filter(school=school)
-        parents = parents.filter(school=school)
-    if gender:
-        students = students.filter(gender__iexact=gender)
-        teachers = teachers.filter(gender__iexact=gender)
-        parents = parents.filter(gender__iexact=gender)
-    if age_group:
-        students = students.filter(age_group=age_group)
-        teachers = teachers.filter(age_group=age_group)
-        parents = parents.filter(age_group=age_group)
-    if disability_status in ["true", "false"]:
-        students = students.filter(disability_status=(disability_status == "true"))
-    if teacher_level:
-        teachers = teachers.filter(education_level=teacher_level)
-    if parent_job:
-        parents = parents.filter(employment=parent_job)
-
-    # Counts
-    student_count = students.count()
-    teacher_count = teachers.count()
-    parent_count = parents.count()
-
-    # Chart breakdowns
-    student_gender_data = {
-        "Male": students.filter(gender__iexact="Male").count(),
-        "Female": students.filter(gender__iexact="Female").count(),
-    }
-    teacher_gender_data = {
-        "Male": teachers.filter(gender__iexact="Male").count(),
-        "Female": teachers.filter(gender__iexact="Female").count(),
-    }
-    parent_gender_data = {
-        "Male": parents.filter(gender__iexact="Male").count(),
-        "Female": parents.filter(gender__iexact="Female").count(),
-    }
-
-    # Distinct values for dropdowns
-    regions = Student.objects.values_list("region", flat=True).distinct()
-    districts = Student.objects.values_list("district", flat=True).distinct()
-    schools = Student.objects.values_list("school", flat=True).distinct()
-    genders = Student.objects.values_list("gender", flat=True).distinct()
-    age_groups = Student.objects.values_list("age_group", flat=True).distinct()
-    teacher_levels = Teacher.objects.values_list("education_level", flat=True).distinct()
-    parent_jobs = Parent.objects.values_list("employment", flat=True).distinct()
+# Rows are pulled from the database this many at a time while the CSV streams out
+EXPORT_CHUNK_SIZE = 2000
 
-    #......Added for new analysis templates
-    cases_by_region = Student.objects.values("region").annotate(count=Count("id")).order_by("-count")
-    cases_by_district = Student.objects.values("district").annotate(count=Count("id")).order_by("-count")
-    cases_by_school = Student.objects.values("school").annotate(count=Count("id")).order_by("-count")
-    violence_types_overall = Student.objects.values("forms_of_violence").annotate(count=Count("id")).order_by("-count")
+PLACE_COLUMNS = ("region__name", "district__name", "school__name")
 
-    top_region = cases_by_region.first() if cases_by_region else None
-    top_district = cases_by_district.first() if cases_by_district else None
-    top_school = cases_by_school.first() if cases_by_school else None
-    top_violence = violence_types_overall.first() if violence_types_overall else None
-    # .....
 
+class Echo:
+    """File-like object whose write() hands the line back, so csv.writer can feed a generator."""
+    def write(self, value):
+        return value
 
-    return render(request, "data_collection/analysis.html", {
-        #........new analysis 
-        "top_region": top_region,
-        "top_district": top_district,
-        "top_school": top_school,
-        "top_violence": top_violence,
-        "violence_types_overall": violence_types_overall,
-        #......
-        "students": students,
-        "teachers": teachers,
-        "parents": parents,
-        "student_count": student_count,
-        "teacher_count": teacher_count,
-        "parent_count": parent_count,
-        "student_gender_data": student_gender_data,
-        "teacher_gender_data": teacher_gender_data,
-        "parent_gender_data": parent_gender_data,
-        "filters": {
-            "region": region or "",
-            "district": district or "",
-            "school": school or "",
-            "gender": gender or "",
-            "age_group": age_group or "",
-            "disability_status": disability_status or "",
-            "education_level": teacher_level or "",
-            "employment": parent_job or "",
-        },
-        "regions": regions,
-        "districts": districts,
-        "schools": schools,
-        "genders": genders,
-        "age_groups": age_groups,
-        "teacher_levels": teacher_levels,
-        "parent_jobs": parent_jobs,
-    })
 
+def stream_csv(filename, header, queryset, columns):
+    """
+    StreamingHttpResponse writing ``header`` and then ``queryset.values_list(*columns)``
+    row by row. Only EXPORT_CHUNK_SIZE rows are held in memory at a time.
+    """
+    writer = csv.writer(Echo())
 
-'''#............................
-#Analysis View
-#.............................
-def data_analysis(request):
-    # Get filters
-    region = request.GET.get("region") or None
-    district = request.GET.get("district") or None
-    school = request.GET.get("school") or None
-    gender = request.GET.get("gender") or None
-    age_group = request.GET.get("age_group") or None
-    disability_status = request.GET.get("disability_status") or None
-
-    students = Student.objects.all()
-    teachers = Teacher.objects.all()
-    parents = Parent.objects.all()
-
-    # Apply filters (same as before)
-    if region:
-        students = students.filter(region=region)
-        teachers = teachers.filter(region=region)
-        parents = parents.filter(region=region)
-    if district:
-        students = students.filter(district=district)
-        teachers = teachers.filter(district=district)
-        parents = parents.filter(district=district)
-    if school:
-        students = students.filter(school=school)
-        teachers = teachers.filter(school=school)
-        parents = parents.filter(school=school)
-    if gender:
-        students = students.filter(gender__iexact=gender)
-        teachers = teachers.filter(gender__iexact=gender)
-        parents = parents.filter(gender__iexact=gender)
-    if age_group:
-        students = students.filter(age_group=age_group)
-        teachers = teachers.filter(age_group=age_group)
-        parents = parents.filter(age_group=age_group)
-    if disability_status in ["true", "false"]:
-        students = students.filter(disability_status=(disability_status == "true"))
-
-    # Counts
-    student_count = students.count()
-    teacher_count = teachers.count()
-    parent_count = parents.count()
-
-    # Chart breakdowns
-    student_gender_data = {
-        "Male": students.filter(gender__iexact="Male").count(),
-        "Female": students.filter(gender__iexact="Female").count(),
-    }
-    teacher_gender_data = {
-        "Male": teachers.filter(gender__iexact="Male").count(),
-        "Female": teachers.filter(gender__iexact="Female").count(),
-    }
-    parent_gender_data = {
-        "Male": parents.filter(gender__iexact="Male").count(),
-        "Female": parents.filter(gender__iexact="Female").count(),
-    }
+    def rows():
+        yield writer.writerow(header)
+        for row in queryset.values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield writer.writerow(row)
 
-    # Distinct values for dropdowns
-    regions = Student.objects.values_list("region", flat=True).distinct()
-    districts = Student.objects.values_list("district", flat=True).distinct()
-    schools = Student.objects.values_list("school", flat=True).distinct()
-    genders = Student.objects.values_list("gender", flat=True).distinct()
-    age_groups = Student.objects.values_list("age_group", flat=True).distinct()
+    response = StreamingHttpResponse(rows(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
-    return render(request, "data_collection/analysis.html", {
-        "students": students,
-        "teachers": teachers,
-        "parents": parents,
-        "student_count": student_count,
-        "teacher_count": teacher_count,
-        "parent_count": parent_count,
-        "student_gender_data": student_gender_data,
-        "teacher_gender_data": teacher_gender_data,
-        "parent_gender_data": parent_gender_data,
-        "filters": {
-            "region": region or "",
-            "district": district or "",
-            "school": school or "",
-            "gender": gender or "",
-            "age_group": age_group or "",
-            "disability_status": disability_status or "",
-        },
-        "regions": regions,
-        "districts": districts,
-        "schools": schools,
-        "genders": genders,
-        "age_groups": age_groups,
-    })
-#............................
-#End of Analysis View
-#.............................'''
 
-# -------------------------------
-# Export Functions
-# -------------------------------
 @login_required
 def export_students(request):
-    region = request.GET.get("region") or None
-    district = request.GET.get("district") or None
-    school = request.GET.get("school") or None
-    gender = request.GET.get("gender") or None
-    age_group = request.GET.get("age_group") or None
-    disability_status = request.GET.get("disability_status") or None
-
-    students = Student.objects.all()
-    if region: students = students.filter(region=region)
-    if district: students = students.filter(district=district)
-    if school: students = students.filter(school=school)
-    if gender: students = students.filter(gender__iexact=gender)
-    if age_group: students = students.filter(age_group=age_group)
-    if disability_status in ["true", "false"]:
-        students = students.filter(disability_status=(disability_status == "true"))
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="students_filtered.csv"'
-    writer = csv.writer(response)
-    writer.writerow([
+    students = FilterSpec.from_request(request).queryset(Student)
+
+    return stream_csv("students_filtered.csv", [
         "id_number","region","district","school","gender","age_group",
         "disability_status","knowledge_on_violence","experienced_vac",
         "forms_of_violence","perpetrators","vulnerable_places",
-        "reporting_violence","effectiveness_reporting_system"
+        "reporting_violence","effectiveness_reporting_system",
+        "survey_round","collected_on"
+    ], students, [
+        "id_number", *PLACE_COLUMNS, "gender", "age_group",
+        "disability_status", "knowledge_on_violence", "experienced_vac",
+        "forms_of_violence", "perpetrators", "vulnerable_places",
+        "reporting_violence", "effectiveness_reporting_system",
+        "survey_round__name", "collected_on"
     ])
-    for s in students:
-        writer.writerow([
-            s.id_number, s.region, s.district, s.school, s.gender, s.age_group,
-            s.disability_status, s.knowledge_on_violence, s.experienced_vac,
-            s.forms_of_violence, s.perpetrators, s.vulnerable_places,
-            s.reporting_violence, s.effectiveness_reporting_system
-        ])
-    return response
 
 @login_required
 def export_teachers(request):
-    region = request.GET.get("region") or None
-    district = request.GET.get("district") or None
-    school = request.GET.get("school") or None
-    gender = request.GET.get("gender") or None
-    age_group = request.GET.get("age_group") or None
-
-    teachers = Teacher.objects.all()
-    if region: teachers = teachers.filter(region=region)
-    if district: teachers = teachers.filter(district=district)
-    if school: teachers = teachers.filter(school=school)
-    if gender: teachers = teachers.filter(gender__iexact=gender)
-    if age_group: teachers = teachers.filter(age_group=age_group)
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="teachers_filtered.csv"'
-    writer = csv.writer(response)
-    writer.writerow([
+    teachers = FilterSpec.from_request(request).queryset(Teacher)
+
+    return stream_csv("teachers_filtered.csv", [
         "id_number","region","district","school","gender","age_group",
         "marital_status","education_level","forms_of_violence",
         "reporting_violence","vulnerable_places","right_to_discipline_child",
-        "effective_handling_vac","training_received"
+        "effective_handling_vac","training_received",
+        "survey_round","collected_on"
+    ], teachers, [
+        "id_number", *PLACE_COLUMNS, "gender", "age_group",
+        "marital_status", "education_level", "forms_of_violence",
+        "reporting_violence", "vulnerable_places", "right_to_discipline_child",
+        "effective_handling_vac", "training_received",
+        "survey_round__name", "collected_on"
     ])
-    for t in teachers:
-        writer.writerow([
-            t.id_number, t.region, t.district, t.school, t.gender, t.age_group,
-            t.marital_status, t.education_level, t.forms_of_violence,
-            t.reporting_violence, t.vulnerable_places, t.right_to_discipline_child,
-            t.effective_handling_vac, t.training_received
-        ])
-    return response
 
 @login_required
 def export_parents(request):
-    region = request.GET.get("region") or None
-    district = request.GET.get("district") or None
-    school = request.GET.get("school") or None
-    gender = request.GET.get("gender") or None
-    age_group = request.GET.get("age_group") or None
-
-    parents = Parent.objects.all()
-    if region: parents = parents.filter(region=region)
-    if district: parents = parents.filter(district=district)
-    if school: parents = parents.filter(school=school)
-    if gender: parents = parents.filter(gender__iexact=gender)
-    if age_group: parents = parents.filter(age_group=age_group)
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="parents_filtered.csv"'
-    writer = csv.writer(response)
-    writer.writerow([
+    parents = FilterSpec.from_request(request).queryset(Parent)
+
+    return stream_csv("parents_filtered.csv", [
         "id_number","region","district","school","gender","age_group",
         "marital_status","education_level","employment","forms_of_violence",
         "reporting_violence","vulnerable_places","physical_punishment",
         "believe_in_child_punishment","effectiveness_positive_punishment",
-        "child_comforting","impose_rules_to_child","set_rules_with_child","created_at"
+        "child_comforting","impose_rules_to_child","set_rules_with_child",
+        "survey_round","collected_on"
+    ], parents, [
+        "id_number", *PLACE_COLUMNS, "gender", "age_group",
+        "marital_status", "education_level", "employment", "forms_of_violence",
+        "reporting_violence", "vulnerable_places", "physical_punishment",
+        "believe_in_child_punishment", "effectiveness_positive_punishment",
+        "child_comforting", "impose_rules_to_child", "set_rules_with_child",
+        "survey_round__name", "collected_on"
     ])
-    for p in parents:
-        writer.writerow([
-            p.id_number, p.region, p.district, p.school, p.gender, p.age_group,
-            p.marital_status, p.education_level, p.employment, p.forms_of_violence,
-            p.reporting_violence, p.vulnerable_places, p.physical_punishment,
-            p.believe_in_child_punishment, p.effectiveness_positive_punishment,
-            p.child_comforting, p.impose_rules_to_child, p.set_rules_with_child,
-            p.created_at
-        ])
-    return response
 # -------------------------------
 # End of Export function
 # -------------------------------
@@ -466,131 +212,81 @@ def export_parents(request):
 # -------------------------------
 # Analysis View
 # -------------------------------
+# Counted for every respondent type in the same query as the filtered total
+ANALYSIS_BUCKETS = {
+    "male": Q(gender=Gender.MALE),
+    "female": Q(gender=Gender.FEMALE),
+    "reporting": Q(reporting_violence=True),
+}
+
+
+def gender_chart(counts):
+    return {"labels": ["Male", "Female"], "values": [counts["male"], counts["female"]]}
+
+
+def reporting_chart(counts):
+    return {"labels": ["Reporting", "Not Reporting"], "values": [counts["reporting"], counts["total"] - counts["reporting"]]}
+
+
+def top_group(queryset, field):
+    """{field: value, "count": n} for the most common non-empty ``field`` in ``queryset``, or None."""
+    return (
+        queryset.filter(**{f"{field}__isnull": False})
+        .values(field).annotate(count=Count("id")).order_by("-count").first()
+    )
+
+
 @login_required
 def data_analysis(request):
-    region = request.GET.get("region") or None
-    district = request.GET.get("district") or None
-    school = request.GET.get("school") or None
-    gender = request.GET.get("gender") or None
-    age_group = request.GET.get("age_group") or None
-    disability_status = request.GET.get("disability_status") or None
-
-    students = Student.objects.all()
-    teachers = Teacher.objects.all()
-    parents = Parent.objects.all()
-
-    # Apply filters
-    if region:
-        students = students.filter(region=region)
-        teachers = teachers.filter(region=region)
-        parents = parents.filter(region=region)
-    if district:
-        students = students.filter(district=district)
-        teachers = teachers.filter(district=district)
-        parents = parents.filter(district=district)
-    if school:
-        students = students.filter(school=school)
-        teachers = teachers.filter(school=school)
-        parents = parents.filter(school=school)
-    if gender:
-        students = students.filter(gender__iexact=gender)
-        teachers = teachers.filter(gender__iexact=gender)
-        parents = parents.filter(gender__iexact=gender)
-    if age_group:
-        students = students.filter(age_group=age_group)
-        teachers = teachers.filter(age_group=age_group)
-        parents = parents.filter(age_group=age_group)
-    if disability_status in ["true", "false"]:
-        students = students.filter(disability_status=(disability_status == "true"))
-
-    # Counts
-    # Counts
-    total_students = students.count()
-    total_teachers = teachers.count()
-    total_parents = parents.count()
-
-    # Reporting violence counts (adjust field name to match your models)
-    reporting_students = students.filter(reporting_violence=True).count()
-    reporting_teachers = teachers.filter(reporting_violence=True).count()
-    reporting_parents = parents.filter(reporting_violence=True).count()
-
-
-    # Chart breakdowns
-    # Student charts
-    student_gender_chart = {
-        "labels": ["Male", "Female"],
-        "values": [
-            students.filter(gender__iexact="Male").count(),
-            students.filter(gender__iexact="Female").count(),
-        ],
-    }
-    student_reporting_chart = {
-        "labels": ["Reporting", "Not Reporting"],
-        "values": [reporting_students, total_students - reporting_students],
-    }
+    spec = FilterSpec.from_request(request)
+
+    # --- One aggregate query per respondent type ---
+    student_counts = spec.counts(Student, **ANALYSIS_BUCKETS)
+    teacher_counts = spec.counts(Teacher, **ANALYSIS_BUCKETS)
+    parent_counts = spec.counts(Parent, **ANALYSIS_BUCKETS)
+
+    # --- Key insights for the students matching the filters ---
+    students = spec.queryset(Student).order_by()
+    top_violence = (
+        Student.tags.through.objects
+        .filter(tag__category="forms_of_violence", student__in=students.values("pk"))
+        .values(forms_of_violence=F("tag__name")).annotate(count=Count("pk"))
+        .order_by("-count").first()
+    )
 
-    # Teacher charts
-    teacher_gender_chart = {
-        "labels": ["Male", "Female"],
-        "values": [
-            teachers.filter(gender__iexact="Male").count(),
-            teachers.filter(gender__iexact="Female").count(),
-        ],
-    }
-    teacher_reporting_chart = {
-        "labels": ["Reporting", "Not Reporting"],
-        "values": [reporting_teachers, total_teachers - reporting_teachers],
-    }
+    index = geography()
+    return render(request, "data_collection/analysis.html", {
+        "regions": [{"id": pk, "name": name} for pk, name in index.regions],
+        "districts": [{"id": pk, "name": name} for pk, name, _ in index.districts],
+        "schools": [{"id": pk, "name": name} for pk, name, _ in index.schools],
+        "genders": Gender.values,
+        "disability_options": ["true", "false"],
+        "filters": spec.as_params(),
+
+        "top_region": top_group(students, "region__name"),
+        "top_district": top_group(students, "district__name"),
+        "top_school": top_group(students, "school__name"),
+        "top_violence": top_violence,
 
-    # Parent charts
-    parent_gender_chart = {
-        "labels": ["Male", "Female"],
-        "values": [
-            parents.filter(gender__iexact="Male").count(),
-            parents.filter(gender__iexact="Female").count(),
-        ],
-    }
-    parent_reporting_chart = {
-        "labels": ["Reporting", "Not Reporting"],
-        "values": [reporting_parents, total_parents - reporting_parents],
-    }
+        "total_students": student_counts["total"],
+        "reporting_students": student_counts["reporting"],
+        "student_gender_chart": gender_chart(student_counts),
+        "student_reporting_chart": reporting_chart(student_counts),
 
-    # Combined chart
-    combined_chart = {
-        "labels": ["Students", "Teachers", "Parents"],
-        "values": [reporting_students, reporting_teachers, reporting_parents],
-    }
+        "total_teachers": teacher_counts["total"],
+        "reporting_teachers": teacher_counts["reporting"],
+        "teacher_gender_chart": gender_chart(teacher_counts),
+        "teacher_reporting_chart": reporting_chart(teacher_counts),
 
+        "total_parents": parent_counts["total"],
+        "reporting_parents": parent_counts["reporting"],
+        "parent_gender_chart": gender_chart(parent_counts),
+        "parent_reporting_chart": reporting_chart(parent_counts),
 
-    return render(request, "data_collection/analysis.html", {
-    "regions": Student.objects.values_list("region", flat=True).distinct(),
-    "districts": Student.objects.values_list("district", flat=True).distinct(),
-    "schools": Student.objects.values_list("school", flat=True).distinct(),
-    "genders": Student.objects.values_list("gender", flat=True).distinct(),
-    "disability_options": ["true", "false"],
-
-    "region": request.GET.get("region") or "",
-    "district": request.GET.get("district") or "",
-    "school": request.GET.get("school") or "",
-    "gender": request.GET.get("gender") or "",
-    "disability_status": request.GET.get("disability_status") or "",
-
-    "total_students": total_students,
-    "reporting_students": reporting_students,
-    "student_gender_chart": student_gender_chart,
-    "student_reporting_chart": student_reporting_chart,
-
-    "total_teachers": total_teachers,
-    "reporting_teachers": reporting_teachers,
-    "teacher_gender_chart": teacher_gender_chart,
-    "teacher_reporting_chart": teacher_reporting_chart,
-
-    "total_parents": total_parents,
-    "reporting_parents": reporting_parents,
-    "parent_gender_chart": parent_gender_chart,
-    "parent_reporting_chart": parent_reporting_chart,
-
-    "combined_chart": combined_chart,
+        "combined_chart": {
+            "labels": ["Students", "Teachers", "Parents"],
+            "values": [student_counts["reporting"], teacher_counts["reporting"], parent_counts["reporting"]],
+        },
     })
 
 
@@ -602,112 +298,29 @@ def upload_excel(request):
     if request.method == "POST":
         form = UploadExcelForm(request.POST, request.FILES)
         if form.is_valid():
-            excel_file = request.FILES["excel_file"]
-            xls = pd.ExcelFile(excel_file)
-
-            # Normalize sheet names once
-            sheet_names = [s.strip().lower() for s in xls.sheet_names]
-            print("Detected sheets:", sheet_names)  # Debug
-
-            def to_bool(value):
-                return str(value).strip().lower() in ["yes", "true", "1", "y"]
-
-            def normalize_columns(df):
-                df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
-                return df
-
-            def normalize_value(value):
-                """Trim spaces, unify capitalization, handle NaN."""
-                if pd.isna(value):
-                    return ""
-                return str(value).strip().title()
-
-            def normalize_multi(value):
-                """Split comma-separated values into clean list."""
-                if pd.isna(value):
-                    return ""
-                return ", ".join([v.strip().title() for v in str(value).split(",") if v.strip()])
-
-            # Students
-            if "students" in sheet_names:
-                sheet_name = [s for s in xls.sheet_names if s.strip().lower() == "students"][0]
-                df_students = pd.read_excel(xls, sheet_name=sheet_name)
-                df_students = normalize_columns(df_students)
-                for _, row in df_students.iterrows():
-                    Student.objects.update_or_create(
-                        id_number=str(row.get("id_number", "")).strip(),
-                        defaults={
-                            "region": normalize_value(row.get("region")),
-                            "district": normalize_value(row.get("district")),
-                            "school": normalize_value(row.get("school")),
-                            "gender": normalize_value(row.get("gender")),
-                            "age_group": normalize_value(row.get("age_group")),
-                            "disability_status": to_bool(row.get("disability_status")),
-                            "knowledge_on_violence": to_bool(row.get("knowledge_on_violence")),
-                            "experienced_vac": to_bool(row.get("experienced_vac")),
-                            "forms_of_violence": normalize_multi(row.get("forms_of_violence")),
-                            "perpetrators": normalize_multi(row.get("perpetrators")),
-                            "vulnerable_places": normalize_multi(row.get("vulnerable_places")),
-                            "reporting_violence": to_bool(row.get("reporting_violence")),
-                            "effectiveness_reporting_system": normalize_value(row.get("effectiveness_reporting_system")),
-                        }
-                    )
-
-            # Teachers
-            if "teachers" in sheet_names:
-                sheet_name = [s for s in xls.sheet_names if s.strip().lower() == "teachers"][0]
-                df_teachers = pd.read_excel(xls, sheet_name=sheet_name)
-                df_teachers = normalize_columns(df_teachers)
-                for _, row in df_teachers.iterrows():
-                    Teacher.objects.update_or_create(
-                        id_number=str(row.get("id_number", "")).strip(),
-                        defaults={
-                            "region": normalize_value(row.get("region")),
-                            "district": normalize_value(row.get("district")),
-                            "school": normalize_value(row.get("school")),
-                            "gender": normalize_value(row.get("gender")),
-                            "age_group": normalize_value(row.get("age_group")),
-                            "marital_status": normalize_value(row.get("marital_status")),
-                            "education_level": normalize_value(row.get("education_level")),
-                            "forms_of_violence": normalize_multi(row.get("forms_of_violence")),
-                            "reporting_violence": to_bool(row.get("reporting_violence")),
-                            "vulnerable_places": normalize_multi(row.get("vulnerable_places")),
-                            "right_to_discipline_child": to_bool(row.get("right_to_discipline_child")),
-                            "effective_handling_vac": normalize_value(row.get("effective_handling_vac")),
-                            "training_received": normalize_value(row.get("training_received")),
-                        }
-                    )
-
-            # Parents
-            if "parents" in sheet_names:
-                sheet_name = [s for s in xls.sheet_names if s.strip().lower() == "parents"][0]
-                df_parents = pd.read_excel(xls, sheet_name=sheet_name)
-                df_parents = normalize_columns(df_parents)
-                for _, row in df_parents.iterrows():
-                    Parent.objects.update_or_create(
-                        id_number=str(row.get("id_number", "")).strip(),
-                        defaults={
-                            "region": normalize_value(row.get("region")),
-                            "district": normalize_value(row.get("district")),
-                            "school": normalize_value(row.get("school")),
-                            "gender": normalize_value(row.get("gender")),
-                            "age_group": normalize_value(row.get("age_group")),
-                            "marital_status": normalize_value(row.get("marital_status")),
-                            "education_level": normalize_value(row.get("education_level")),
-                            "employment": normalize_value(row.get("employment")),
-                            "forms_of_violence": normalize_multi(row.get("forms_of_violence")),
-                            "reporting_violence": to_bool(row.get("reporting_violence")),
-                            "vulnerable_places": normalize_multi(row.get("vulnerable_places")),
-                            "physical_punishment": to_bool(row.get("physical_punishment")),
-                            "believe_in_child_punishment": to_bool(row.get("believe_in_child_punishment")),
-                            "effectiveness_positive_punishment": normalize_value(row.get("effectiveness_positive_punishment")),
-                            "child_comforting": to_bool(row.get("child_comforting")),
-                            "impose_rules_to_child": to_bool(row.get("impose_rules_to_child")),
-                            "set_rules_with_child": to_bool(row.get("set_rules_with_child")),
-                        }
-                    )
-
-            return redirect("data_collection:data_list")  # no namespace in your project urls
+            job = jobs.enqueue(
+                request.FILES["excel_file"], user=request.user, survey_round=form.cleaned_data["survey_round"]
+            )
+            if request.headers.get("x-requested-with") == "XMLHttpRequest":
+                return JsonResponse({"job_id": job.pk}, status=202)
+            return render(request, "data_collection/upload_result.html", {"job": job})
     else:
         form = UploadExcelForm()
     return render(request, "data_collection/upload.html", {"form": form})
+
+
+@login_required
+def import_job_progress(request, job_id):
+    # Users only see their own jobs; admins see every job
+    jobs_visible = ImportJob.objects.all() if is_admin(request.user) else ImportJob.objects.filter(uploaded_by=request.user)
+    job = get_object_or_404(jobs_visible, pk=job_id)
+    return JsonResponse({
+        "job_id": job.pk,
+        "file": job.original_name,
+        "status": job.status,
+        "sheets": job.progress,
+        "rows_processed": job.rows_processed,
+        "rows_per_second": job.rows_per_second,
+        "summary": job.summary,
+        "error": job.error,
+    })
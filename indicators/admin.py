@@ -1,7 +1,9 @@
 from django.contrib import admin
 from .models import Indicator
+from .forms import IndicatorForm
 
 @admin.register(Indicator)
 class IndicatorAdmin(admin.ModelAdmin):
-    list_display = ("name", "indicator_type", "target_value", "actual_value")
+    form = IndicatorForm
+    list_display = ("name", "indicator_type", "target_value", "actual_value", "source")
     search_fields = ("name", "indicator_type")
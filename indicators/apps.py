@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class IndicatorsConfig(AppConfig):
     name = "indicators"
+
+    def ready(self):
+        from data_collection.importer import import_finished
+        from .engine import sync_after_import
+        import_finished.connect(sync_after_import, dispatch_uid="sync_indicator_values")
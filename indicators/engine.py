@@ -0,0 +1,100 @@
+"""
+Declarative indicator engine.
+
+Each computed indicator is a ``Rate``: the share of one respondent type's
+rows that match a numerator filter, among the rows that match a
+denominator filter (all rows when it is None). ``evaluate`` computes any
+number of registered rates with one aggregate query per respondent type.
+
+An Indicator whose ``source`` names a registered rate gets its
+``actual_value`` written by ``sync_actual_values``, which runs after every
+import and restore, so the dashboards only ever read stored values.
+"""
+from django.db.models import Count, Q
+
+from data_collection.models import Student, Teacher, Parent
+
+from .models import Indicator
+
+
+class Rate:
+    """Percentage of ``model`` rows matching ``numerator`` among those matching ``denominator``."""
+    def __init__(self, key, label, model, numerator, denominator=None):
+        self.key = key
+        self.label = label
+        self.model = model
+        self.numerator = numerator
+        self.denominator = denominator
+
+    def aggregates(self):
+        """The two counts this rate needs, named so they can share a query with other rates."""
+        if self.denominator is None:
+            return {
+                f"{self.key}__numerator": Count("pk", filter=self.numerator),
+                f"{self.key}__denominator": Count("pk"),
+            }
+        return {
+            f"{self.key}__numerator": Count("pk", filter=self.numerator & self.denominator),
+            f"{self.key}__denominator": Count("pk", filter=self.denominator),
+        }
+
+
+INDICATORS = {}
+
+
+def register(rate):
+    INDICATORS[rate.key] = rate
+    return rate
+
+
+register(Rate("student_awareness_rate", "Students aware of violence (%)", Student, Q(knowledge_on_violence=True)))
+register(Rate("student_vac_rate", "Students who experienced violence (%)", Student, Q(experienced_vac=True)))
+register(Rate("student_reporting_rate", "Students reporting violence (%)", Student, Q(reporting_violence=True)))
+register(Rate(
+    "student_vac_reporting_rate", "Students who experienced violence and reported it (%)",
+    Student, Q(reporting_violence=True), denominator=Q(experienced_vac=True),
+))
+register(Rate("teacher_reporting_rate", "Teachers reporting violence (%)", Teacher, Q(reporting_violence=True)))
+register(Rate("parent_reporting_rate", "Parents reporting violence (%)", Parent, Q(reporting_violence=True)))
+register(Rate("parent_physical_punishment_rate", "Parents using physical punishment (%)", Parent, Q(physical_punishment=True)))
+
+
+def choices():
+    """(key, label) pairs for the Indicator source select box."""
+    return [(key, rate.label) for key, rate in INDICATORS.items()]
+
+
+def evaluate(keys=None):
+    """{key: percentage} for the given registered rates (all of them by default)."""
+    rates = [INDICATORS[key] for key in keys] if keys is not None else list(INDICATORS.values())
+
+    by_model = {}
+    for rate in rates:
+        by_model.setdefault(rate.model, {}).update(rate.aggregates())
+
+    counts = {}
+    for model, aggregates in by_model.items():
+        counts.update(model.objects.aggregate(**aggregates))
+
+    values = {}
+    for rate in rates:
+        numerator = counts[f"{rate.key}__numerator"]
+        denominator = counts[f"{rate.key}__denominator"]
+        values[rate.key] = (numerator / denominator) * 100 if denominator > 0 else 0
+    return values
+
+
+def sync_actual_values(indicators=None):
+    """Write the computed rate into ``actual_value`` of every indicator linked to one."""
+    indicators = indicators if indicators is not None else Indicator.objects.all()
+    indicators = [indicator for indicator in indicators.exclude(source="") if indicator.source in INDICATORS]
+    if not indicators:
+        return
+    values = evaluate({indicator.source for indicator in indicators})
+    for indicator in indicators:
+        indicator.actual_value = round(values[indicator.source])
+    Indicator.objects.bulk_update(indicators, ["actual_value"])
+
+
+def sync_after_import(sender, **kwargs):
+    sync_actual_values()
@@ -1,7 +1,28 @@
 from django import forms
 from .models import Indicator
+from . import engine
 
 class IndicatorForm(forms.ModelForm):
+    source = forms.ChoiceField(
+        required=False,
+        label="Computed from",
+        help_text="Leave empty to enter the actual value by hand.",
+    )
+
     class Meta:
         model = Indicator
-        fields = ["name", "indicator_type", "target_value", "actual_value", "description", "proof_document"]
+        fields = ["name", "indicator_type", "target_value", "source", "actual_value", "description", "proof_document"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["source"].choices = [("", "---------")] + engine.choices()
+        self.fields["actual_value"].required = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        source = cleaned_data.get("source")
+        if source:
+            cleaned_data["actual_value"] = round(engine.evaluate([source])[source])
+        elif cleaned_data.get("actual_value") is None:
+            cleaned_data["actual_value"] = 0
+        return cleaned_data
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indicators', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='indicator',
+            name='source',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+    ]
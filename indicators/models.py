@@ -12,6 +12,8 @@ class Indicator(models.Model):
     indicator_type = models.CharField(max_length=50, choices=TYPE_CHOICES)
     target_value = models.IntegerField(default=0)
     actual_value = models.IntegerField(default=0)
+    # Key of a rate in indicators.engine; when set, actual_value is computed after each import
+    source = models.CharField(max_length=50, blank=True, default="")
     description = models.TextField(default="", blank=True)
     proof_document = models.FileField(upload_to="indicator_proofs/", blank=True, null=True)
 
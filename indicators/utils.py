@@ -1,16 +1,10 @@
-from data_collection.models import Student, Teacher, Parent
+from .engine import evaluate
 
 def student_awareness_rate():
-    total = Student.objects.count()
-    aware = Student.objects.filter(knowledge_on_violence=True).count()
-    return (aware / total) * 100 if total > 0 else 0
+    return evaluate(["student_awareness_rate"])["student_awareness_rate"]
 
 def teacher_reporting_rate():
-    total = Teacher.objects.count()
-    reporting = Teacher.objects.filter(reporting_violence=True).count()
-    return (reporting / total) * 100 if total > 0 else 0
+    return evaluate(["teacher_reporting_rate"])["teacher_reporting_rate"]
 
 def parent_reporting_rate():
-    total = Parent.objects.count()
-    reporting = Parent.objects.filter(reporting_violence=True).count()
-    return (reporting / total) * 100 if total > 0 else 0
+    return evaluate(["parent_reporting_rate"])["parent_reporting_rate"]
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class ReportsConfig(AppConfig):
     name = "reports"
+
+    def ready(self):
+        from data_collection.versioning import data_changed
+        from .cache import clear_report_cache
+        data_changed.connect(clear_report_cache, dispatch_uid="clear_report_cache")
@@ -0,0 +1,96 @@
+"""
+On-disk cache of generated export files (PDF / XLSX reports).
+
+Each file is stored once per data version as ``<stem>-v<version><ext>``
+under EXPORT_CACHE_DIR. Repeat downloads of an unchanged dataset are
+served straight from that file, or answered with 304 Not Modified when the
+browser already has it (ETag / Last-Modified). The directory is kept under
+EXPORT_CACHE_MAX_BYTES by evicting the least recently served files.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from data_collection.versioning import current_version
+
+
+def cache_dir():
+    path = settings.EXPORT_CACHE_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def artifact_path(name, version):
+    stem, ext = os.path.splitext(name)
+    return os.path.join(cache_dir(), f"{stem}-v{version}{ext}")
+
+
+def build_artifact(path, build):
+    """Run ``build(fileobj)`` into a temp file next to ``path`` and move it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as output:
+            build(output)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_stale(name, keep):
+    """Delete the files of ``name`` built for older data versions; they can never be served again."""
+    stem, ext = os.path.splitext(name)
+    for entry in os.scandir(cache_dir()):
+        if entry.path != keep and entry.name.startswith(f"{stem}-v") and entry.name.endswith(ext):
+            os.remove(entry.path)
+
+
+def evict(keep=None):
+    """Remove least recently served files until the cache fits in EXPORT_CACHE_MAX_BYTES."""
+    entries = [
+        entry for entry in os.scandir(cache_dir())
+        if entry.is_file() and not entry.name.endswith(".part") and entry.path != keep
+    ]
+    total = sum(entry.stat().st_size for entry in entries)
+    if keep and os.path.exists(keep):
+        total += os.path.getsize(keep)
+    for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+        if total <= settings.EXPORT_CACHE_MAX_BYTES:
+            break
+        total -= entry.stat().st_size
+        os.remove(entry.path)
+
+
+def cached_export(request, name, build, content_type):
+    """
+    Serve the export ``name`` for the current data version, building it with
+    ``build(fileobj)`` only if no cached copy exists.
+    """
+    data = current_version()
+    etag = quote_etag(f"{name}-v{data.version}")
+    last_modified = int(data.changed_at.timestamp())
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified["ETag"] = etag
+        return not_modified
+
+    path = artifact_path(name, data.version)
+    if os.path.exists(path):
+        os.utime(path)   # mark as recently served for the LRU eviction
+    else:
+        build_artifact(path, build)
+        remove_stale(name, keep=path)
+        evict(keep=path)
+
+    response = FileResponse(open(path, "rb"), as_attachment=True, filename=name, content_type=content_type)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # The browser may keep a copy but has to revalidate it on every download
+    response["Cache-Control"] = "private, no-cache"
+    return response
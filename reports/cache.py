@@ -0,0 +1,78 @@
+"""
+Cache of computed report contexts.
+
+The report and visualization pages build their context from aggregates
+that only change when the data does. ``cached_context`` keeps each view's
+context in the "reports" cache, keyed on the view, the data version and
+the query string (the filter set), so every user after the first is served
+without touching the respondent tables. Keys carry the data version, so a
+stale entry is never read even by another process; ``data_changed`` also
+clears the cache so old versions do not linger until they expire.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from data_collection.versioning import current_version
+
+
+def report_cache():
+    return caches[settings.REPORT_CACHE_ALIAS]
+
+
+class CacheStats:
+    """Hit / miss counters per view, for the settings dashboard (per process)."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def record(self, name, hit):
+        with self.lock:
+            counts = self.counts.setdefault(name, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def reset(self):
+        with self.lock:
+            self.counts = {}
+
+    def stats(self):
+        with self.lock:
+            rows = [
+                {"view": name, **counts, "requests": counts["hits"] + counts["misses"]}
+                for name, counts in sorted(self.counts.items())
+            ]
+        for row in rows:
+            row["hit_rate"] = round(row["hits"] / row["requests"] * 100, 1)
+        return rows
+
+
+cache_stats = CacheStats()
+
+
+def context_key(name, params):
+    filters = sorted(params.lists() if hasattr(params, "lists") else params.items())
+    digest = hashlib.sha256(repr(filters).encode()).hexdigest()[:16]
+    return f"context:{name}:v{current_version().version}:{digest}"
+
+
+def cached_context(name, request, build, params=None):
+    """
+    The context of view ``name`` for this request's filters, computed with ``build()`` on a miss.
+
+    ``params`` narrows the key to the parameters the context depends on
+    (by default the whole query string).
+    """
+    cache = report_cache()
+    key = context_key(name, request.GET if params is None else params)
+    context = cache.get(key)
+    cache_stats.record(name, hit=context is not None)
+    if context is None:
+        context = build()
+        cache.set(key, context)
+    return context
+
+
+def clear_report_cache(**kwargs):
+    report_cache().clear()
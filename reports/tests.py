@@ -1,3 +1,63 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from data_collection.models import Student
+from school_violence_mne import concurrency
+from .views import indicator_reports_context
+
+
+class IndicatorReportsQueryTests(TestCase):
+    """The indicators page must cost a fixed number of queries, however much data there is."""
+
+    def add_students(self, count, **answers):
+        for _ in range(count):
+            Student.objects.create(
+                id_number=f"S{Student.objects.count()}",
+                gender="Female",
+                forms_of_violence="Physical, Emotional",
+                perpetrators="Teacher",
+                **answers,
+            )
+
+    def test_query_count(self):
+        self.add_students(3, reporting_violence=True, experienced_vac=True)
+        self.add_students(2, reporting_violence=False, experienced_vac=False)
+
+        # One aggregate for the yes/no indicators, one grouped pass over the
+        # tag links and one for recurrence
+        with self.assertNumQueries(3):
+            context = indicator_reports_context()
+
+        self.assertEqual(context["reporting_yes"], 3)
+        self.assertEqual(context["reporting_no"], 2)
+        self.assertEqual(context["experienced_yes"], 3)
+        self.assertEqual(context["experienced_no"], 2)
+        self.assertEqual(context["reporting_rate"], 60.0)
+        self.assertEqual(context["prevalence_counts"], "[100.0, 100.0]")
+        self.assertEqual(context["perpetrator_labels"], '["Teacher"]')
+
+    def test_query_count_does_not_grow_with_data(self):
+        self.add_students(10, reporting_violence=True)
+        Student.objects.create(id_number="S-extra", perpetrators="Parent, Peer")
+
+        with self.assertNumQueries(3):
+            context = indicator_reports_context()
+
+        self.assertEqual(context["reporting_rate"], round(10 / 11 * 100, 2))
+        self.assertEqual(context["perpetrator_labels"], '["Teacher", "Parent", "Peer"]')
+
+
+class QueryPoolTests(TestCase):
+    def test_pool_size_capped_by_connections(self):
+        for workers, connections, expected in ((8, 10, 8), (8, 4, 3), (8, 1, 1), (8, None, 8)):
+            with self.subTest(workers=workers, connections=connections), \
+                    override_settings(DASHBOARD_QUERY_WORKERS=workers, DATABASE_CONNECTIONS_PER_PROCESS=connections):
+                self.assertEqual(concurrency.pool_size(), expected)
+
+    def test_pool_created_on_first_use(self):
+        with mock.patch.object(concurrency, "_executor", None):
+            self.assertIsNone(concurrency._executor)
+            executor = concurrency.query_executor()
+            self.assertIs(concurrency.query_executor(), executor)
+            executor.shutdown()
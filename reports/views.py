@@ -1,7 +1,13 @@
-import io, xlsxwriter, json, re, os
-from django.db.models import Count
+import io, xlsxwriter, json, os
+from django.db.models import Count, Q, Sum
 from django.shortcuts import render
 from data_collection.models import Student, Teacher, Parent 
+from data_collection.models import RespondentRollup, Gender
+from data_collection import rollups
+from data_collection.tags import tag_counts, tag_counts_by, tag_counts_many
+from .artifacts import cached_export
+from .cache import cached_context
+from .exports import XLSX_CONTENT_TYPE, Sheet, write_workbook
 from django.http import HttpResponse
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
@@ -10,39 +16,38 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from collections import Counter
 import datetime
+from functools import partial
 from reportlab.platypus import (
     SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
 )
 #from data_collection.models import ViolenceReport   # adjust app/model name if different
 from django.contrib.auth.decorators import login_required
+from school_violence_mne.concurrency import arender, async_login_required, gather_queries
 
 @login_required
 def visualization_reports(request):
+    context = cached_context("visualization_reports", request, visualization_reports_context)
+    return render(request, "reports/visualization.html", context)
+
+
+def visualization_reports_context():
     # Violence type distribution
-    violence_data = (
-        Student.objects.values("forms_of_violence")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-    violence_labels = [d["forms_of_violence"] or "Unknown" for d in violence_data]
-    violence_counts = [d["count"] for d in violence_data]
+    violence_data = tag_counts("forms_of_violence", [Student])
+    violence_labels = [name for name, _ in violence_data]
+    violence_counts = [count for _, count in violence_data]
 
     # Perpetrator analysis
-    perpetrator_data = (
-        Student.objects.values("perpetrators")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-    perpetrator_labels = [d["perpetrators"] or "Unknown" for d in perpetrator_data]
-    perpetrator_counts = [d["count"] for d in perpetrator_data]
+    perpetrator_data = tag_counts("perpetrators", [Student])
+    perpetrator_labels = [name for name, _ in perpetrator_data]
+    perpetrator_counts = [count for _, count in perpetrator_data]
 
     # Regional hotspots
     regional_data = (
-        Student.objects.values("region")
+        Student.objects.values("region__name")
         .annotate(count=Count("id"))
         .order_by("-count")
     )
-    regional_labels = [d["region"] or "Unknown" for d in regional_data]
+    regional_labels = [d["region__name"] or "Unknown" for d in regional_data]
     regional_counts = [d["count"] for d in regional_data]
 
     # Gender distribution
@@ -55,28 +60,22 @@ def visualization_reports(request):
     gender_counts = [d["count"] for d in gender_data]
 
     # Violence type by gender
-    violence_gender_data = (
-        Student.objects.values("forms_of_violence", "gender")
-        .annotate(count=Count("id"))
-        .order_by("forms_of_violence", "gender")
-    )
+    violence_gender_data = tag_counts_by("forms_of_violence", Student, "gender")
 
     # Organize into structure: {violence_type: {"Male": x, "Female": y}}
     violence_gender_dict = {}
-    for d in violence_gender_data:
-        vtype = d["forms_of_violence"] or "Unknown"
-        gender = d["gender"] or "Unknown"
-        count = d["count"]
+    for vtype, gender, count in violence_gender_data:
+        gender = gender or "Unknown"
         if vtype not in violence_gender_dict:
             violence_gender_dict[vtype] = {"Male": 0, "Female": 0, "Unknown": 0}
-        violence_gender_dict[vtype][gender] = count
+        violence_gender_dict[vtype][gender] = violence_gender_dict[vtype].get(gender, 0) + count
 
     violence_gender_labels = list(violence_gender_dict.keys())
     male_counts = [violence_gender_dict[v]["Male"] for v in violence_gender_labels]
     female_counts = [violence_gender_dict[v]["Female"] for v in violence_gender_labels]
     unknown_counts = [violence_gender_dict[v]["Unknown"] for v in violence_gender_labels]
 
-    return render(request, "reports/visualization.html", {
+    return {
         "violence_labels": json.dumps(violence_labels),
         "violence_counts": json.dumps(violence_counts),
         "perpetrator_labels": json.dumps(perpetrator_labels),
@@ -89,12 +88,17 @@ def visualization_reports(request):
         "male_counts": json.dumps(male_counts),
         "female_counts": json.dumps(female_counts),
         "unknown_counts": json.dumps(unknown_counts),
-    })
+    }
 
 ## this is the view for violence report 
 
 @login_required
 def violence_reports(request):
+    context = cached_context("violence_reports", request, violence_reports_context)
+    return render(request, "reports/violence_reports.html", context)
+
+
+def violence_reports_context():
     total_students = Student.objects.count()
 
     def calc_percentage(count):
@@ -109,16 +113,13 @@ def violence_reports(request):
     age_data = [(d["age_group"], d["count"], calc_percentage(d["count"]))
                 for d in Student.objects.filter(experienced_vac=True).values("age_group").annotate(count=Count("id"))]
 
-    forms_data = [(d["forms_of_violence"], d["count"])
-                  for d in Student.objects.values("forms_of_violence").annotate(count=Count("id"))]
+    forms_data = tag_counts("forms_of_violence", [Student])
 
-    perpetrators_data = [(d["perpetrators"], d["count"])
-                         for d in Student.objects.values("perpetrators").annotate(count=Count("id"))]
+    perpetrators_data = tag_counts("perpetrators", [Student])
 
-    places_data = [(d["vulnerable_places"], d["count"])
-                   for d in Student.objects.values("vulnerable_places").annotate(count=Count("id"))]
+    places_data = tag_counts("vulnerable_places", [Student])
 
-    return render(request, "reports/violence_reports.html", {
+    return {
         "total_students": total_students,
         "gender_data": gender_data,
         "disability_data": disability_data,
@@ -126,14 +127,17 @@ def violence_reports(request):
         "forms_data": forms_data,
         "perpetrators_data": perpetrators_data,
         "places_data": places_data,
-    })
+    }
 
 
 # PDF Export (with FAWE logo centered and formatted tables)
 @login_required
 def export_violence_pdf(request):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    return cached_export(request, "violence_reports_FAWE.pdf", build_violence_pdf, "application/pdf")
+
+
+def build_violence_pdf(output):
+    doc = SimpleDocTemplate(output, pagesize=A4)
     elements = []
     styles = getSampleStyleSheet()
 
@@ -158,9 +162,9 @@ def export_violence_pdf(request):
         ("Students Experienced Violence by Gender", [(d["gender"], d["count"], calc_percentage(d["count"])) for d in Student.objects.filter(experienced_vac=True).values("gender").annotate(count=Count("id"))], ["Gender", "Count", "Percentage"]),
         ("Students Experienced Violence by Disability", [(d["disability_status"], d["count"], calc_percentage(d["count"])) for d in Student.objects.filter(experienced_vac=True).values("disability_status").annotate(count=Count("id"))], ["Disability Status", "Count", "Percentage"]),
         ("Students Experienced Violence by Age Group", [(d["age_group"], d["count"], calc_percentage(d["count"])) for d in Student.objects.filter(experienced_vac=True).values("age_group").annotate(count=Count("id"))], ["Age Group", "Count", "Percentage"]),
-        ("List of Forms of Violence", [(d["forms_of_violence"], d["count"]) for d in Student.objects.values("forms_of_violence").annotate(count=Count("id"))], ["Form of Violence", "Frequency"]),
-        ("List of Perpetrators", [(d["perpetrators"], d["count"]) for d in Student.objects.values("perpetrators").annotate(count=Count("id"))], ["Perpetrator", "Frequency"]),
-        ("Lost of Vulnerable Places", [(d["vulnerable_places"], d["count"]) for d in Student.objects.values("vulnerable_places").annotate(count=Count("id"))], ["Place", "Frequency"]),
+        ("List of Forms of Violence", tag_counts("forms_of_violence", [Student]), ["Form of Violence", "Frequency"]),
+        ("List of Perpetrators", tag_counts("perpetrators", [Student]), ["Perpetrator", "Frequency"]),
+        ("Lost of Vulnerable Places", tag_counts("vulnerable_places", [Student]), ["Place", "Frequency"]),
     ]
 
     for title, data, headers in sections:
@@ -179,18 +183,17 @@ def export_violence_pdf(request):
         elements.append(Spacer(1, 20))
 
     doc.build(elements)
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type="application/pdf")
-    response['Content-Disposition'] = 'attachment; filename="violence_reports_FAWE.pdf"'
-    return response
 
 
 
 # Excel Export (with formatted headers and borders)
 @login_required
 def export_violence_excel(request):
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    return cached_export(request, "violence_reports_FAWE.xlsx", build_violence_excel, XLSX_CONTENT_TYPE)
+
+
+def build_violence_excel(output):
+    workbook = xlsxwriter.Workbook(output)
     worksheet = workbook.add_worksheet("Violence Reports")
 
     # Format styles
@@ -233,132 +236,117 @@ def export_violence_excel(request):
         row += 1
 
     # Forms
-    for d in Student.objects.values("forms_of_violence").annotate(count=Count("id")):
+    for name, count in tag_counts("forms_of_violence", [Student]):
         worksheet.write(row, 0, "Forms of Violence", cell_format)
-        worksheet.write(row, 1, d["forms_of_violence"], cell_format)
-        worksheet.write(row, 2, d["count"], cell_format)
+        worksheet.write(row, 1, name, cell_format)
+        worksheet.write(row, 2, count, cell_format)
         worksheet.write(row, 3, "", cell_format)
         row += 1
 
     # Perpetrators
-    for d in Student.objects.values("perpetrators").annotate(count=Count("id")):
+    for name, count in tag_counts("perpetrators", [Student]):
         worksheet.write(row, 0, "Perpetrators", cell_format)
-        worksheet.write(row, 1, d["perpetrators"], cell_format)
-        worksheet.write(row, 2, d["count"], cell_format)
+        worksheet.write(row, 1, name, cell_format)
+        worksheet.write(row, 2, count, cell_format)
         worksheet.write(row, 3, "", cell_format)
         row += 1
 
     # Places
-    for d in Student.objects.values("vulnerable_places").annotate(count=Count("id")):
+    for name, count in tag_counts("vulnerable_places", [Student]):
         worksheet.write(row, 0, "Vulnerable Places", cell_format)
-        worksheet.write(row, 1, d["vulnerable_places"], cell_format)
-        worksheet.write(row, 2, d["count"], cell_format)
+        worksheet.write(row, 1, name, cell_format)
+        worksheet.write(row, 2, count, cell_format)
         worksheet.write(row, 3, "", cell_format)
         row += 1
 
-    # Close workbook and return response
     workbook.close()
-    output.seek(0)
-    response = HttpResponse(
-        output,
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response['Content-Disposition'] = 'attachment; filename="violence_reports_FAWE.xlsx"'
-    return response
 
 ####... End of Violence report tab
 
 
-def split_values(text):
-    """Split text fields by commas, semicolons, or slashes."""
-    if not text:
-        return []
-    return [re.sub(r"\s+", " ", val.strip().title()) for val in re.split(r"[;,/]", text) if val.strip()]
+def ranked(counts, total):
+    """[(label, count), ...] -> [(label, count, percentage of total), ...]"""
+    return [(label, count, round((count / total) * 100, 1) if total else 0) for label, count in counts]
+
+
+def ranked_field(field):
+    """Rank the regions, districts or schools across students, teachers and parents, from the rollup table."""
+    rows = (
+        RespondentRollup.objects.filter(**{f"{field}__isnull": False})
+        .values_list(f"{field}__name")
+        .annotate(count=Sum("total"))
+        .order_by("-count", f"{field}__name")
+    )
+    return list(rows)
+
+
+def dashboard_queries():
+    """The independent aggregations behind the reports dashboard, by name."""
+    return {
+        "totals": rollups.summary,
+        "male": partial(rollups.summary, gender=Gender.MALE),
+        "female": partial(rollups.summary, gender=Gender.FEMALE),
+        "disabled": partial(rollups.summary, disability_status=True),
+        "regions": partial(ranked_field, "region"),
+        "districts": partial(ranked_field, "district"),
+        "schools": partial(ranked_field, "school"),
+        "forms_of_violence": partial(tag_counts, "forms_of_violence"),
+        "perpetrators": partial(tag_counts, "perpetrators"),
+        "vulnerable_places": partial(tag_counts, "vulnerable_places"),
+    }
+
+
+@async_login_required
+async def dashboard(request):
+    # The aggregations are independent, so they run concurrently
+    results = await gather_queries(dashboard_queries())
+    return await arender(request, "reports/dashboard.html", dashboard_context(results))
+
 
-def dashboard(request):
-    # --- Totals ---
-    student_total = Student.objects.count()
-    teacher_total = Teacher.objects.count()
-    parent_total = Parent.objects.count()
+def dashboard_context(results):
+    # --- Totals (read from the rollup table) ---
+    totals = results["totals"]
+    male = results["male"]
+    female = results["female"]
+    disabled = results["disabled"]
+
+    student_total = totals["student"]["total"]
+    teacher_total = totals["teacher"]["total"]
+    parent_total = totals["parent"]["total"]
     overall_total = student_total + teacher_total + parent_total
 
     # --- Gender breakdown ---
-    student_male = Student.objects.filter(gender__iexact="Male").count()
-    student_female = Student.objects.filter(gender__iexact="Female").count()
-    teacher_male = Teacher.objects.filter(gender__iexact="Male").count()
-    teacher_female = Teacher.objects.filter(gender__iexact="Female").count()
-    parent_male = Parent.objects.filter(gender__iexact="Male").count()
-    parent_female = Parent.objects.filter(gender__iexact="Female").count()
+    student_male = male["student"]["total"]
+    student_female = female["student"]["total"]
+    teacher_male = male["teacher"]["total"]
+    teacher_female = female["teacher"]["total"]
+    parent_male = male["parent"]["total"]
+    parent_female = female["parent"]["total"]
 
     # --- Disability breakdown (students only) ---
-    student_disabled = Student.objects.filter(disability_status=True).count()
+    student_disabled = disabled["student"]["total"]
     student_abled = student_total - student_disabled
 
     # --- Reporting counts ---
-    student_reporting = Student.objects.filter(reporting_violence=True).count()
-    teacher_reporting = Teacher.objects.filter(reporting_violence=True).count()
-    parent_reporting = Parent.objects.filter(reporting_violence=True).count()
+    student_reporting = totals["student"]["reporting"]
+    teacher_reporting = totals["teacher"]["reporting"]
+    parent_reporting = totals["parent"]["reporting"]
 
     # --- Violence experience ---
-    student_vac_total = Student.objects.filter(experienced_vac=True).count()
-    student_vac_female = Student.objects.filter(experienced_vac=True, gender__iexact="Female").count()
-    student_vac_disabled = Student.objects.filter(experienced_vac=True, disability_status=True).count()
-
-    # --- Regions ranked ---
-    regions = Counter()
-    for s in Student.objects.exclude(region=""):
-        regions.update([s.region.strip().title()])
-    for t in Teacher.objects.exclude(region=""):
-        regions.update([t.region.strip().title()])
-    for p in Parent.objects.exclude(region=""):
-        regions.update([p.region.strip().title()])
-    ranked_regions = [(region, count, round((count / overall_total) * 100, 1)) for region, count in regions.most_common()]
-
-    # --- Districts ranked ---
-    districts = Counter()
-    for s in Student.objects.exclude(district=""):
-        districts.update([s.district.strip().title()])
-    for t in Teacher.objects.exclude(district=""):
-        districts.update([t.district.strip().title()])
-    for p in Parent.objects.exclude(district=""):
-        districts.update([p.district.strip().title()])
-    ranked_districts = [(district, count, round((count / overall_total) * 100, 1)) for district, count in districts.most_common()]
-
-    # --- Schools ranked ---
-    schools = Counter()
-    for s in Student.objects.exclude(school=""):
-        schools.update([s.school.strip().title()])
-    for t in Teacher.objects.exclude(school=""):
-        schools.update([t.school.strip().title()])
-    for p in Parent.objects.exclude(school=""):
-        schools.update([p.school.strip().title()])
-    ranked_schools = [(school, count, round((count / overall_total) * 100, 1)) for school, count in schools.most_common()]
-
-    # --- Forms of violence ranked ---
-    forms_of_violence = Counter()
-    for s in Student.objects.exclude(forms_of_violence=""):
-        forms_of_violence.update(split_values(s.forms_of_violence))
-    for t in Teacher.objects.exclude(forms_of_violence=""):
-        forms_of_violence.update(split_values(t.forms_of_violence))
-    for p in Parent.objects.exclude(forms_of_violence=""):
-        forms_of_violence.update(split_values(p.forms_of_violence))
-    ranked_forms_of_violence = [(form, count, round((count / overall_total) * 100, 1)) for form, count in forms_of_violence.most_common()]
-
-    # --- Perpetrators ranked (only Students have this field) ---
-    perpetrators = Counter()
-    for s in Student.objects.exclude(perpetrators=""):
-        perpetrators.update(split_values(s.perpetrators))
-    ranked_perpetrators = [(perp, count, round((count / overall_total) * 100, 1)) for perp, count in perpetrators.most_common()]
-
-    # --- Vulnerable places ranked ---
-    vulnerable_places = Counter()
-    for s in Student.objects.exclude(vulnerable_places=""):
-        vulnerable_places.update(split_values(s.vulnerable_places))
-    for t in Teacher.objects.exclude(vulnerable_places=""):
-        vulnerable_places.update(split_values(t.vulnerable_places))
-    for p in Parent.objects.exclude(vulnerable_places=""):
-        vulnerable_places.update(split_values(p.vulnerable_places))
-    ranked_vulnerable_places = [(place, count, round((count / overall_total) * 100, 1)) for place, count in vulnerable_places.most_common()]
+    student_vac_total = totals["student"]["experienced_vac"]
+    student_vac_female = female["student"]["experienced_vac"]
+    student_vac_disabled = disabled["student"]["experienced_vac"]
+
+    # --- Regions / districts / schools ranked ---
+    ranked_regions = ranked(results["regions"], overall_total)
+    ranked_districts = ranked(results["districts"], overall_total)
+    ranked_schools = ranked(results["schools"], overall_total)
+
+    # --- Multi-select answers ranked from the tag links ---
+    # (perpetrators only exist on Students)
+    ranked_forms_of_violence = ranked(results["forms_of_violence"], overall_total)
+    ranked_perpetrators = ranked(results["perpetrators"], overall_total)
+    ranked_vulnerable_places = ranked(results["vulnerable_places"], overall_total)
 
     # --- Context dictionary ---
     context = {
@@ -395,7 +383,7 @@ def dashboard(request):
 
     context["summary_highlights"] = summary_highlights
 
-    return render(request, "reports/dashboard.html", context)
+    return context
 ###.......End of Dashboard view
 
 
@@ -404,166 +392,113 @@ def dashboard(request):
 
 @login_required
 def datacollection_reports(request):
-    # Fetch all records from your data collection app
-    students = Student.objects.all()
-    teachers = Teacher.objects.all()
-    parents = Parent.objects.all()
-
-    # Render into the template
+    # Rows are fetched page by page by the shared respondent tables (data_collection.tables)
     return render(request, "reports/datacollection.html", {
         "title": "Data Collection Reports",
-        "students": students,
-        "teachers": teachers,
-        "parents": parents,
     })
 
 
-def export_datacollection_excel(request):
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+PLACE_COLUMNS = ("region__name", "district__name", "school__name")
 
-    # Format styles
-    header_format = workbook.add_format({'bold': True, 'bg_color': '#D7E4BC', 'border': 1, 'align': 'center'})
-    cell_format = workbook.add_format({'border': 1, 'align': 'center'})
 
-    # --- Students Sheet ---
-    ws_students = workbook.add_worksheet("Students")
-    student_headers = [
-        "ID Number", "Region", "District", "School", "Gender", "Age Group",
-        "Disability", "Knowledge on Violence", "Experienced VAC",
-        "Forms of Violence", "Perpetrators", "Vulnerable Places",
-        "Reporting Violence", "Effectiveness Reporting System"
+def export_datacollection_excel(request):
+    return cached_export(request, "datacollection_report.xlsx", build_datacollection_excel, XLSX_CONTENT_TYPE)
+
+
+def build_datacollection_excel(output):
+    sheets = [
+        Sheet("Students", [
+            "ID Number", "Region", "District", "School", "Gender", "Age Group",
+            "Disability", "Knowledge on Violence", "Experienced VAC",
+            "Forms of Violence", "Perpetrators", "Vulnerable Places",
+            "Reporting Violence", "Effectiveness Reporting System"
+        ], Student.objects.order_by("pk"), [
+            "id_number", *PLACE_COLUMNS, "gender", "age_group",
+            "disability_status", "knowledge_on_violence", "experienced_vac",
+            "forms_of_violence", "perpetrators", "vulnerable_places",
+            "reporting_violence", "effectiveness_reporting_system"
+        ]),
+        Sheet("Teachers", [
+            "ID Number", "Region", "District", "School", "Gender", "Age Group",
+            "Marital Status", "Education Level", "Forms of Violence",
+            "Reporting Violence", "Vulnerable Places", "Right to Discipline Child",
+            "Effective Handling VAC", "Training Received"
+        ], Teacher.objects.order_by("pk"), [
+            "id_number", *PLACE_COLUMNS, "gender", "age_group",
+            "marital_status", "education_level", "forms_of_violence",
+            "reporting_violence", "vulnerable_places", "right_to_discipline_child",
+            "effective_handling_vac", "training_received"
+        ]),
+        Sheet("Parents", [
+            "ID Number", "Region", "District", "School", "Gender", "Age Group",
+            "Marital Status", "Education Level", "Forms of Violence",
+            "Reporting Violence", "Vulnerable Places", "Employment",
+            "Physical Punishment", "Believe in Child Punishment",
+            "Effectiveness Positive Punishment", "Child Comforting",
+            "Impose Rules to Child", "Set Rules with Child"
+        ], Parent.objects.order_by("pk"), [
+            "id_number", *PLACE_COLUMNS, "gender", "age_group",
+            "marital_status", "education_level", "forms_of_violence",
+            "reporting_violence", "vulnerable_places", "employment",
+            "physical_punishment", "believe_in_child_punishment",
+            "effectiveness_positive_punishment", "child_comforting",
+            "impose_rules_to_child", "set_rules_with_child"
+        ]),
     ]
-    for col, header in enumerate(student_headers):
-        ws_students.write(0, col, header, header_format)
+    write_workbook(output, sheets)
 
-    row = 1
-    for s in Student.objects.all():
-        ws_students.write(row, 0, s.id_number, cell_format)
-        ws_students.write(row, 1, s.region, cell_format)
-        ws_students.write(row, 2, s.district, cell_format)
-        ws_students.write(row, 3, s.school, cell_format)
-        ws_students.write(row, 4, s.gender, cell_format)
-        ws_students.write(row, 5, s.age_group, cell_format)
-        ws_students.write(row, 6, "Yes" if s.disability_status else "No", cell_format)
-        ws_students.write(row, 7, "Yes" if s.knowledge_on_violence else "No", cell_format)
-        ws_students.write(row, 8, "Yes" if s.experienced_vac else "No", cell_format)
-        ws_students.write(row, 9, s.forms_of_violence, cell_format)
-        ws_students.write(row, 10, s.perpetrators, cell_format)
-        ws_students.write(row, 11, s.vulnerable_places, cell_format)
-        ws_students.write(row, 12, "Yes" if s.reporting_violence else "No", cell_format)
-        ws_students.write(row, 13, s.effectiveness_reporting_system, cell_format)
-        row += 1
 
-    # --- Teachers Sheet ---
-    ws_teachers = workbook.add_worksheet("Teachers")
-    teacher_headers = [
-        "ID Number", "Region", "District", "School", "Gender", "Age Group",
-        "Marital Status", "Education Level", "Forms of Violence",
-        "Reporting Violence", "Vulnerable Places", "Right to Discipline Child",
-        "Effective Handling VAC", "Training Received"
-    ]
-    for col, header in enumerate(teacher_headers):
-        ws_teachers.write(0, col, header, header_format)
+### End of data Collection view
 
-    row = 1
-    for t in Teacher.objects.all():
-        ws_teachers.write(row, 0, t.id_number, cell_format)
-        ws_teachers.write(row, 1, t.region, cell_format)
-        ws_teachers.write(row, 2, t.district, cell_format)
-        ws_teachers.write(row, 3, t.school, cell_format)
-        ws_teachers.write(row, 4, t.gender, cell_format)
-        ws_teachers.write(row, 5, t.age_group, cell_format)
-        ws_teachers.write(row, 6, t.marital_status, cell_format)
-        ws_teachers.write(row, 7, t.education_level, cell_format)
-        ws_teachers.write(row, 8, t.forms_of_violence, cell_format)
-        ws_teachers.write(row, 9, "Yes" if t.reporting_violence else "No", cell_format)
-        ws_teachers.write(row, 10, t.vulnerable_places, cell_format)
-        ws_teachers.write(row, 11, "Yes" if t.right_to_discipline_child else "No", cell_format)
-        ws_teachers.write(row, 12, t.effective_handling_vac, cell_format)
-        ws_teachers.write(row, 13, t.training_received, cell_format)
-        row += 1
+@login_required
+def indicator_reports(request):
+    context = cached_context("indicator_reports", request, indicator_reports_context)
+    return render(request, "reports/indicators.html", context)
 
-    # --- Parents Sheet ---
-    ws_parents = workbook.add_worksheet("Parents")
-    parent_headers = [
-        "ID Number", "Region", "District", "School", "Gender", "Age Group",
-        "Marital Status", "Education Level", "Forms of Violence",
-        "Reporting Violence", "Vulnerable Places", "Employment",
-        "Physical Punishment", "Believe in Child Punishment",
-        "Effectiveness Positive Punishment", "Child Comforting",
-        "Impose Rules to Child", "Set Rules with Child"
-    ]
-    for col, header in enumerate(parent_headers):
-        ws_parents.write(0, col, header, header_format)
 
-    row = 1
-    for p in Parent.objects.all():
-        ws_parents.write(row, 0, p.id_number, cell_format)
-        ws_parents.write(row, 1, p.region, cell_format)
-        ws_parents.write(row, 2, p.district, cell_format)
-        ws_parents.write(row, 3, p.school, cell_format)
-        ws_parents.write(row, 4, p.gender, cell_format)
-        ws_parents.write(row, 5, p.age_group, cell_format)
-        ws_parents.write(row, 6, p.marital_status, cell_format)
-        ws_parents.write(row, 7, p.education_level, cell_format)
-        ws_parents.write(row, 8, p.forms_of_violence, cell_format)
-        ws_parents.write(row, 9, "Yes" if p.reporting_violence else "No", cell_format)
-        ws_parents.write(row, 10, p.vulnerable_places, cell_format)
-        ws_parents.write(row, 11, p.employment, cell_format)
-        ws_parents.write(row, 12, "Yes" if p.physical_punishment else "No", cell_format)
-        ws_parents.write(row, 13, "Yes" if p.believe_in_child_punishment else "No", cell_format)
-        ws_parents.write(row, 14, p.effectiveness_positive_punishment, cell_format)
-        ws_parents.write(row, 15, "Yes" if p.child_comforting else "No", cell_format)
-        ws_parents.write(row, 16, "Yes" if p.impose_rules_to_child else "No", cell_format)
-        ws_parents.write(row, 17, "Yes" if p.set_rules_with_child else "No", cell_format)
-        row += 1
+# Every yes/no indicator is one conditional count in the same aggregate query
+INDICATOR_COUNTS = {
+    "reporting_yes": Q(reporting_violence=True),
+    "reporting_no": Q(reporting_violence=False),
+    "experienced_yes": Q(experienced_vac=True),
+    "experienced_no": Q(experienced_vac=False),
+    "effective_cases": Q(effectiveness_reporting_system=True),
+    "ineffective_cases": Q(effectiveness_reporting_system=False),
+}
 
-    # Close workbook and return response
-    workbook.close()
-    output.seek(0)
-    response = HttpResponse(
-        output,
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response['Content-Disposition'] = 'attachment; filename="datacollection_report.xlsx"'
-    return response
+# Multi-select questions broken down in one grouped pass over the tag links
+INDICATOR_BREAKDOWNS = ("forms_of_violence", "perpetrators")
 
 
-### End of data Collection view
+def indicator_reports_context():
+    counts = Student.objects.aggregate(
+        total_students=Count("pk"),
+        **{name: Count("pk", filter=condition) for name, condition in INDICATOR_COUNTS.items()},
+    )
+    breakdowns = tag_counts_many(INDICATOR_BREAKDOWNS, Student)
 
-@login_required
-def indicator_reports(request):
-    total_students = Student.objects.count()
+    total_students = counts["total_students"]
 
     # 1. Students reporting violence
-    reporting_yes = Student.objects.filter(reporting_violence=True).count()
-    reporting_no = Student.objects.filter(reporting_violence=False).count()
+    reporting_yes = counts["reporting_yes"]
+    reporting_no = counts["reporting_no"]
     reporting_rate = round((reporting_yes / total_students) * 100, 2) if total_students > 0 else 0
 
     # 2. Experienced vs Unexperienced VAC
-    experienced_yes = Student.objects.filter(experienced_vac=True).count()
-    experienced_no = Student.objects.filter(experienced_vac=False).count()
+    experienced_yes = counts["experienced_yes"]
+    experienced_no = counts["experienced_no"]
     experienced_rate = round((experienced_yes / total_students) * 100, 2) if total_students > 0 else 0
     unexperienced_rate = round((experienced_no / total_students) * 100, 2) if total_students > 0 else 0
 
     # 3. Forms of Violence Experienced (%)
-    prevalence_data = (
-        Student.objects.values("forms_of_violence")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-    prevalence_labels = [d["forms_of_violence"] or "Unknown" for d in prevalence_data]
-    prevalence_counts = [round((d["count"] / total_students) * 100, 2) for d in prevalence_data]
+    prevalence_data = breakdowns["forms_of_violence"]
+    prevalence_labels = [name for name, _ in prevalence_data]
+    prevalence_counts = [round((count / total_students) * 100, 2) for _, count in prevalence_data]
 
     # 4. Cases by Perpetrators (%)
-    perpetrator_data = (
-        Student.objects.values("perpetrators")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-    perpetrator_labels = [d["perpetrators"] or "Unknown" for d in perpetrator_data]
-    perpetrator_counts = [round((d["count"] / total_students) * 100, 2) for d in perpetrator_data]
+    perpetrator_data = breakdowns["perpetrators"]
+    perpetrator_labels = [name for name, _ in perpetrator_data]
+    perpetrator_counts = [round((count / total_students) * 100, 2) for _, count in perpetrator_data]
 
     # 5. Reported vs Unreported Violence
     reported_cases = reporting_yes
@@ -573,31 +508,27 @@ def indicator_reports(request):
     unreported_rate = round((unreported_cases / violence_cases) * 100, 2) if violence_cases > 0 else 0
 
     # 6. Effectiveness of Reporting System
-    effective_cases = Student.objects.filter(effectiveness_reporting_system=True).count()
-    ineffective_cases = Student.objects.filter(effectiveness_reporting_system=False).count()
+    effective_cases = counts["effective_cases"]
+    ineffective_cases = counts["ineffective_cases"]
     effectiveness_rate = round((effective_cases / reported_cases) * 100, 2) if reported_cases > 0 else 0
     unresolved_rate = round((ineffective_cases / reported_cases) * 100, 2) if reported_cases > 0 else 0
 
     # 7. Recurrence Rate
-    recurrence_data = (
+    recurrent_students = (
         Student.objects.values("id_number")
         .annotate(case_count=Count("id"))
         .filter(case_count__gt=1)
+        .count()
     )
-    recurrent_students = recurrence_data.count()
     recurrence_rate = round((recurrent_students / total_students) * 100, 2) if total_students > 0 else 0
     non_recurrence_rate = round(100 - recurrence_rate, 2) if total_students > 0 else 0
 
     # Outcome Indicators (Disciplinary Actions) — optional if field exists
-    disciplinary_data = (
-        Student.objects.values("perpetrators")  # placeholder: replace with actual field if exists
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-    disciplinary_labels = [d["perpetrators"] or "Unknown" for d in disciplinary_data]
-    disciplinary_counts = [d["count"] for d in disciplinary_data]
+    disciplinary_data = perpetrator_data  # placeholder: replace with actual field if exists
+    disciplinary_labels = [name for name, _ in disciplinary_data]
+    disciplinary_counts = [count for _, count in disciplinary_data]
 
-    return render(request, "reports/indicators.html", {
+    return {
         # Headline percentages
         "reporting_rate": reporting_rate,
         "experienced_rate": experienced_rate,
@@ -624,7 +555,7 @@ def indicator_reports(request):
         "perpetrator_counts": json.dumps(perpetrator_counts),
         "disciplinary_labels": json.dumps(disciplinary_labels),
         "disciplinary_counts": json.dumps(disciplinary_counts),
-    })
+    }
 
 
 ###... Analysis views
@@ -638,11 +569,11 @@ def analysis_reports(request):
     # Age distribution
     effects_by_age = dict(Counter(students.values_list("age_group", flat=True)))
 
-    # Perpetrators (stored as text, may need splitting if multiple values are saved)
-    effects_by_perpetrator = dict(Counter(students.values_list("perpetrators", flat=True)))
+    # Perpetrators
+    effects_by_perpetrator = dict(tag_counts("perpetrators", [Student]))
 
     # Vulnerable places
-    effects_by_place = dict(Counter(students.values_list("vulnerable_places", flat=True)))
+    effects_by_place = dict(tag_counts("vulnerable_places", [Student]))
 
     # Reporting effectiveness
     reporting_effectiveness = {
@@ -652,7 +583,7 @@ def analysis_reports(request):
 
     # Disability impacts
     disability_total = students.filter(disability_status=True).count()
-    disability_breakdown = dict(Counter(students.values_list("forms_of_violence", flat=True)))
+    disability_breakdown = dict(tag_counts("forms_of_violence", [Student]))
 
     context = {
         "effects_by_gender": effects_by_gender,
@@ -0,0 +1,108 @@
+"""
+Helpers for the async dashboard views.
+
+A dashboard is described as a dict of independent, zero-argument query
+functions. ``gather_queries`` runs them concurrently, each on a worker
+thread with its own database connection, so the page waits for the
+slowest aggregation instead of the sum of all of them. ``run_queries``
+runs the same dict one after another (the synchronous baseline used by
+the ``benchmark_dashboards`` command).
+
+The worker threads belong to one process-wide pool rather than to the
+event loop: under WSGI every request runs its async view on a new loop,
+whose default executor (and its threads' connections) would be thrown
+away with it. Pool threads keep their connections between requests for
+as long as CONN_MAX_AGE allows. Their queries are counted towards the
+request in the request profiler.
+
+The pool is created by the first dashboard that needs it, so management
+commands and tests that never gather queries start no threads, and it
+is shut down when the process exits. Every pool thread may hold a
+connection open, so the pool is capped at DATABASE_CONNECTIONS_PER_PROCESS
+minus the one the request thread itself uses.
+
+Django's own ``acount`` / ``aaggregate`` are not used here: in Django 4.2
+they wrap ``sync_to_async(thread_sensitive=True)``, which funnels every
+query through one shared thread, so gathering them would still run the
+queries one at a time.
+"""
+import asyncio
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
+from django.shortcuts import render
+
+from .middleware import profile_queries
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def pool_size():
+    """DASHBOARD_QUERY_WORKERS, within this process' share of the database's connections."""
+    workers = getattr(settings, "DASHBOARD_QUERY_WORKERS", 8)
+    connections = getattr(settings, "DATABASE_CONNECTIONS_PER_PROCESS", None)
+    if connections is not None:
+        workers = min(workers, connections - 1)
+    return max(1, workers)
+
+
+def query_executor():
+    """The process-wide worker pool, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=pool_size(), thread_name_prefix="dashboard-query")
+                atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+
+def run_queries(queries):
+    """{name: result} running each query function in turn on the current connection."""
+    return {name: query() for name, query in queries.items()}
+
+
+def _on_worker(query):
+    def run():
+        # Worker threads hold their own connections; expire them the way a
+        # request would (kept for reuse while CONN_MAX_AGE allows it)
+        close_old_connections()
+        try:
+            with profile_queries():
+                return query()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def gather_queries(queries):
+    """{name: result} running every query function concurrently on worker threads."""
+    executor = query_executor()
+    results = await asyncio.gather(*(
+        sync_to_async(_on_worker(query), thread_sensitive=False, executor=executor)() for query in queries.values()
+    ))
+    return dict(zip(queries, results))
+
+
+def async_login_required(view):
+    """``login_required`` for ``async def`` views (Django 4.2's decorator only wraps sync views)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def arender(request, template_name, context):
+    """``render`` from an async view; template rendering stays synchronous."""
+    return await sync_to_async(render)(request, template_name, context)
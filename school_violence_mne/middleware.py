@@ -1,14 +1,74 @@
-from django.utils.deprecation import MiddlewareMixin
+import hashlib
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
 from django.shortcuts import redirect
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import Template
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+class ConditionalCacheMiddleware:
+    """
+    Browser caching policy.
+
+    Read-only report and visualization pages (CONDITIONAL_GET_PATHS) get an
+    ETag derived from the data version, the user and their role, the
+    session and the CSRF cookie (pages embed the CSRF token), and a
+    request whose If-None-Match still matches is answered with 304 Not
+    Modified before the view runs. Every other page keeps the blanket
+    no-store. Responses that set their own ETag (cached exports) are left
+    alone.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, "CONDITIONAL_GET_PATHS", ()))
 
-class NoCacheMiddleware(MiddlewareMixin):
-    def process_response(self, request, response):
+    def etag_for(self, request):
+        if request.method not in ("GET", "HEAD") or not request.path.startswith(self.paths):
+            return None
+        user = request.user
+        if not user.is_authenticated:
+            return None
+        from data_collection.versioning import current_version
+        # Pages embed the CSRF token, which login() rotates along with the session
+        csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")
+        session = getattr(request, "session", None)
+        key = (
+            f"{current_version().version}:{user.pk}:{getattr(user, 'role', '')}:"
+            f"{session.session_key if session else ''}:{csrf}:{request.get_full_path()}"
+        )
+        return quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])
+
+    def __call__(self, request):
+        etag = self.etag_for(request)
+        if etag:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return self.revalidate(not_modified, etag)
+
+        response = self.get_response(request)
+        if response.has_header('ETag'):
+            return response
+        if etag and response.status_code == 200:
+            return self.revalidate(response, etag)
         response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response['Pragma'] = 'no-cache'
         response['Expires'] = '0'
         return response
 
+    def revalidate(self, response, etag):
+        # The browser may keep its copy but must check the ETag on every visit
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
 
 class LoginRequiredMiddleware:
     """
@@ -17,10 +77,8 @@ class LoginRequiredMiddleware:
     """
     def __init__(self, get_response):
         self.get_response = get_response
-
-    def __call__(self, request):
-        # Public paths that do not require login
-        public_paths = [
+        # Public paths that do not require login, as one tuple for str.startswith
+        self.public_paths = (
             settings.LOGIN_URL,              # login page
             '/accounts/logout/',             # logout endpoint
             '/accounts/password_reset/',     # password reset start
@@ -28,10 +86,177 @@ class LoginRequiredMiddleware:
             '/admin/',                       # admin site
             settings.STATIC_URL,             # static files
             settings.MEDIA_URL if hasattr(settings, "MEDIA_URL") else "/media/",
-        ]
+        )
 
-        if not request.user.is_authenticated:
-            if not any(request.path.startswith(path) for path in public_paths):
-                return redirect(settings.LOGIN_URL)
+    def __call__(self, request):
+        # Public paths are let through without loading the session user
+        if not request.path.startswith(self.public_paths) and not request.user.is_authenticated:
+            return redirect(settings.LOGIN_URL)
 
         return self.get_response(request)
+
+
+# -------------------------------
+# Request profiling
+# -------------------------------
+_current_profile = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """SQL and template timings collected while one request is handled."""
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        # Async views also run queries on worker threads (see concurrency.py)
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper()
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.queries += 1
+                self.db_time += elapsed
+
+
+def profile_queries():
+    """
+    Context manager counting this thread's queries towards the current
+    request's profile (a no-op outside a profiled request).
+    """
+    stack = ExitStack()
+    profile = _current_profile.get()
+    if profile is not None:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(profile))
+    return stack
+
+
+_original_render = Template.render
+_render_lock = threading.Lock()
+_profiled_requests = 0
+
+
+@contextmanager
+def profile_templates():
+    """
+    Time template rendering for the current request's profile.
+
+    Template.render is only swapped for the timing version while at least
+    one profiled request is in flight, and restored when the last one ends.
+    """
+    global _profiled_requests
+    with _render_lock:
+        if not _profiled_requests:
+            Template.render = _profiled_render
+        _profiled_requests += 1
+    try:
+        yield
+    finally:
+        with _render_lock:
+            _profiled_requests -= 1
+            if not _profiled_requests:
+                Template.render = _original_render
+
+
+def _profiled_render(self, context):
+    # Only the outermost template is timed, so {% include %}s are not counted twice.
+    # Queries run lazily from the template count towards both template and DB time.
+    profile = _current_profile.get()
+    if profile is None or profile.template_depth:
+        return _original_render(self, context)
+    profile.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        profile.template_time += time.perf_counter() - started
+        profile.template_depth -= 1
+
+
+class ProfileStore:
+    """The last ``window`` samples per URL name, kept in this process' memory."""
+    METRICS = ("queries", "db_ms", "template_ms", "wall_ms")
+
+    def __init__(self, window):
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples = defaultdict(lambda: deque(maxlen=self.window))
+            self.requests = defaultdict(int)
+
+    def record(self, name, sample):
+        with self.lock:
+            self.samples[name].append(sample)
+            self.requests[name] += 1
+
+    def stats(self):
+        """One row per URL name with p50/p95/p99/max of every metric, slowest p95 wall time first."""
+        with self.lock:
+            snapshot = {name: list(samples) for name, samples in self.samples.items()}
+            requests = dict(self.requests)
+
+        rows = []
+        for name, samples in snapshot.items():
+            row = {"name": name, "requests": requests[name], "window": len(samples)}
+            for metric in self.METRICS:
+                values = sorted(sample[metric] for sample in samples)
+                row[metric] = {
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "p99": percentile(values, 99),
+                    "max": values[-1],
+                }
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["wall_ms"]["p95"], reverse=True)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+profile_store = ProfileStore(getattr(settings, "REQUEST_PROFILING_WINDOW", 500))
+
+
+class ProfilingMiddleware:
+    """
+    Records the SQL query count, DB time, template render time and wall
+    time of every request, per resolved URL name (e.g. "reports:dashboard"),
+    into ``profile_store``. Shown to Admins under Settings > Request Profiling.
+    Only installed when REQUEST_PROFILING is on (by default, with DEBUG).
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with profile_queries(), profile_templates():
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        wall_time = time.perf_counter() - started
+
+        match = request.resolver_match
+        if match is not None:
+            profile_store.record(match.view_name, {
+                "queries": profile.queries,
+                "db_ms": round(profile.db_time * 1000, 1),
+                "template_ms": round(profile.template_time * 1000, 1),
+                "wall_ms": round(wall_time * 1000, 1),
+            })
+        return response
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    "school_violence_mne.middleware.ProfilingMiddleware",       # per-view query/latency stats
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,7 +57,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",  # must be before
     "django.contrib.messages.middleware.MessageMiddleware",
     "school_violence_mne.middleware.LoginRequiredMiddleware",   # enforce login globally
-    "school_violence_mne.middleware.NoCacheMiddleware",
+    "school_violence_mne.middleware.ConditionalCacheMiddleware",  # ETag/304 for reports, no-store elsewhere
 ]
 
 
@@ -94,6 +95,10 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Keep connections open between requests; the async dashboards' worker
+        # threads reuse theirs instead of reconnecting for every query
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -111,6 +116,9 @@ DATABASES = {
 
 
 
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -162,3 +170,61 @@ LOGOUT_REDIRECT_URL = "/accounts/login/"      # after logout, return to login
 # Use your custom user model
 AUTH_USER_MODEL = "settings.CustomUser"
 
+# Sessions are read from the cache and only written through to the database;
+# users (with their role) are kept in process memory by the auth backend
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+AUTHENTICATION_BACKENDS = ["settings.backends.CachedModelBackend"]
+USER_CACHE_TIMEOUT = 60   # unused cached users expire; saves and deletes invalidate at once
+
+
+
+# Backups in settings/backups/: deleted after this many days, oldest first once the
+# directory grows past this size (the latest full backup is always kept)
+BACKUP_RETENTION_DAYS = 30
+BACKUP_MAX_TOTAL_MB = 1024
+
+# Worker threads the async dashboards run their aggregations on (one connection each)
+DASHBOARD_QUERY_WORKERS = 8
+# Connections one server process may hold (the request thread plus the query workers); set it to
+# the database's connection limit divided by the number of processes, e.g. 100 // 10 for PostgreSQL
+DATABASE_CONNECTIONS_PER_PROCESS = 10
+
+# Excel import: rows written per bulk_create / bulk_update batch
+DATA_IMPORT_BATCH_SIZE = 1000
+
+# Uploaded workbooks waiting for the import worker; outside MEDIA_ROOT so they are never served
+IMPORT_UPLOAD_DIR = os.path.join(BASE_DIR, "import_uploads")
+
+# Request profiling: per-view query count, DB/template/wall time (Settings > Request Profiling).
+# Adds a little overhead to every request, so it is off unless DEBUG is on.
+REQUEST_PROFILING = DEBUG
+REQUEST_PROFILING_WINDOW = 500   # samples kept per URL name for the percentiles
+
+# Generated PDF / XLSX exports, cached per data version (least recently served files evicted first)
+EXPORT_CACHE_DIR = os.path.join(BASE_DIR, "export_cache")
+EXPORT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# Read-only pages answered with ETag / 304 Not Modified (keyed on data version, user and role)
+CONDITIONAL_GET_PATHS = ("/reports/", "/visualization/", "/data/ajax/filter-options/")
+
+# Computed report / visualization contexts, keyed on view, data version and filters
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "reports": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "report-contexts",
+        "TIMEOUT": 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 500},
+    },
+    # Logged-in users (settings.backends). Must be shared by every worker process, so that a
+    # save in one invalidates the others; use Redis / Memcached when workers span hosts.
+    "users": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "user_cache"),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+REPORT_CACHE_ALIAS = "reports"
+USER_CACHE_ALIAS = "users"
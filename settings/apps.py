@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class SettingsConfig(AppConfig):
     name = "settings"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from .backends import forget_user
+        from .models import CustomUser
+        post_save.connect(forget_user, sender=CustomUser, dispatch_uid="forget_saved_user")
+        post_delete.connect(forget_user, sender=CustomUser, dispatch_uid="forget_deleted_user")
@@ -0,0 +1,63 @@
+"""
+Authentication backend that keeps user records (with their role) in the
+shared "users" cache.
+
+AuthenticationMiddleware loads ``request.user`` on every request; with
+the cached-db session engine that lookup was the only query left on
+most pages. Users are cached under a key that carries a per-user version
+token, and saving or deleting a user (user management, the admin,
+password changes, last_login updates) replaces the token. The cache is
+shared by every worker process, so the next request in any of them
+reloads the user: a deactivated or deleted user is logged out at once and
+a new password hash is seen everywhere. USER_CACHE_TIMEOUT only bounds
+how long unused entries are kept.
+"""
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def user_cache():
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def user_version(pk):
+    """The current version token of user ``pk``, created on first use."""
+    cache = user_cache()
+    key = f"user-version:{pk}"
+    version = cache.get(key)
+    if version is None:
+        # add() so two processes racing here agree on one token
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def user_key(pk, version):
+    return f"user:{pk}:{version}"
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose ``get_user`` is served from the "users" cache."""
+    def get_user(self, user_id):
+        try:
+            pk = int(user_id)
+        except (TypeError, ValueError):
+            return super().get_user(user_id)
+        # The token is read before the row: a save in between changes it, so
+        # what is stored below is never served once it is stale
+        key = user_key(pk, user_version(pk))
+        cache = user_cache()
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(pk)
+            if user is not None:
+                cache.set(key, user, getattr(settings, "USER_CACHE_TIMEOUT", 60))
+        return user
+
+
+def forget_user(sender, instance, **kwargs):
+    # A new token: every process misses on the old key from now on
+    user_cache().set(f"user-version:{instance.pk}", uuid.uuid4().hex, timeout=None)
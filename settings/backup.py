@@ -0,0 +1,210 @@
+"""
+Database backups, written to settings/backups/ and streamed to the browser.
+
+A backup is a gzip-compressed JSON fixture (loaddata reads .json.gz as
+is). It is serialized model by model, CHUNK_SIZE rows at a time, and each
+compressed chunk is written to disk and handed to the response as soon as
+it is made, so neither side ever holds the whole dump in memory. The file
+only gets its final name once it is complete.
+
+A full backup holds every row. An incremental backup holds the respondent
+rows changed (``updated_at``) since the latest full backup started, plus
+the small lookup and configuration tables in full; restore the full
+backup first, then the incremental one. Deleted rows are not recorded.
+
+Tag links and rollup rows are left out of both: they are derived from the
+respondent rows and rebuilt after every restore. Sessions are left out as
+well; they are short-lived and a restored one would log a stale login
+back in.
+
+Retention only ever deletes backups this module wrote
+(backup_<stamp>_<kind>.json.gz); older plain backup_<stamp>.json files
+are listed but never removed.
+"""
+import datetime
+import os
+import re
+import zlib
+from itertools import islice
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.db import DEFAULT_DB_ALIAS, router
+from django.utils import timezone
+
+
+BACKUP_DIR = Path(__file__).resolve().parent / "backups"
+
+# Rows serialized (and compressed) per step
+CHUNK_SIZE = 2000
+
+KINDS = ("full", "incremental")
+
+STAMP_FORMAT = "%Y%m%d_%H%M%S"   # UTC
+
+# backup_20261018_154400_full.json.gz; older backups are plain backup_<stamp>.json (full, local time)
+FILENAME_RE = re.compile(r"^backup_(?P<stamp>\d{8}_\d{6})(?:_(?P<kind>full|incremental))?\.json(?:\.gz)?$")
+
+# Rebuilt from the respondent rows by restore_database
+DERIVED_MODELS = {"data_collection.respondentrollup"}
+DERIVED_FIELDS = {"tags"}
+
+# Not backed up at all
+SKIPPED_MODELS = DERIVED_MODELS | {"sessions.session"}
+
+
+class BackupError(Exception):
+    """A backup cannot be made (e.g. an incremental one without a full backup to start from)."""
+
+
+class Backup:
+    def __init__(self, path, started, kind, managed=True):
+        self.path = path
+        self.name = path.name
+        self.started = started
+        self.kind = kind
+        self.managed = managed   # written by stream_backup, so retention may delete it
+        self.size = path.stat().st_size
+
+
+def list_backups():
+    """The finished backups in BACKUP_DIR, oldest first."""
+    backups = []
+    if not BACKUP_DIR.is_dir():
+        return backups
+    for path in BACKUP_DIR.iterdir():
+        match = FILENAME_RE.match(path.name)
+        if not match:
+            continue
+        started = datetime.datetime.strptime(match["stamp"], STAMP_FORMAT)
+        if match["kind"]:
+            started = started.replace(tzinfo=datetime.timezone.utc)
+        else:
+            started = timezone.make_aware(started)
+        backups.append(Backup(path, started, match["kind"] or "full", managed=bool(match["kind"])))
+    return sorted(backups, key=lambda backup: backup.started)
+
+
+def latest_full(backups=None):
+    fulls = [backup for backup in (list_backups() if backups is None else backups) if backup.kind == "full"]
+    return fulls[-1] if fulls else None
+
+
+def backup_models():
+    """The models dumpdata would write, in dependency order, without the derived ones and sessions."""
+    app_list = {app_config: None for app_config in apps.get_app_configs() if app_config.models_module is not None}
+    return [
+        model for model in serializers.sort_dependencies(app_list.items(), allow_cycles=True)
+        if not model._meta.proxy
+        and model._meta.label_lower not in SKIPPED_MODELS
+        and router.allow_migrate_model(DEFAULT_DB_ALIAS, model)
+    ]
+
+
+def serialized_fields(model):
+    fields = [field.name for field in model._meta.local_fields if field.serialize]
+    fields += [field.name for field in model._meta.local_many_to_many if field.serialize and field.name not in DERIVED_FIELDS]
+    return fields
+
+
+def fixture_chunks(since=None):
+    """
+    The fixture as pieces of JSON text, CHUNK_SIZE rows per piece.
+
+    With ``since`` only the rows of models with an ``updated_at`` field
+    changed since then are included.
+    """
+    yield "["
+    first = True
+    for model in backup_models():
+        queryset = model._default_manager.order_by("pk")
+        if since is not None and any(field.name == "updated_at" for field in model._meta.local_fields):
+            queryset = queryset.filter(updated_at__gte=since)
+        fields = serialized_fields(model)
+        rows = queryset.iterator(chunk_size=CHUNK_SIZE)
+        while True:
+            chunk = list(islice(rows, CHUNK_SIZE))
+            if not chunk:
+                break
+            text = serializers.serialize("json", chunk, fields=fields)
+            yield ("" if first else ",") + text[1:-1]
+            first = False
+    yield "]\n"
+
+
+def stream_backup(kind="full"):
+    """
+    Start a backup: (filename, iterator of gzip bytes).
+
+    The iterator writes the same bytes to BACKUP_DIR as it goes and applies
+    the retention policy once the file is complete; if it is not consumed to
+    the end (e.g. the download is cancelled) the partial file is removed.
+    """
+    if kind not in KINDS:
+        raise BackupError(f"Unknown backup kind {kind!r}.")
+    since = None
+    if kind == "incremental":
+        base = latest_full()
+        if base is None:
+            raise BackupError("An incremental backup needs a full backup to start from.")
+        since = base.started
+    started = timezone.now().astimezone(datetime.timezone.utc)
+    filename = f"backup_{started.strftime(STAMP_FORMAT)}_{kind}.json.gz"
+    return filename, _write(BACKUP_DIR / filename, fixture_chunks(since))
+
+
+def _write(path, chunks):
+    BACKUP_DIR.mkdir(exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)   # gzip container
+    complete = False
+    try:
+        with open(partial, "wb") as f:
+            for text in chunks:
+                data = compressor.compress(text.encode())
+                if data:
+                    f.write(data)
+                    yield data
+            data = compressor.flush()
+            f.write(data)
+        os.replace(partial, path)
+        complete = True
+        apply_retention()
+        yield data
+    finally:
+        if not complete and partial.exists():
+            partial.unlink()
+
+
+def apply_retention(now=None):
+    """
+    Delete backups older than BACKUP_RETENTION_DAYS, then the oldest ones
+    until the backups this module wrote take up less than
+    BACKUP_MAX_TOTAL_MB. The latest full backup and the incrementals taken
+    after it are always kept, and so are legacy backup_<stamp>.json files.
+    Returns the names of the deleted files.
+    """
+    now = now or timezone.now()
+    max_age = datetime.timedelta(days=getattr(settings, "BACKUP_RETENTION_DAYS", 30))
+    max_bytes = getattr(settings, "BACKUP_MAX_TOTAL_MB", 1024) * 1024 * 1024
+
+    backups = list_backups()
+    base = latest_full(backups)
+    backups = [backup for backup in backups if backup.managed]
+    kept = [backup for backup in backups if base is not None and backup.started >= base.started]
+    candidates = [backup for backup in backups if backup not in kept]
+
+    removed = [backup for backup in candidates if now - backup.started > max_age]
+    remaining = [backup for backup in candidates if backup not in removed]
+    total = sum(backup.size for backup in remaining + kept)
+    for backup in remaining:   # oldest first
+        if total <= max_bytes:
+            break
+        removed.append(backup)
+        total -= backup.size
+
+    for backup in removed:
+        backup.path.unlink(missing_ok=True)
+    return [backup.name for backup in removed]
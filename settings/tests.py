@@ -1,3 +1,199 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from school_violence_mne import middleware
+from data_collection.models import Student, Teacher, Region
+from . import backends, backup
+from .models import CustomUser
+
+
+class BackupDirMixin:
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        patcher = mock.patch.object(backup, "BACKUP_DIR", self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, started, kind="full", size=100):
+        name = f"backup_{started.astimezone(datetime.timezone.utc).strftime(backup.STAMP_FORMAT)}_{kind}.json.gz"
+        (self.dir / name).write_bytes(b"x" * size)
+        return name
+
+    def names(self):
+        return sorted(path.name for path in self.dir.iterdir())
+
+
+class RetentionTests(BackupDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now().replace(microsecond=0)
+
+    def ago(self, days):
+        return self.now - datetime.timedelta(days=days)
+
+    @override_settings(BACKUP_RETENTION_DAYS=30, BACKUP_MAX_TOTAL_MB=1024)
+    def test_age_limit_keeps_latest_full_and_later_incrementals(self):
+        old_full = self.write(self.ago(60))
+        old_incremental = self.write(self.ago(50), "incremental")
+        latest_full = self.write(self.ago(45))
+        incremental = self.write(self.ago(40), "incremental")
+
+        removed = backup.apply_retention(now=self.now)
+
+        self.assertEqual(sorted(removed), sorted([old_full, old_incremental]))
+        self.assertEqual(self.names(), sorted([latest_full, incremental]))
+
+    @override_settings(BACKUP_RETENTION_DAYS=30, BACKUP_MAX_TOTAL_MB=2500 / (1024 * 1024))
+    def test_size_limit_removes_oldest_first(self):
+        first = self.write(self.ago(5), size=1000)
+        second = self.write(self.ago(4), "incremental", size=1000)
+        third = self.write(self.ago(3), size=1000)
+        latest_full = self.write(self.ago(2), size=1000)
+        incremental = self.write(self.ago(1), "incremental", size=1000)
+
+        removed = backup.apply_retention(now=self.now)
+
+        # 5000 bytes against a 2500 byte limit: the three oldest go, the kept pair stays
+        self.assertEqual(removed, [first, second, third])
+        self.assertEqual(self.names(), sorted([latest_full, incremental]))
+
+    @override_settings(BACKUP_RETENTION_DAYS=30, BACKUP_MAX_TOTAL_MB=0)
+    def test_latest_full_survives_any_limit(self):
+        latest_full = self.write(self.ago(90), size=1000)
+        backup.apply_retention(now=self.now)
+        self.assertEqual(self.names(), [latest_full])
+
+    @override_settings(BACKUP_RETENTION_DAYS=30, BACKUP_MAX_TOTAL_MB=0)
+    def test_legacy_and_unrelated_files_are_never_removed(self):
+        legacy = self.dir / "backup_20200101_120000.json"
+        legacy.write_text("[]")
+        (self.dir / "notes.txt").write_text("keep me")
+        old_full = self.write(self.ago(60))
+        latest_full = self.write(self.ago(1))
+
+        self.assertEqual([b.kind for b in backup.list_backups()], ["full", "full", "full"])
+        self.assertEqual(backup.apply_retention(now=self.now), [old_full])
+        self.assertEqual(self.names(), sorted([legacy.name, latest_full, "notes.txt"]))
+
+
+class IncrementalBackupTests(BackupDirMixin, TestCase):
+    def run_backup(self, kind):
+        filename, chunks = backup.stream_backup(kind)
+        data = b"".join(chunks)
+        self.assertEqual((self.dir / filename).read_bytes(), data)
+        return json.loads(gzip.decompress(data))
+
+    def by_model(self, objects, model):
+        return sorted(obj["fields"]["id_number"] for obj in objects if obj["model"] == model)
+
+    def test_incremental_needs_a_full_backup(self):
+        with self.assertRaises(backup.BackupError):
+            backup.stream_backup("incremental")
+
+    def test_incremental_holds_rows_changed_since_full(self):
+        region = Region.objects.create(name="Arusha")
+        Student.objects.bulk_create([Student(id_number=f"S{i}", region=region) for i in range(3)])
+        Teacher.objects.bulk_create([Teacher(id_number="T0")])
+        SessionStore().create()
+        # Written before the full backup started (update() leaves auto_now alone)
+        past = timezone.now() - datetime.timedelta(hours=1)
+        Student.objects.update(updated_at=past)
+        Teacher.objects.update(updated_at=past)
+
+        full = self.run_backup("full")
+        self.assertEqual(self.by_model(full, "data_collection.student"), ["S0", "S1", "S2"])
+        self.assertEqual(self.by_model(full, "data_collection.teacher"), ["T0"])
+        self.assertFalse(any(obj["model"] == "data_collection.respondentrollup" for obj in full))
+        self.assertFalse(any("tags" in obj["fields"] for obj in full if obj["model"] == "data_collection.student"))
+        self.assertFalse(any(obj["model"] == "sessions.session" for obj in full))
+
+        changed = Student.objects.get(id_number="S1")
+        changed.reporting_violence = True
+        changed.save()
+        Student.objects.create(id_number="S3", region=region)
+
+        incremental = self.run_backup("incremental")
+        self.assertEqual(self.by_model(incremental, "data_collection.student"), ["S1", "S3"])
+        self.assertEqual(self.by_model(incremental, "data_collection.teacher"), [])
+        # Lookup tables are always included in full, sessions never
+        self.assertTrue(any(obj["model"] == "data_collection.region" for obj in incremental))
+        self.assertFalse(any(obj["model"] == "sessions.session" for obj in incremental))
+
+    def test_cancelled_download_leaves_no_file(self):
+        filename, chunks = backup.stream_backup("full")
+        next(chunks)
+        chunks.close()
+        self.assertEqual(self.names(), [])
+
+
+class CachedUserTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # A file cache, as in production: each get reads what any process last wrote
+        caches = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "users": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": tmp.name},
+        }
+        override = override_settings(CACHES=caches)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.backend = backends.CachedModelBackend()
+        self.user = CustomUser.objects.create_user("viewer", password="old")
+
+    def test_served_from_cache(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk).username, "viewer")
+
+    def test_changes_made_elsewhere_are_seen_at_once(self):
+        self.backend.get_user(self.user.pk)
+        # update() sends no signal, so the cached copy is still the old one ...
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNotNone(self.backend.get_user(self.user.pk))
+        # ... until the version token moves on, as a save in any process does
+        backends.forget_user(CustomUser, self.user)
+        self.assertIsNone(self.backend.get_user(self.user.pk))   # inactive users are not loaded
+
+    def test_password_change_and_delete(self):
+        self.backend.get_user(self.user.pk)
+        self.user.set_password("new")
+        self.user.save()
+        self.assertTrue(self.backend.get_user(self.user.pk).check_password("new"))
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def test_template_timing_only_during_profiled_requests(self):
+        original = Template.render
+        seen = []
+
+        def view(request):
+            seen.append(Template.render is not original)
+            return HttpResponse(Template("{{ x }}").render(Context({"x": 1})))
+
+        with override_settings(REQUEST_PROFILING=True):
+            profiler = middleware.ProfilingMiddleware(view)
+        self.assertIs(Template.render, original)
+
+        request = RequestFactory().get("/")
+        request.resolver_match = mock.Mock(view_name="test:view")
+        with mock.patch.object(middleware, "profile_store") as store:
+            profiler(request)
+        self.assertEqual(seen, [True])
+        self.assertIs(Template.render, original)
+        self.assertEqual(store.record.call_args.args[0], "test:view")
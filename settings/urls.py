@@ -13,6 +13,7 @@ urlpatterns = [
     path("backup/", views.backup_database, name="backup_database"),
     path("restore/", views.restore_database, name="restore_database"),
     path("system/", views.system_settings, name="system_settings"),
+    path("profiling/", views.request_profiles, name="request_profiles"),
 
 ]
 
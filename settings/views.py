@@ -1,10 +1,17 @@
 from django.shortcuts import redirect, render, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.management import call_command
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.contrib import messages
 from .forms import CustomUserCreationForm, CustomUserChangeForm
 from .models import CustomUser
+from . import backup
+from data_collection.tags import sync_all_tags
+from data_collection.rollups import rebuild_all as rebuild_rollups
+from data_collection.versioning import bump_version
+from indicators.engine import sync_actual_values
+from school_violence_mne.middleware import profile_store
+from reports.cache import cache_stats
 import os, datetime
 from django.conf import settings
 
@@ -32,7 +39,9 @@ def role_redirect_view(request):
 # Dashboard
 @login_required
 def dashboard(request):
-    return render(request, "settings/dashboard.html")
+    return render(request, "settings/dashboard.html", {
+        "report_cache_stats": cache_stats.stats(),
+    })
 
 
 # -------------------------
@@ -106,18 +115,15 @@ def delete_user(request, user_id):
 
 @user_passes_test(is_admin)
 def backup_database(request):
-    backup_dir = os.path.join(os.path.dirname(__file__), "backups")
-    os.makedirs(backup_dir, exist_ok=True)
-
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = os.path.join(backup_dir, f"backup_{timestamp}.json")
-
-    with open(backup_file, "w") as f:
-        call_command("dumpdata", stdout=f)
+    # ?kind=incremental holds only the rows changed since the last full backup
+    try:
+        filename, chunks = backup.stream_backup(request.GET.get("kind", "full"))
+    except backup.BackupError as e:
+        messages.error(request, f"Backup failed: {e}")
+        return redirect("settings:dashboard")
 
-    with open(backup_file, "rb") as f:
-        response = HttpResponse(f.read(), content_type="application/json")
-        response["Content-Disposition"] = f'attachment; filename="backup_{timestamp}.json"'
+    response = StreamingHttpResponse(chunks, content_type="application/gzip")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
 
@@ -129,11 +135,13 @@ def restore_database(request):
 
         # Validate extension
         filename = backup_file.name
-        if not filename.endswith(".json"):
-            messages.error(request, "Invalid file type. Please upload a JSON fixture file.")
+        if not filename.endswith((".json", ".json.gz")):
+            messages.error(request, "Invalid file type. Please upload a JSON fixture file (.json or .json.gz).")
             return redirect("settings:restore_database")
 
-        temp_path = os.path.join(settings.BASE_DIR, "temp_backup.json")
+        # loaddata tells compressed fixtures apart by their extension
+        extension = ".json.gz" if filename.endswith(".gz") else ".json"
+        temp_path = os.path.join(settings.BASE_DIR, f"temp_backup{extension}")
 
         # Save uploaded file safely
         with open(temp_path, "wb+") as destination:
@@ -143,6 +151,10 @@ def restore_database(request):
         try:
             # Load data from fixture
             call_command("loaddata", temp_path)
+            sync_all_tags()
+            rebuild_rollups()
+            bump_version()
+            sync_actual_values()
             messages.success(request, "Database restored successfully.")
         except Exception as e:
             messages.error(request, f"Restore failed: {e}")
@@ -162,3 +174,20 @@ def restore_database(request):
 @user_passes_test(is_admin)
 def system_settings(request):
     return render(request, "settings/system_settings.html")
+
+
+# -------------------------
+# REQUEST PROFILING
+# -------------------------
+
+@user_passes_test(is_admin)
+def request_profiles(request):
+    if request.method == "POST":
+        profile_store.reset()
+        messages.success(request, "Request profiles cleared.")
+        return redirect("settings:request_profiles")
+    return render(request, "settings/request_profiles.html", {
+        "enabled": getattr(settings, "REQUEST_PROFILING", False),
+        "window": profile_store.window,
+        "profiles": profile_store.stats(),
+    })
@@ -0,0 +1,134 @@
+// Respondent tables fed by the keyset-paginated JSON endpoint (data_collection.tables).
+// Markup: <div class="respondent-table" data-url="..."></div>
+(function () {
+  function el(tag, attrs, text) {
+    const node = document.createElement(tag);
+    Object.assign(node, attrs || {});
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function RespondentTable(root) {
+    this.root = root;
+    this.url = root.dataset.url;
+    this.sort = "";
+    this.search = {};
+    this.cursors = [null];   // cursor of every page visited so far, for "Previous"
+    this.columns = null;
+    this.load();
+  }
+
+  RespondentTable.prototype.load = function () {
+    const params = new URLSearchParams();
+    if (this.sort) params.set("sort", this.sort);
+    const cursor = this.cursors[this.cursors.length - 1];
+    if (cursor) params.set("cursor", cursor);
+    Object.keys(this.search).forEach(key => {
+      if (this.search[key]) params.set("search_" + key, this.search[key]);
+    });
+    fetch(this.url + "?" + params, {headers: {"X-Requested-With": "XMLHttpRequest"}})
+      .then(response => response.json())
+      .then(data => {
+        if (data.error) {
+          this.root.textContent = data.error;
+          return;
+        }
+        if (!this.columns) this.build(data.columns);
+        this.fill(data);
+      });
+  };
+
+  RespondentTable.prototype.build = function (columns) {
+    this.columns = columns;
+    const wrapper = el("div", {className: "table-responsive"});
+    const table = el("table", {className: "table table-striped table-bordered table-sm"});
+    const head = el("thead", {className: "thead-dark"});
+    const labels = el("tr");
+    const filters = el("tr");
+    columns.forEach(column => {
+      const th = el("th", {}, column.label);
+      if (column.sortable) {
+        th.style.cursor = "pointer";
+        th.addEventListener("click", () => this.sortBy(column.key));
+      }
+      column.header = th;
+      labels.appendChild(th);
+
+      const cell = el("th", {className: "p-1"});
+      if (column.searchable) {
+        const input = el("input", {type: "search", className: "form-control form-control-sm", placeholder: "Search"});
+        let timer = null;
+        input.addEventListener("input", () => {
+          clearTimeout(timer);
+          timer = setTimeout(() => {
+            this.search[column.key] = input.value.trim();
+            this.restart();
+          }, 300);
+        });
+        cell.appendChild(input);
+      }
+      filters.appendChild(cell);
+    });
+    head.appendChild(labels);
+    head.appendChild(filters);
+    this.body = el("tbody");
+    table.appendChild(head);
+    table.appendChild(this.body);
+    wrapper.appendChild(table);
+
+    const pager = el("div", {className: "d-flex justify-content-between mb-4"});
+    this.previous = el("button", {type: "button", className: "btn btn-sm btn-outline-secondary"}, "Previous");
+    this.next = el("button", {type: "button", className: "btn btn-sm btn-outline-secondary"}, "Next");
+    this.pageLabel = el("span", {className: "text-muted"});
+    this.previous.addEventListener("click", () => {
+      this.cursors.pop();
+      this.load();
+    });
+    this.next.addEventListener("click", () => {
+      this.cursors.push(this.nextCursor);
+      this.load();
+    });
+    pager.appendChild(this.previous);
+    pager.appendChild(this.pageLabel);
+    pager.appendChild(this.next);
+
+    this.root.innerHTML = "";
+    this.root.appendChild(wrapper);
+    this.root.appendChild(pager);
+  };
+
+  RespondentTable.prototype.fill = function (data) {
+    this.body.innerHTML = "";
+    if (!data.rows.length) {
+      const td = el("td", {colSpan: this.columns.length, className: "text-center"}, "No records found.");
+      const tr = el("tr");
+      tr.appendChild(td);
+      this.body.appendChild(tr);
+    }
+    data.rows.forEach(row => {
+      const tr = el("tr");
+      row.forEach(value => tr.appendChild(el("td", {}, value)));
+      this.body.appendChild(tr);
+    });
+    this.columns.forEach(column => {
+      const arrow = this.sort === column.key ? " ▲" : this.sort === "-" + column.key ? " ▼" : "";
+      column.header.textContent = column.label + arrow;
+    });
+    this.nextCursor = data.next;
+    this.previous.disabled = this.cursors.length === 1;
+    this.next.disabled = !data.next;
+    this.pageLabel.textContent = "Page " + this.cursors.length;
+  };
+
+  RespondentTable.prototype.sortBy = function (key) {
+    this.sort = this.sort === key ? "-" + key : key;
+    this.restart();
+  };
+
+  RespondentTable.prototype.restart = function () {
+    this.cursors = [null];
+    this.load();
+  };
+
+  document.querySelectorAll(".respondent-table").forEach(root => new RespondentTable(root));
+})();
@@ -3,6 +3,6 @@ from django.db.models import Count
 from data_collection.models import Student
 
 def violence_by_region():
-    data = Student.objects.values('region').annotate(count=Count('id'))
-    fig = px.bar(data, x='region', y='count', title="Violence Cases by Region")
+    data = Student.objects.values('region__name').annotate(count=Count('id'))
+    fig = px.bar(data, x='region__name', y='count', title="Violence Cases by Region")
     return fig.to_html()
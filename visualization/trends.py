@@ -0,0 +1,80 @@
+"""
+Respondent counts per category value, students / teachers / parents side by side.
+
+Each respondent type is counted with one grouped query; the three result
+sets are merged through a dict keyed on the label, over the union of the
+labels of all three, so the cost grows with the number of rows returned
+rather than labels x rows.
+"""
+from django.db.models import Count
+
+from data_collection.aggregates import RESPONDENT_MODELS
+
+
+ROLES = [role for role, _ in RESPONDENT_MODELS]
+
+# category -> {role: field to group by}; roles that were not asked the question are left out
+CATEGORIES = {
+    "region": {role: "region__name" for role in ROLES},
+    "district": {role: "district__name" for role in ROLES},
+    "school": {role: "school__name" for role in ROLES},
+    "survey_round": {role: "survey_round__name" for role in ROLES},
+    "gender": {role: "gender" for role in ROLES},
+    "age_group": {role: "age_group" for role in ROLES},
+    "disability": {"student": "disability_status"},
+    "violence_type": {role: "forms_of_violence" for role in ROLES},
+    "perpetrator": {"student": "perpetrators"},
+    "reporting": {role: "reporting_violence" for role in ROLES},
+    "system_effectiveness": {
+        "student": "effectiveness_reporting_system",
+        "teacher": "effective_handling_vac",
+        "parent": "effectiveness_positive_punishment",
+    },
+}
+
+# Multi-select answers are counted per answer, from the tag links
+TAG_FIELDS = ("forms_of_violence", "perpetrators", "vulnerable_places")
+
+
+def label_for(field, value):
+    if field == "disability_status":
+        return "With Disability" if value else "Without Disability"
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return value if value not in (None, "") else "Unknown"
+
+
+def grouped_counts(model, field):
+    """[(value, count), ...] for one respondent type."""
+    if field in TAG_FIELDS:
+        rows = (
+            model.tags.through.objects.filter(tag__category=field)
+            .values_list("tag__name").annotate(count=Count("pk")).order_by()
+        )
+    else:
+        rows = model.objects.values_list(field).annotate(count=Count("pk")).order_by()
+    return list(rows)
+
+
+def pivot(category):
+    """
+    {"labels": [...], "student": [...], "teacher": [...], "parent": [...]}
+    with one count per label for each respondent type (0 where it has none).
+    """
+    fields = CATEGORIES[category]
+    models = dict(RESPONDENT_MODELS)
+
+    table = {}
+    for index, role in enumerate(ROLES):
+        field = fields.get(role)
+        if field is None:
+            continue
+        for value, count in grouped_counts(models[role], field):
+            row = table.setdefault(label_for(field, value), [0] * len(ROLES))
+            row[index] += count
+
+    labels = sorted(table, key=str)
+    result = {"labels": labels}
+    for index, role in enumerate(ROLES):
+        result[role] = [table[label][index] for label in labels]
+    return result
@@ -1,8 +1,12 @@
 import io, base64, json
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.db.models import Count
 from data_collection.models import Student, Teacher, Parent
+from data_collection.tags import tag_counts
+from data_collection import rollups
+from reports.cache import cached_context
+from . import trends
 from django.conf import settings
 import os, datetime
 from django.contrib.auth.decorators import login_required
@@ -24,20 +28,21 @@ import pandas as pd
 
 @login_required
 def dashboard(request):
-    total_students = Student.objects.count()
-    total_teachers = Teacher.objects.count()
-    total_parents = Parent.objects.count()
+    totals = rollups.summary()
+    total_students = totals["student"]["total"]
+    total_teachers = totals["teacher"]["total"]
+    total_parents = totals["parent"]["total"]
 
     # Example: reporting rate
-    reporting_students = Student.objects.filter(reporting_violence=True).count()
+    reporting_students = totals["student"]["reporting"]
     student_reporting_rate = round((reporting_students / total_students * 100), 1) if total_students else 0
 
     combined_chart = {
         "labels": json.dumps(["Students", "Teachers", "Parents"]),
         "values": json.dumps([
             reporting_students,
-            Teacher.objects.filter(reporting_violence=True).count(),
-            Parent.objects.filter(reporting_violence=True).count()
+            totals["teacher"]["reporting"],
+            totals["parent"]["reporting"],
         ])
     }
 
@@ -53,19 +58,20 @@ def dashboard(request):
 @login_required
 def demographics_view(request):
     # Gender distribution (students only for now)
-    gender_distribution = Student.objects.values("gender").annotate(count=Count("id"))
+    gender_distribution = rollups.breakdown("gender", "student")
 
     # Age group distribution
-    age_group_distribution = Student.objects.values("age_group").annotate(count=Count("id"))
+    age_group_distribution = rollups.breakdown("age_group", "student")
 
     # Disability status
-    disability_distribution = Student.objects.values("disability_status").annotate(count=Count("id"))
+    disability_distribution = rollups.breakdown("disability_status", "student")
 
     # Role-based cases (students, teachers, parents)
+    totals = rollups.summary()
     role_distribution = [
-        {"role": "Students", "count": Student.objects.count()},
-        {"role": "Teachers", "count": Teacher.objects.count()},
-        {"role": "Parents", "count": Parent.objects.count()},
+        {"role": "Students", "count": totals["student"]["total"]},
+        {"role": "Teachers", "count": totals["teacher"]["total"]},
+        {"role": "Parents", "count": totals["parent"]["total"]},
     ]
 
     return render(request, "visualization/demographics.html", {
@@ -75,99 +81,68 @@ def demographics_view(request):
         "role_distribution": role_distribution,
     })
 
+# Labels sent to the trends chart per request; the chart fetches the rest as it needs them
+TRENDS_PAGE_SIZE = 50
+TRENDS_MAX_PAGE_SIZE = 500
+
+
 @login_required
 def trends_view(request):
     category = request.GET.get("category", "region")
-
-    # Get field mapping for each role
-    field_map = {
-        "region": {"student": "region", "teacher": "region", "parent": "region"},
-        "district": {"student": "district", "teacher": "district", "parent": "district"},
-        "school": {"student": "school", "teacher": "school", "parent": "school"},
-        "gender": {"student": "gender", "teacher": "gender", "parent": "gender"},
-        "age_group": {"student": "age_group", "teacher": "age_group", "parent": "age_group"},
-        "disability": {"student": "disability_status", "teacher": None, "parent": None},
-        "violence_type": {"student": "forms_of_violence", "teacher": "forms_of_violence", "parent": "forms_of_violence"},
-        "perpetrator": {"student": "perpetrators", "teacher": None, "parent": None},
-        "reporting": {"student": "reporting_violence", "teacher": "reporting_violence", "parent": "reporting_violence"},
-        "system_effectiveness": {
-            "student": "effectiveness_reporting_system",
-            "teacher": "effective_handling_vac",
-            "parent": "effectiveness_positive_punishment",
-        },
-    }
-
-    fields = field_map.get(category)
-
-    # Query each role only if the field exists
-    student_data = Student.objects.values(fields["student"]).annotate(count=Count("id")).order_by(fields["student"]) if fields["student"] else []
-    teacher_data = Teacher.objects.values(fields["teacher"]).annotate(count=Count("id")).order_by(fields["teacher"]) if fields["teacher"] else []
-    parent_data = Parent.objects.values(fields["parent"]).annotate(count=Count("id")).order_by(fields["parent"]) if fields["parent"] else []
-
-    # Labels from student dataset (fallback to teacher/parent if empty)
-    labels_source = student_data or teacher_data or parent_data
-    labels = [item[fields["student"] or fields["teacher"] or fields["parent"]] or "Unknown" for item in labels_source]
-
-    # Counts aligned to labels
-    def align_counts(data, field):
-        return [next((d["count"] for d in data if d[field] == label), 0) for label in labels] if field else [0]*len(labels)
-
-    student_counts = align_counts(student_data, fields["student"])
-    teacher_counts = align_counts(teacher_data, fields["teacher"])
-    parent_counts = align_counts(parent_data, fields["parent"])
-
+    if category not in trends.CATEGORIES:
+        category = "region"
     return render(request, "visualization/trends.html", {
         "selected_category": category,
-        "labels": labels,
-        "student_counts": student_counts,
-        "teacher_counts": teacher_counts,
-        "parent_counts": parent_counts,
+        "page_size": TRENDS_PAGE_SIZE,
     })
 
 
-
-
-    # Helper to map counts
-    @login_required
-    def get_counts(qs):
-        counts = {label: 0 for label in labels}
-        for entry in qs:
-            if field == "disability_status":
-                label = "With Disability" if entry[field] else "Without Disability"
-            else:
-                label = entry[field] if entry[field] else "Unknown"
-            counts[label] = entry["count"]
-        return [counts[label] for label in labels]
-
-    student_counts = get_counts(student_qs)
-    teacher_counts = get_counts(teacher_qs)
-    parent_counts = get_counts(parent_qs)
-
-    context = {
-        "selected_category": category,
-        "labels": json.dumps(labels),
-        "student_counts": json.dumps(student_counts),
-        "teacher_counts": json.dumps(teacher_counts),
-        "parent_counts": json.dumps(parent_counts),
-    }
-    return render(request, "visualization/trends.html", context)
-
+@login_required
+def trends_data(request):
+    """JSON slice of the trends pivot: ?category=school&offset=0&limit=50"""
+    category = request.GET.get("category", "region")
+    if category not in trends.CATEGORIES:
+        return JsonResponse({"error": f"Unknown category {category!r}."}, status=400)
+    try:
+        offset = max(int(request.GET.get("offset", 0)), 0)
+        limit = min(max(int(request.GET.get("limit", TRENDS_PAGE_SIZE)), 1), TRENDS_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "offset and limit must be integers."}, status=400)
+
+    data = cached_context("visualization_trends", request, lambda: trends.pivot(category), params={"category": category})
+    end = offset + limit
+    total = len(data["labels"])
+    return JsonResponse({
+        "category": category,
+        "labels": data["labels"][offset:end],
+        "student_counts": data["student"][offset:end],
+        "teacher_counts": data["teacher"][offset:end],
+        "parent_counts": data["parent"][offset:end],
+        "total": total,
+        "next_offset": end if end < total else None,
+    })
 
 
 @login_required
 def reports_view(request):
+    context = cached_context("visualization_reports_view", request, reports_context)
+    return render(request, "visualization/reports.html", context)
+
+
+def reports_context():
     # Aggregations
-    top_region = Student.objects.values("region").annotate(count=Count("id")).order_by("-count").first()
-    top_school = Student.objects.values("school").annotate(count=Count("id")).order_by("-count").first()
-    top_violence = Student.objects.values("forms_of_violence").annotate(count=Count("id")).order_by("-count").first()
+    top_region = Student.objects.values("region__name").annotate(count=Count("id")).order_by("-count").first()
+    top_school = Student.objects.values("school__name").annotate(count=Count("id")).order_by("-count").first()
+    violence_data = tag_counts("forms_of_violence", [Student])
+    top_violence = {"forms_of_violence": violence_data[0][0], "count": violence_data[0][1]} if violence_data else None
     reporting_effectiveness = Student.objects.values("effectiveness_reporting_system").annotate(count=Count("id"))
 
     # Executive summary text
     executive_summary = "This report highlights key findings from the school violence monitoring system. "
     if top_region:
-        executive_summary += f"The region most affected is {top_region['region']} with {top_region['count']} reported cases. "
+        executive_summary += f"The region most affected is {top_region['region__name']} with {top_region['count']} reported cases. "
     if top_school:
-        executive_summary += f"The school with the highest cases is {top_school['school']} ({top_school['count']} cases). "
+        executive_summary += f"The school with the highest cases is {top_school['school__name']} ({top_school['count']} cases). "
     if top_violence:
         executive_summary += f"The most common form of violence is {top_violence['forms_of_violence']} ({top_violence['count']} cases). "
     if reporting_effectiveness:
@@ -184,18 +159,17 @@ def reports_view(request):
     if top_violence and top_violence["forms_of_violence"].lower() == "corporal punishment":
         recommendations.append("Expand teacher training on positive discipline methods.")
     if top_region and top_region["count"] > 100:
-        recommendations.append(f"Prioritize interventions in {top_region['region']}.")
+        recommendations.append(f"Prioritize interventions in {top_region['region__name']}.")
 
 
     # Violence type distribution (students only for now)
-    violence_qs = Student.objects.values("forms_of_violence").annotate(count=Count("id"))
-    violence_labels = [v["forms_of_violence"] or "Unknown" for v in violence_qs]
-    violence_counts = [v["count"] for v in violence_qs]
+    violence_labels = [name for name, _ in violence_data]
+    violence_counts = [count for _, count in violence_data]
 
     # Perpetrator distribution
-    perpetrator_qs = Student.objects.values("perpetrators").annotate(count=Count("id"))
-    perpetrator_labels = [p["perpetrators"] or "Unknown" for p in perpetrator_qs]
-    perpetrator_counts = [p["count"] for p in perpetrator_qs]
+    perpetrator_data = tag_counts("perpetrators", [Student])
+    perpetrator_labels = [name for name, _ in perpetrator_data]
+    perpetrator_counts = [count for _, count in perpetrator_data]
 
     # Reporting effectiveness
     reporting_qs = Student.objects.values("effectiveness_reporting_system").annotate(count=Count("id"))
@@ -212,7 +186,7 @@ def reports_view(request):
         "reporting_labels": json.dumps(reporting_labels),
         "reporting_counts": json.dumps(reporting_counts),
     }
-    return render(request, "visualization/reports.html", context)
+    return context
 
 
 @login_required